@@ -0,0 +1,165 @@
+"""
+Read API for analyzed financial news.
+Serves a ticker's news (newest first, keyset-paginated) and its precomputed
+daily sentiment counts from the processed-news collection in MongoDB, and
+full-text search from the local SQLite index.
+"""
+
+import argparse
+import base64
+from datetime import datetime
+
+from bson import json_util
+from flask import Flask, jsonify, abort, request
+from flask_cors import CORS
+from pymongo import MongoClient
+
+from config import (
+    NEWS_MONGO_URI,
+    NEWS_DATABASE,
+    SENTIMENT_OPTIONS,
+    API_PAGE_SIZE,
+    API_MAX_PAGE_SIZE,
+    SEARCH_INDEX_PATH
+)
+from interfaces.news_store import ensure_indexes, date_range, find_news, find_daily_counts, refresh_daily_counts
+from interfaces.search_index import SearchIndex
+
+app = Flask(__name__)
+CORS(app)
+
+# One client per worker process
+client = MongoClient(NEWS_MONGO_URI)
+db = client[NEWS_DATABASE]
+
+
+@app.route('/api/news/<ticker>', methods=['GET'])
+def get_news(ticker):
+    """
+    Latest news for a ticker.
+
+    Query parameters: from, to (YYYY-MM-DD, inclusive), sentiment, limit, and
+    cursor (the next_cursor of the previous page).
+    """
+    sentiment = request.args.get("sentiment")
+    if sentiment and sentiment not in SENTIMENT_OPTIONS:
+        abort(400, description=f"sentiment must be one of {', '.join(SENTIMENT_OPTIONS)}")
+
+    rows, next_key = find_news(
+        db,
+        ticker.upper(),
+        date_from=_date_param("from"),
+        date_to=_date_param("to"),
+        sentiment=sentiment,
+        after=_decode_cursor(request.args.get("cursor")),
+        limit=_limit_param()
+    )
+    return jsonify({
+        "ticker": ticker.upper(),
+        "results": rows,
+        "next_cursor": _encode_cursor(next_key) if next_key else None
+    })
+
+
+@app.route('/api/search', methods=['GET'])
+def search_news():
+    """
+    Ranked full-text search over headlines, summaries and reasoning.
+
+    Query parameters: q (required), ticker, sentiment, from, to (YYYY-MM-DD, inclusive), limit.
+    """
+    query = request.args.get("q", "").strip()
+    if not query:
+        abort(400, description="q is required")
+    sentiment = request.args.get("sentiment")
+    if sentiment and sentiment not in SENTIMENT_OPTIONS:
+        abort(400, description=f"sentiment must be one of {', '.join(SENTIMENT_OPTIONS)}")
+    if not SEARCH_INDEX_PATH.exists():
+        abort(404, description="Search index not built; run build_search_index.py")
+
+    date_to = _date_param("to")
+    ticker = request.args.get("ticker")
+    # One read-only connection per request; SQLite opens in microseconds and WAL allows concurrent readers
+    with SearchIndex(SEARCH_INDEX_PATH, read_only=True) as index:
+        rows = index.search(
+            query,
+            ticker=ticker.upper() if ticker else None,
+            sentiment=sentiment,
+            date_from=_date_param("from"),
+            date_to=date_range(None, date_to)["$lt"] if date_to else None,
+            limit=_limit_param()
+        )
+    return jsonify({"query": query, "results": rows})
+
+
+@app.route('/api/news/<ticker>/daily', methods=['GET'])
+def get_daily_sentiment(ticker):
+    """Per-day positive/neutral/negative article counts for a ticker (from, to optional)."""
+    rows = find_daily_counts(db, ticker.upper(), _date_param("from"), _date_param("to"))
+    if not rows:
+        abort(404, description="Ticker not found")
+    return jsonify(rows)
+
+
+def _date_param(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).strftime("%Y-%m-%d")
+    except ValueError:
+        abort(400, description=f"{name} must be a YYYY-MM-DD date")
+
+
+def _limit_param():
+    try:
+        limit = int(request.args.get("limit", API_PAGE_SIZE))
+    except ValueError:
+        abort(400, description="limit must be an integer")
+    return max(1, min(limit, API_MAX_PAGE_SIZE))
+
+
+# Cursors are opaque to clients: (effective_date, _id) of the last article as URL-safe base64 extended JSON,
+# which keeps ObjectId and string _ids distinct
+def _encode_cursor(key):
+    payload = json_util.dumps({"d": key[0], "id": key[1]})
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        payload = json_util.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return payload["d"], payload["id"]
+    except (ValueError, KeyError, TypeError):
+        abort(400, description="Invalid cursor")
+
+
+@app.errorhandler(404)
+def not_found_error(error):
+    return jsonify({"error": str(error)}), 404
+
+
+@app.errorhandler(400)
+def bad_request_error(error):
+    return jsonify({"error": str(error)}), 400
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Financial news read API")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Refresh the daily sentiment counts incrementally and exit")
+    parser.add_argument("--full", action="store_true", help="With --refresh, rebuild all daily counts")
+    parser.add_argument("--port", type=int, default=5001)
+    args = parser.parse_args()
+
+    ensure_indexes(db)
+    if args.refresh:
+        refresh_daily_counts(db, full=args.full)
+        return
+    app.run(port=args.port)
+
+
+if __name__ == '__main__':
+    main()
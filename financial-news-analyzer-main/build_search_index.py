@@ -0,0 +1,74 @@
+import argparse
+import json
+
+from config import OUTPUT_FILE, SEARCH_INDEX_PATH, NEWS_MONGO_URI, NEWS_DATABASE, NEWS_COLLECTION
+from interfaces.search_index import SearchIndex, result_key
+from utils.logger import logger
+
+# Documents read from MongoDB per transaction
+BATCH_SIZE = 500
+
+
+def index_json(index, path, rebuild):
+    """Index results of analysis.json that are not in the index yet (all of them with --rebuild)."""
+    with open(path, "r", encoding="utf-8") as f:
+        results = [result for result in json.load(f).get("results", []) if not result.get("error")]
+    known = set() if rebuild else index.existing_keys()
+    new = [result for result in results if result_key(result) not in known]
+    return index.add_many(new)
+
+
+def index_mongo(index, rebuild):
+    """
+    Index documents of the processed-news collection written since the last run (by updated_at).
+
+    Documents are keyed by result_key() like analysis.json results, so an article indexed
+    from both sources is stored once.
+    """
+    from datetime import datetime
+    from pymongo import MongoClient
+
+    collection = MongoClient(NEWS_MONGO_URI)[NEWS_DATABASE][NEWS_COLLECTION]
+    watermark = None if rebuild else index.get_meta("mongo_updated_at")
+    started = datetime.utcnow()
+    query = {"error": None}
+    if watermark:
+        query["updated_at"] = {"$gte": datetime.fromisoformat(watermark)}
+
+    indexed = 0
+    batch = []
+    for doc in collection.find(query, {"headline": 1, "summary": 1, "reasoning": 1, "sentiment": 1,
+                                       "confidence": 1, "effective_date": 1, "tickers": 1}):
+        batch.append(doc)
+        if len(batch) >= BATCH_SIZE:
+            indexed += index.add_many(batch)
+            batch = []
+    if batch:
+        indexed += index.add_many(batch)
+    index.set_meta("mongo_updated_at", started.isoformat())
+    return indexed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or update the full-text search index")
+    parser.add_argument("--source", choices=["json", "mongo"], default="json",
+                        help="analysis.json or the processed-news collection in MongoDB")
+    parser.add_argument("--input", default=str(OUTPUT_FILE), help="analysis.json to index (--source json)")
+    parser.add_argument("--index", default=str(SEARCH_INDEX_PATH), help="SQLite index file")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index everything instead of only new results")
+    args = parser.parse_args()
+
+    with SearchIndex(args.index) as index:
+        if args.source == "json":
+            indexed = index_json(index, args.input, args.rebuild)
+        else:
+            indexed = index_mongo(index, args.rebuild)
+        if args.rebuild:
+            # Merge FTS5 segments after a full re-index
+            index.conn.execute("INSERT INTO article_fts (article_fts) VALUES ('optimize')")
+            index.conn.commit()
+    logger.info("Indexed %d results into %s", indexed, args.index)
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,17 @@ os.makedirs(OUTPUT_DIR, exist_ok=True)
 DATA_FILE = DATA_DIR / "news.json"
 OUTPUT_FILE = OUTPUT_DIR / "analysis.json"
 
+# MongoDB destination of analyzed news (written by spark_analyzer.py, served by api.py)
+NEWS_MONGO_URI = os.environ.get("NEWS_MONGO_URI", "mongodb://localhost:27017")
+NEWS_DATABASE = "idx_financial_news"
+NEWS_COLLECTION = "iqplus_processed"
+NEWS_DAILY_COLLECTION = "news_sentiment_daily"  # Per-ticker daily sentiment counts served by api.py
+NEWS_WATERMARK_COLLECTION = "news_refresh_watermarks"  # Last incremental refresh of the daily counts
+
+# News API (api.py)
+API_PAGE_SIZE = 20  # Articles per page when no limit is given
+API_MAX_PAGE_SIZE = 100
+
 # LM Studio API configuration
 LM_STUDIO_API_URL = "http://localhost:1234/v1/chat/completions"
 LM_STUDIO_API_HEADERS = {
@@ -23,15 +34,36 @@ LM_STUDIO_API_HEADERS = {
 # LLM configuration
 MAX_TOKENS = 1024
 TEMPERATURE = 0.1  # Lower temperature for more deterministic responses
+LLM_STREAM = True  # Stream completions to measure time-to-first-token and prompt-processing time
 
 # Logging configuration
 LOG_LEVEL = "INFO"
 LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+LOG_JSON = True  # One JSON object per line with article_id, stage and event fields; False for LOG_FORMAT text
+# Noisy INFO events are sampled: only 1 in N records of these events is written (warnings and errors always are)
+LOG_SAMPLE_EVERY = {
+    "llm_request": 10,
+    "article_start": 10,
+    "result_written": 10,
+    "progress": 10,
+    "cascade_local": 10,
+    "cascade_escalated": 10,
+}
 
 # Sentiment analysis configuration
 SENTIMENT_OPTIONS = ["positive", "neutral", "negative"]
 CONFIDENCE_THRESHOLD = 0.7  # Minimum confidence level to trust the analysis
 
+# Local model cascade configuration
+LOCAL_MODEL_ENABLED = True  # Score articles with the local classifier before calling the LLM
+LOCAL_MODEL_PATH = BASE_DIR / "models" / "sentiment_tfidf.joblib"  # Trained with train_local_model.py
+LOCAL_MODEL_MAX_CHARS = 1500  # Characters of article content fed to the local classifier
+LOCAL_MODEL_HOLDOUT = 0.2  # Fraction of labeled results held out to measure agreement with the LLM
+
+# Full-text search index (SQLite FTS5), updated by main.py as results are written
+SEARCH_INDEX_ENABLED = True
+SEARCH_INDEX_PATH = OUTPUT_DIR / "search.db"
+
 # Multiprocessing configuration
 MAX_WORKERS = max(1, min(3, multiprocessing.cpu_count() - 1))  # Limit to 3 workers max to avoid API overload
 
@@ -41,9 +73,26 @@ MAX_HEADLINE_LENGTH = 200  # Maximum characters for article headline
 PRESERVE_START_CHARS = 4000  # Characters to preserve from the beginning
 PRESERVE_END_CHARS = 4000  # Characters to preserve from the end
 
+# Summarization fallback configuration
+EXTRACTIVE_MAX_SENTENCES = 3  # Sentences kept by the local extractive summarizer
+SHORT_ARTICLE_WORDS = 80  # Articles shorter than this are summarized locally
+ARTICLE_DEADLINE_SECONDS = 120  # After this many seconds on one article, summarize locally
+# Recent average wait for an API slot before summaries fall back to local. A waiting-request
+# count is no signal here: with MAX_WORKERS <= 3 and 2 slots at most one request can ever wait
+LLM_QUEUE_MAX_WAIT = 20  # Seconds
+
 # API Rate Limiting
 MAX_CONCURRENT_REQUESTS = 2  # Maximum concurrent requests to LM Studio API
 REQUEST_TIMEOUT = 90  # Timeout for API requests in seconds
 MAX_RETRIES = 3  # Maximum number of retries for failed requests
 RETRY_BACKOFF = 2  # Exponential backoff factor for retries
-RETRY_DELAY = 3  # Initial delay between retries in seconds
\ No newline at end of file
+RETRY_DELAY = 3  # Initial delay between retries in seconds
+RETRY_MAX_DELAY = 30  # Upper bound of the jittered delay between retries in seconds
+RETRY_BUDGET_RATIO = 0.2  # Retries allowed per request made during a run
+RETRY_BUDGET_MIN = 10  # Retries always available at the start of a run
+
+# Circuit breaker and hedging
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive failures before LLM calls fail fast
+CIRCUIT_RESET_TIMEOUT = 30  # Seconds before a trial request is let through again
+HEDGE_ENABLED = False  # Send a second request when the first one is unusually slow
+HEDGE_DELAY = 60  # Seconds before a hedged request is sent
\ No newline at end of file
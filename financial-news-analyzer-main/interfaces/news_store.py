@@ -0,0 +1,229 @@
+"""
+MongoDB read path for analyzed news.
+Declares the query indexes of the processed-news collection and maintains a
+per-ticker daily sentiment count collection that is refreshed incrementally.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, DeleteOne, ReplaceOne, UpdateOne
+
+from config import NEWS_COLLECTION, NEWS_DAILY_COLLECTION, NEWS_WATERMARK_COLLECTION, SENTIMENT_OPTIONS
+from utils.logger import logger
+
+# Compound indexes for "news for a ticker, newest first": the sort and keyset
+# pagination follow (effective_date, _id), optionally after an equality on sentiment
+NEWS_INDEXES = [
+    [("tickers", ASCENDING), ("effective_date", DESCENDING), ("_id", DESCENDING)],
+    [("tickers", ASCENDING), ("sentiment", ASCENDING), ("effective_date", DESCENDING), ("_id", DESCENDING)],
+    [("updated_at", ASCENDING)],
+]
+DAILY_INDEXES = [
+    [("ticker", ASCENDING), ("date", DESCENDING)],
+]
+
+WATERMARK_ID = "daily_sentiment_counts"
+
+
+def daily_collection(collection: str = NEWS_COLLECTION) -> str:
+    """Name of the daily count collection kept for a processed-news collection."""
+    return NEWS_DAILY_COLLECTION if collection == NEWS_COLLECTION else f"{collection}_sentiment_daily"
+
+
+def ensure_indexes(db, collection: str = NEWS_COLLECTION) -> None:
+    """Create the news and daily count indexes (no-op when they already exist)."""
+    for index in NEWS_INDEXES:
+        db[collection].create_index(index)
+    # Stable key of spark_analyzer.py results; sparse because upload_to_mongodb.py documents have none
+    db[collection].create_index("doc_key", unique=True, sparse=True)
+    for index in DAILY_INDEXES:
+        db[daily_collection(collection)].create_index(index)
+
+
+def date_range(date_from: Optional[str], date_to: Optional[str]) -> Dict[str, str]:
+    """
+    Build an effective_date filter from inclusive YYYY-MM-DD bounds.
+
+    effective_date is stored as an ISO string, so string comparison orders it by time.
+    """
+    bounds = {}
+    if date_from:
+        bounds["$gte"] = date_from
+    if date_to:
+        next_day = datetime.fromisoformat(date_to) + timedelta(days=1)
+        bounds["$lt"] = next_day.strftime("%Y-%m-%d")
+    return bounds
+
+
+def find_news(db, ticker: str, date_from: Optional[str] = None, date_to: Optional[str] = None,
+              sentiment: Optional[str] = None, after: Optional[Tuple[str, Any]] = None,
+              limit: int = 20) -> Tuple[List[Dict[str, Any]], Optional[Tuple[str, Any]]]:
+    """
+    Fetch one page of a ticker's news, newest first.
+
+    Args:
+        db: Database holding the processed news
+        ticker (str): IDX ticker
+        date_from (str, optional): Inclusive start date (YYYY-MM-DD)
+        date_to (str, optional): Inclusive end date (YYYY-MM-DD)
+        sentiment (str, optional): Only articles with this sentiment
+        after (Tuple[str, Any], optional): (effective_date, _id) of the last article of the previous page
+        limit (int): Page size
+
+    Returns:
+        Tuple[List[Dict[str, Any]], Optional[Tuple[str, Any]]]: Articles and the key of the
+        last one if another page exists
+    """
+    conditions = [{"tickers": ticker}]
+    bounds = date_range(date_from, date_to)
+    if bounds:
+        conditions.append({"effective_date": bounds})
+    if sentiment:
+        conditions.append({"sentiment": sentiment})
+    if after:
+        # Keyset pagination: continue strictly after the previous page in (effective_date, _id) order
+        last_date, last_id = after
+        same_date = [{"effective_date": last_date, "_id": {"$lt": last_id}}]
+        if isinstance(last_id, ObjectId):
+            # _id is an ObjectId, or a hash string in documents from older spark_analyzer.py runs; comparisons only
+            # match the same BSON type and strings sort below ObjectIds, so they all come after an ObjectId
+            same_date.append({"effective_date": last_date, "_id": {"$type": "string"}})
+        conditions.append({"$or": [{"effective_date": {"$lt": last_date}}] + same_date})
+
+    projection = {"headline": 1, "effective_date": 1, "sentiment": 1, "confidence": 1, "summary": 1, "tickers": 1}
+    cursor = db[NEWS_COLLECTION].find({"$and": conditions}, projection) \
+        .sort([("effective_date", DESCENDING), ("_id", DESCENDING)]) \
+        .limit(limit + 1)
+    rows = list(cursor)
+
+    next_key = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_key = (rows[-1]["effective_date"], rows[-1]["_id"])
+    for row in rows:
+        row.pop("_id")
+    return rows, next_key
+
+
+def find_daily_counts(db, ticker: str, date_from: Optional[str] = None,
+                      date_to: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Return the precomputed daily sentiment counts of a ticker, oldest first."""
+    match = {"ticker": ticker}
+    bounds = {}
+    if date_from:
+        bounds["$gte"] = date_from
+    if date_to:
+        bounds["$lte"] = date_to
+    if bounds:
+        match["date"] = bounds
+    return list(db[NEWS_DAILY_COLLECTION].find(match, {"_id": 0}).sort("date", ASCENDING))
+
+
+def _count_pipeline(match: Dict[str, Any], keys: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Aggregation from processed news to per-ticker daily sentiment counts."""
+    pipeline = [
+        {"$match": match},
+        {"$unwind": "$tickers"},
+        {"$project": {
+            "ticker": "$tickers",
+            "date": {"$substrCP": ["$effective_date", 0, 10]},
+            "sentiment": 1,
+        }},
+        {"$addFields": {"_id": {"$concat": ["$ticker", "|", "$date"]}}},
+    ]
+    if keys is not None:
+        pipeline.append({"$match": {"_id": {"$in": keys}}})
+    group = {"_id": "$_id", "ticker": {"$first": "$ticker"}, "date": {"$first": "$date"}, "total": {"$sum": 1}}
+    for sentiment in SENTIMENT_OPTIONS:
+        group[sentiment] = {"$sum": {"$cond": [{"$eq": ["$sentiment", sentiment]}, 1, 0]}}
+    pipeline.append({"$group": group})
+    return pipeline
+
+
+def _daily_keys(doc: Dict[str, Any]) -> List[str]:
+    """(ticker, date) keys an article is counted under, as "TICKER|YYYY-MM-DD"."""
+    effective_date = doc.get("effective_date")
+    if not isinstance(effective_date, str):
+        return []
+    return sorted({f"{ticker}|{effective_date[:10]}" for ticker in doc.get("tickers") or []})
+
+
+def _changed_keys(docs) -> Tuple[List[str], Dict[Any, List[str]]]:
+    """
+    Collect the daily counts affected by changed articles.
+
+    An article is recounted under its current keys and under the keys it was last
+    counted under (daily_keys), so a count it left after a change of tickers or
+    effective_date is corrected as well.
+
+    Returns:
+        Tuple[List[str], Dict[Any, List[str]]]: Keys to recompute, and the current keys per _id
+    """
+    keys = set()
+    current = {}
+    for doc in docs:
+        current[doc["_id"]] = _daily_keys(doc)
+        keys.update(current[doc["_id"]])
+        keys.update(doc.get("daily_keys") or [])
+    return sorted(keys), current
+
+
+def refresh_daily_counts(db, full: bool = False, collection: str = NEWS_COLLECTION) -> int:
+    """
+    Bring the daily sentiment counts up to date.
+
+    Only (ticker, date) pairs touched by articles written since the last refresh
+    (by updated_at) are recomputed, including the pairs an article was counted under
+    before it was re-analyzed (stored in its daily_keys field). The first run, or
+    full=True, rebuilds the whole collection.
+
+    Args:
+        db: Database holding the processed news
+        full (bool): Rebuild every count instead of only the affected ones
+        collection (str): Processed-news collection; counts of other collections than
+            NEWS_COLLECTION go to their own daily collection (see daily_collection)
+
+    Returns:
+        int: Number of (ticker, date) counts recomputed
+    """
+    news = db[collection]
+    daily = daily_collection(collection)
+    watermarks = db[NEWS_WATERMARK_COLLECTION]
+    watermark_id = WATERMARK_ID if collection == NEWS_COLLECTION else f"{WATERMARK_ID}:{collection}"
+    # Taken before reading, so articles written during the refresh are picked up next time
+    started = datetime.utcnow()
+    watermark = None if full else watermarks.find_one({"_id": watermark_id})
+
+    if watermark is None:
+        counted = {"tickers.0": {"$exists": True}, "effective_date": {"$type": "string"}}
+        # $out replaces the collection atomically once the aggregation finishes
+        news.aggregate(_count_pipeline(counted) + [{"$out": daily}])
+        # Remember which counts each article is in, for the incremental refresh after a re-analysis
+        news.update_many(counted, [{"$set": {"daily_keys": {"$map": {
+            "input": "$tickers", "as": "ticker",
+            "in": {"$concat": ["$$ticker", "|", {"$substrCP": ["$effective_date", 0, 10]}]},
+        }}}}])
+        news.update_many({"daily_keys": {"$exists": True}, "$nor": [counted]}, {"$unset": {"daily_keys": ""}})
+        ensure_indexes(db, collection)
+        refreshed = db[daily].estimated_document_count()
+    else:
+        changed = news.find({"updated_at": {"$gte": watermark["last_refresh"]}},
+                            {"tickers": 1, "effective_date": 1, "daily_keys": 1})
+        keys, current = _changed_keys(changed)
+        if keys:
+            tickers = sorted({key.split("|")[0] for key in keys})
+            first_day = min(key.split("|")[1] for key in keys)
+            match = {"tickers": {"$in": tickers}, "effective_date": {"$gte": first_day}}
+            counts = {row["_id"]: row for row in news.aggregate(_count_pipeline(match, keys))}
+            # Keys without any article left are removed instead of keeping their old count
+            db[daily].bulk_write([ReplaceOne({"_id": key}, counts[key], upsert=True) if key in counts
+                                  else DeleteOne({"_id": key}) for key in keys], ordered=False)
+            news.bulk_write([UpdateOne({"_id": _id}, {"$set": {"daily_keys": doc_keys}})
+                             for _id, doc_keys in current.items()], ordered=False)
+        refreshed = len(keys)
+
+    watermarks.update_one({"_id": watermark_id}, {"$set": {"last_refresh": started}}, upsert=True)
+    logger.info("Refreshed %d daily sentiment counts%s", refreshed, " (full rebuild)" if watermark is None else "")
+    return refreshed
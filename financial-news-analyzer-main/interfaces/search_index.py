@@ -0,0 +1,193 @@
+"""
+Embedded full-text search index over analyzed news.
+Headlines, summaries and reasoning are stemmed with the Indonesian stemmer and
+stored in a SQLite FTS5 table; article metadata and a ticker table allow
+filtering by ticker, sentiment and date while ranking by BM25.
+"""
+
+import hashlib
+import json
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils.indonesian_stemmer import stem_tokens
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    doc_key TEXT UNIQUE NOT NULL,
+    headline TEXT,
+    summary TEXT,
+    reasoning TEXT,
+    sentiment TEXT,
+    confidence REAL,
+    effective_date TEXT,
+    tickers TEXT
+);
+CREATE INDEX IF NOT EXISTS articles_effective_date ON articles (effective_date);
+CREATE TABLE IF NOT EXISTS article_tickers (
+    ticker TEXT NOT NULL,
+    article_id INTEGER NOT NULL,
+    PRIMARY KEY (ticker, article_id)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS article_fts USING fts5(headline, summary, reasoning);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# BM25 column weights: a match in the headline counts most
+BM25_WEIGHTS = (4.0, 2.0, 1.0)
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    """Stable key of an analysis result, the same for analysis.json results and MongoDB documents."""
+    return hashlib.sha1(f"{result.get('headline', '')}|{result.get('effective_date', '')}".encode("utf-8")).hexdigest()
+
+
+def fts_query(query: str) -> Optional[str]:
+    """
+    Turn a user query into an FTS5 query over stems (all terms required).
+
+    Args:
+        query (str): Free text, e.g. "pembagian dividen"
+
+    Returns:
+        Optional[str]: FTS5 MATCH expression, or None if the query has no terms
+    """
+    stems = stem_tokens(query)
+    if not stems:
+        return None
+    # Stems only contain [a-z0-9], so quoting is enough to neutralize FTS5 syntax
+    return " ".join(f'"{term}"' for term in stems)
+
+
+class SearchIndex:
+    """SQLite FTS5 index of analysis results."""
+
+    def __init__(self, path: str, read_only: bool = False):
+        """
+        Open (and create if needed) the index.
+
+        Args:
+            path (str): SQLite database file
+            read_only (bool): Open without write access, e.g. from the API
+        """
+        if read_only:
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        else:
+            self.conn = sqlite3.connect(str(path), check_same_thread=False)
+            # WAL lets the API read while the analyzer is writing
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.executescript(SCHEMA)
+        self.conn.row_factory = sqlite3.Row
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add(self, result: Dict[str, Any], key: Optional[str] = None) -> None:
+        """Index one result, replacing an earlier version with the same key."""
+        self.add_many([result], [key] if key else None)
+
+    def add_many(self, results: Iterable[Dict[str, Any]], keys: Optional[Iterable[str]] = None) -> int:
+        """
+        Index results in one transaction.
+
+        Args:
+            results (Iterable[Dict[str, Any]]): Analysis results (analysis.json or MongoDB documents)
+            keys (Iterable[str], optional): Keys per result; defaults to result_key()
+
+        Returns:
+            int: Number of results indexed
+        """
+        results = list(results)
+        keys = list(keys) if keys is not None else [result_key(result) for result in results]
+        with self.conn:
+            for result, key in zip(results, keys):
+                tickers = list(result.get("tickers") or [])
+                row = self.conn.execute("SELECT id FROM articles WHERE doc_key = ?", (key,)).fetchone()
+                values = (result.get("headline", ""), result.get("summary", ""), result.get("reasoning", ""),
+                          result.get("sentiment"), result.get("confidence"), result.get("effective_date"),
+                          json.dumps(tickers))
+                if row is None:
+                    article_id = self.conn.execute(
+                        "INSERT INTO articles (doc_key, headline, summary, reasoning, sentiment, confidence, "
+                        "effective_date, tickers) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", (key,) + values).lastrowid
+                else:
+                    article_id = row["id"]
+                    self.conn.execute(
+                        "UPDATE articles SET headline = ?, summary = ?, reasoning = ?, sentiment = ?, confidence = ?, "
+                        "effective_date = ?, tickers = ? WHERE id = ?", values + (article_id,))
+                    self.conn.execute("DELETE FROM article_fts WHERE rowid = ?", (article_id,))
+                    self.conn.execute("DELETE FROM article_tickers WHERE article_id = ?", (article_id,))
+
+                self.conn.execute(
+                    "INSERT INTO article_fts (rowid, headline, summary, reasoning) VALUES (?, ?, ?, ?)",
+                    (article_id,) + tuple(" ".join(stem_tokens(result.get(field) or ""))
+                                          for field in ("headline", "summary", "reasoning")))
+                self.conn.executemany("INSERT OR IGNORE INTO article_tickers (ticker, article_id) VALUES (?, ?)",
+                                      [(ticker, article_id) for ticker in tickers])
+        return len(results)
+
+    def existing_keys(self) -> set:
+        return {row["doc_key"] for row in self.conn.execute("SELECT doc_key FROM articles")}
+
+    def get_meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def search(self, query: str, ticker: Optional[str] = None, sentiment: Optional[str] = None,
+               date_from: Optional[str] = None, date_to: Optional[str] = None,
+               limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Ranked full-text search.
+
+        Args:
+            query (str): Free-text query; every term must match (after stemming)
+            ticker (str, optional): Only articles tagged with this ticker
+            sentiment (str, optional): Only articles with this sentiment
+            date_from (str, optional): Inclusive lower bound on effective_date (YYYY-MM-DD)
+            date_to (str, optional): Exclusive upper bound on effective_date (YYYY-MM-DD)
+            limit (int): Maximum number of results
+
+        Returns:
+            List[Dict[str, Any]]: Best matches first, with their BM25 score (lower is better)
+        """
+        match = fts_query(query)
+        if match is None:
+            return []
+
+        sql = ["SELECT a.headline, a.summary, a.reasoning, a.sentiment, a.confidence, a.effective_date, a.tickers, "
+               "bm25(article_fts, ?, ?, ?) AS score "
+               "FROM article_fts JOIN articles a ON a.id = article_fts.rowid "
+               "WHERE article_fts MATCH ?"]
+        params: List[Any] = list(BM25_WEIGHTS) + [match]
+        if ticker:
+            sql.append("AND a.id IN (SELECT article_id FROM article_tickers WHERE ticker = ?)")
+            params.append(ticker)
+        if sentiment:
+            sql.append("AND a.sentiment = ?")
+            params.append(sentiment)
+        if date_from:
+            sql.append("AND a.effective_date >= ?")
+            params.append(date_from)
+        if date_to:
+            sql.append("AND a.effective_date < ?")
+            params.append(date_to)
+        sql.append("ORDER BY score LIMIT ?")
+        params.append(limit)
+
+        rows = []
+        for row in self.conn.execute(" ".join(sql), params):
+            item = dict(row)
+            item["tickers"] = json.loads(item["tickers"] or "[]")
+            rows.append(item)
+        return rows
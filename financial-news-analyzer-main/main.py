@@ -1,5 +1,6 @@
 import json
 import os
+import time
 import concurrent.futures
 from datetime import datetime
 from typing import List, Dict, Any
@@ -12,9 +13,13 @@ from config import (
     MAX_CONTENT_LENGTH,
     MAX_HEADLINE_LENGTH,
     PRESERVE_START_CHARS,
-    PRESERVE_END_CHARS
+    PRESERVE_END_CHARS,
+    ARTICLE_DEADLINE_SECONDS,
+    SEARCH_INDEX_ENABLED,
+    SEARCH_INDEX_PATH
 )
 from interfaces.news_loader import load_news_articles
+from interfaces.search_index import SearchIndex
 from services.llm_service import LLMService
 from services.combined_analysis_service import CombinedAnalysisService
 from utils.text_utils import (
@@ -22,17 +27,27 @@ from utils.text_utils import (
     normalize_text,
     truncate_text
 )
-from utils.logger import logger
+from utils.logger import logger, log_context
 
 # Global services to be shared across threads
 llm_service = None
 combined_analysis_service = None
+search_index = None
 results_lock = Lock()
 file_lock = Lock()  # New lock for file operations
 
 def process_article(article: Dict[str, Any], article_index: int, total_articles: int) -> Dict[str, Any]:
+    # Every record logged while analyzing this article carries its ID
+    with log_context(article_id=str(article_index + 1), stage="analysis"):
+        return _process_article(article, article_index, total_articles)
+
+def _process_article(article: Dict[str, Any], article_index: int, total_articles: int) -> Dict[str, Any]:
     try:
-        logger.info(f"Processing article {article_index+1}/{total_articles}: {article.get('headline', 'No headline')[:50]}...")
+        logger.info("Processing article %d/%d: %.50s...", article_index + 1, total_articles,
+                    article.get('headline', 'No headline'), extra={"event": "article_start"})
+        
+        # Past this point the summary is built locally instead of waiting for the LLM
+        deadline = time.monotonic() + ARTICLE_DEADLINE_SECONDS
         
         # Save original content for summarization
         original_article = {
@@ -72,7 +87,7 @@ def process_article(article: Dict[str, Any], article_index: int, total_articles:
         effective_date = extract_effective_date(article)
         
         # Perform combined analysis with separate LLM calls for sentiment/ticker and summary
-        logger.info(f"[Article {article_index+1}] Performing analysis...")
+        logger.debug("Performing analysis", extra={"event": "article_analysis"})
         analysis_data = combined_analysis_service.analyze_article({
             # Use truncated content for sentiment and ticker analysis
             "headline": article.get("headline", ""),
@@ -80,7 +95,7 @@ def process_article(article: Dict[str, Any], article_index: int, total_articles:
             # Also pass the normalized but not truncated content for summarization
             "original_content": normalized_article.get("content", ""),
             "original_headline": normalized_article.get("headline", "")
-        })
+        }, deadline)
         
         # Compile results
         result = {
@@ -90,14 +105,17 @@ def process_article(article: Dict[str, Any], article_index: int, total_articles:
             "confidence": analysis_data.get("confidence", 0.5),
             "tickers": analysis_data.get("tickers", []),
             "reasoning": analysis_data.get("reasoning", ""),
-            "summary": analysis_data.get("summary", "")
+            "summary": analysis_data.get("summary", ""),
+            "summary_method": analysis_data.get("summary_method", "llm"),
+            "analysis_method": analysis_data.get("analysis_method", "llm")
         }
         
-        logger.info(f"Successfully processed article {article_index+1}: {original_article.get('headline', 'No headline')[:50]}")
+        logger.info("Successfully processed article %d: %.50s", article_index + 1,
+                    original_article.get('headline', 'No headline'), extra={"event": "article_done"})
         return result
         
     except Exception as e:
-        logger.error(f"Error processing article {article_index+1}: {str(e)}")
+        logger.error("Error processing article %d: %s", article_index + 1, e, extra={"event": "article_error"})
         # Add minimal information for failed articles
         return {
             "headline": article.get("headline", "Unknown"),
@@ -125,11 +143,11 @@ def initialize_output_file(article_count: int) -> None:
     with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
         json.dump(metadata, f, indent=2, ensure_ascii=False)
     
-    logger.info(f"Initialized output file at {OUTPUT_FILE}")
+    logger.info("Initialized output file at %s", OUTPUT_FILE)
 
 def write_result(result: Dict[str, Any], article_index: int, total_articles: int) -> None:
     """Write a single result to the output file as it's collected."""
-    with file_lock:
+    with file_lock, log_context(article_id=str(article_index + 1), stage="write"):
         try:
             # Read the current file content
             with open(OUTPUT_FILE, 'r', encoding='utf-8') as f:
@@ -145,19 +163,24 @@ def write_result(result: Dict[str, Any], article_index: int, total_articles: int
             with open(OUTPUT_FILE, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
                 
-            logger.info(f"Written result for article {article_index+1}/{total_articles} to {OUTPUT_FILE}")
+            logger.info("Written result for article %d/%d to %s", article_index + 1, total_articles, OUTPUT_FILE,
+                        extra={"event": "result_written"})
+            
+            # Make the result searchable right away
+            if search_index is not None and not result.get("error"):
+                search_index.add(result)
             
         except Exception as e:
-            logger.error(f"Error writing result to file: {str(e)}")
+            logger.error("Error writing result to file: %s", e, extra={"event": "write_error"})
 
 def analyze_articles() -> None:
     # Initialize global services
-    global llm_service, combined_analysis_service
+    global llm_service, combined_analysis_service, search_index
     
     # Load articles
     logger.info("Loading articles from data file")
     articles = load_news_articles()
-    logger.info(f"Loaded {len(articles)} articles")
+    logger.info("Loaded %d articles", len(articles))
     
     # Initialize the output file with metadata
     initialize_output_file(len(articles))
@@ -165,6 +188,8 @@ def analyze_articles() -> None:
     # Initialize services
     llm_service = LLMService()
     combined_analysis_service = CombinedAnalysisService(llm_service)
+    if SEARCH_INDEX_ENABLED:
+        search_index = SearchIndex(SEARCH_INDEX_PATH)
     
     # Track processed articles count
     processed_count = 0
@@ -185,24 +210,42 @@ def analyze_articles() -> None:
                 write_result(result, article_index, len(articles))
                 with results_lock:
                     processed_count += 1
-                    logger.info(f"Processed {processed_count}/{len(articles)} articles")
+                    logger.info("Processed %d/%d articles", processed_count, len(articles), extra={"event": "progress"})
             except Exception as e:
-                logger.error(f"Unexpected error with article {article_index+1}: {str(e)}")
+                logger.error("Unexpected error with article %d: %s", article_index + 1, e)
+    
+    logger.info("All articles processed. Total: %d/%d", processed_count, len(articles))
+    
+    # Report how much LLM traffic the local classifier absorbed
+    if combined_analysis_service.cascade_enabled:
+        stats = combined_analysis_service.cascade_summary()
+        if stats["escalation_rate"] is not None:
+            logger.info("Sentiment cascade: %d answered locally, %d escalated to LLM (escalation rate %.1f%%)",
+                        stats["local"], stats["escalated"], stats["escalation_rate"] * 100)
     
-    logger.info(f"All articles processed. Total: {processed_count}/{len(articles)}")
+    # Streaming timings show whether the server's prompt prefix cache is being hit
+    timings = llm_service.timing_stats.summary()
+    if timings["requests"]:
+        message = (f"LLM timings over {timings['requests']} requests: TTFT p50 {timings['ttft_p50']:.2f}s, "
+                   f"p95 {timings['ttft_p95']:.2f}s")
+        if timings["prompt_ms_p50"] is not None:
+            message += f", prompt processing p50 {timings['prompt_ms_p50']:.0f}ms"
+        if timings["cache_hit_ratio"] is not None:
+            message += f", prompt cache hit {timings['cache_hit_ratio']:.1%}"
+        logger.info(message)
 
 def main():
     logger.info("Starting Financial News Analyzer")
-    logger.info(f"Using {MAX_WORKERS} worker threads for parallel processing")
+    logger.info("Using %d worker threads for parallel processing", MAX_WORKERS)
     
     try:
         # Analyze articles and write results immediately
         analyze_articles()
         
-        logger.info(f"Analysis complete. Results saved to {OUTPUT_FILE}")
+        logger.info("Analysis complete. Results saved to %s", OUTPUT_FILE)
         
     except Exception as e:
-        logger.error(f"Application error: {str(e)}")
+        logger.error("Application error: %s", e)
         raise
 
 if __name__ == "__main__":
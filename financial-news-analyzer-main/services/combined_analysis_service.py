@@ -1,12 +1,15 @@
 import json
 import re
 import os
-from typing import Dict, Any, List, Tuple
+import threading
+from typing import Dict, Any, List, Optional, Tuple
 
 from services.llm_service import LLMService
 from services.summarizer_service import SummarizerService
-from config import SENTIMENT_OPTIONS, DATA_DIR
-from utils.logger import logger
+from services.local_classifier import LocalSentimentClassifier, LocalTickerMatcher
+from services.prompt_templates import sentiment_ticker_template
+from config import SENTIMENT_OPTIONS, DATA_DIR, CONFIDENCE_THRESHOLD, LOCAL_MODEL_ENABLED
+from utils.logger import logger, log_context
 
 
 class CombinedAnalysisService:
@@ -15,6 +18,15 @@ class CombinedAnalysisService:
         self.summarizer_service = SummarizerService(llm_service)
         self.ticker_company_map = self._load_ticker_company_map()
         self.valid_tickers = list(self.ticker_company_map.keys())
+        # Compiled once so every request shares the same prompt prefix
+        self.prompt_template = sentiment_ticker_template(self.ticker_company_map)
+
+        # Cheap-first cascade: the local classifier answers confident articles, the rest escalate to the LLM
+        self.local_classifier = LocalSentimentClassifier()
+        self.cascade_enabled = LOCAL_MODEL_ENABLED and self.local_classifier.load()
+        self.ticker_matcher = LocalTickerMatcher(self.ticker_company_map)
+        self.cascade_stats = {"local": 0, "escalated": 0}
+        self.stats_lock = threading.Lock()
     
     def _load_ticker_company_map(self) -> Dict[str, str]:
         """
@@ -29,10 +41,10 @@ class CombinedAnalysisService:
             with open(ticker_company_path, 'r', encoding='utf-8') as f:
                 ticker_company_map = json.load(f)
             
-            logger.info(f"Loaded {len(ticker_company_map)} ticker-company mappings from ticker_company.json")
+            logger.info("Loaded %d ticker-company mappings from ticker_company.json", len(ticker_company_map))
                     
         except Exception as e:
-            logger.error(f"Error loading ticker-company mapping: {str(e)}")
+            logger.error("Error loading ticker-company mapping: %s", e)
             # Fallback to some common IDX tickers if file can't be loaded
             ticker_company_map = {
                 "BBCA": "Bank Central Asia Tbk.",
@@ -46,22 +58,27 @@ class CombinedAnalysisService:
                 "INDF": "Indofood Sukses Makmur Tbk.",
                 "BBNI": "Bank Negara Indonesia Tbk."
             }
-            logger.warning(f"Using fallback list of {len(ticker_company_map)} common IDX tickers")
+            logger.warning("Using fallback list of %d common IDX tickers", len(ticker_company_map))
         
         return ticker_company_map
     
-    def analyze_article(self, article: Dict[str, Any]) -> Dict[str, Any]:
+    def analyze_article(self, article: Dict[str, Any], deadline: Optional[float] = None) -> Dict[str, Any]:
         """
         Analyze article with separate LLM requests for sentiment/ticker analysis and summary.
         
         Args:
             article (Dict[str, Any]): Article data including headline and content
+            deadline (float, optional): time.monotonic() value after which the summary is built locally
             
         Returns:
             Dict[str, Any]: Analysis results including sentiment, tickers and summary
         """
-        # Perform sentiment and ticker analysis with truncated content
-        analysis_data = self._analyze_sentiment_and_tickers(article)
+        # Try the local classifier first; fall back to the LLM for low-confidence articles
+        with log_context(stage="sentiment"):
+            analysis_data = self._local_sentiment_and_tickers(article) if self.cascade_enabled else None
+            if analysis_data is None:
+                # Perform sentiment and ticker analysis with truncated content
+                analysis_data = self._analyze_sentiment_and_tickers(article)
         
         # Generate summary with separate LLM request using original content
         summary_article = {
@@ -73,85 +90,100 @@ class CombinedAnalysisService:
         trunc_len = len(article.get("content", ""))
         orig_len = len(summary_article.get("content", ""))
         if orig_len > trunc_len:
-            logger.info(f"Using full content for summary generation: {orig_len} chars vs {trunc_len} chars in truncated version")
+            logger.debug("Using full content for summary generation: %d chars vs %d chars in truncated version",
+                         orig_len, trunc_len)
         
         # Generate summary with original content
-        summary = self.summarizer_service.generate_summary(summary_article)
+        with log_context(stage="summary"):
+            summary = self.summarizer_service.generate_summary(summary_article, deadline)
         
         # Combine results
-        analysis_data["summary"] = summary
+        analysis_data["summary"] = summary["summary"]
+        analysis_data["summary_method"] = summary["summary_method"]
         
         return analysis_data
     
-    def _analyze_sentiment_and_tickers(self, article: Dict[str, Any]) -> Dict[str, Any]:
+    def _local_sentiment_and_tickers(self, article: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
-        Analyze sentiment and extract tickers from article with truncated content.
+        Score the article with the local classifier and match tickers without an LLM call.
         
         Args:
             article (Dict[str, Any]): Article data including headline and content
             
         Returns:
-            Dict[str, Any]: Analysis data with sentiment and tickers
+            Optional[Dict[str, Any]]: Analysis data, or None if the article must escalate to the LLM
         """
         headline = article.get("headline", "")
         content = article.get("content", "")
+        sentiment, confidence = self.local_classifier.classify(headline, content)
         
-        # Extract tickers from headline if in format "XXXX: ..."
-        headline_ticker = None
-        headline_ticker_match = re.match(r'^([A-Z]{4}):', headline)
-        if headline_ticker_match:
-            potential_ticker = headline_ticker_match.group(1)
-            if potential_ticker in self.valid_tickers:
-                headline_ticker = potential_ticker
-                logger.info(f"Found ticker {headline_ticker} in headline")
+        escalate = confidence < CONFIDENCE_THRESHOLD
+        with self.stats_lock:
+            self.cascade_stats["escalated" if escalate else "local"] += 1
+        if escalate:
+            logger.info("Local sentiment confidence %.2f below %s, escalating to LLM", confidence, CONFIDENCE_THRESHOLD,
+                        extra={"event": "cascade_escalated"})
+            return None
         
-        # Include a subset of the ticker-company mapping in the prompt
-        # Select the first 50 items to avoid token limits
-        ticker_company_sample = dict(list(self.ticker_company_map.items())[:50])
-        ticker_company_json = json.dumps(ticker_company_sample, ensure_ascii=False)
+        tickers = article.get("matched_tickers")
+        if tickers is None:
+            tickers = self.ticker_matcher.match(headline, content, self._headline_ticker(headline))
+        logger.info("Local sentiment %s (%.2f) accepted, tickers: %s", sentiment, confidence, tickers,
+                    extra={"event": "cascade_local"})
+        return {
+            "sentiment": sentiment,
+            "confidence": round(confidence, 2),
+            "tickers": tickers,
+            "reasoning": f"Diklasifikasikan oleh model lokal (confidence {confidence:.2f}).",
+            "analysis_method": "local"
+        }
+    
+    def cascade_summary(self) -> Dict[str, Any]:
+        """
+        Report how many articles the local classifier answered and how many escalated.
         
-        # Create a prompt for sentiment and ticker analysis
-        system_prompt = f"""
-        You are a professional financial analyst specializing in Indonesian financial news. Perform the following two tasks based on the article content:
-
-        1. SENTIMENT ANALYSIS:
-        - Classify the sentiment as "positive", "neutral", or "negative"
-        - Provide a confidence score as a float between 0.0 and 1.0
-
-        2. TICKER EXTRACTION:
-        - Identify up to 5 Indonesian stock tickers (IDX-listed) that are either explicitly mentioned or strongly implied based on the headline or content
-        - Only include official ticker symbols listed on the Indonesia Stock Exchange (IDX)
-        - If you see a ticker format at the beginning of the headline (like "XXXX: ..."), prioritize this ticker
-        - Below is a partial list of valid IDX ticker symbols with their company names:
-          {ticker_company_json}
-        - Provide a brief explanation (in Bahasa Indonesia) for why each ticker is relevant to the article
-        - DO NOT hallucinate or make up ticker symbols that are not in the IDX listing
-
-        Output format:
-        Return only a JSON object with the following structure:
-        {{
-        "sentiment": "positive" | "neutral" | "negative",
-        "confidence": 0.0-1.0,
-        "tickers": ["BBCA", "TLKM"],
-        "reasoning": "BBCA disebutkan secara eksplisit terkait kinerja keuangan kuartalan, sementara TLKM relevan karena kerjasama strategis dalam proyek digitalisasi."
-        }}
-
-        - Do not invent tickers that are not valid in the IDX or not in the provided reference.
-        - If there are no relevant tickers, return an empty array: "tickers": [], and explain accordingly in the reasoning.
-        - Ensure all text in "reasoning" is written in Bahasa Indonesia.
+        Returns:
+            Dict[str, Any]: Counts and escalation rate
         """
+        with self.stats_lock:
+            local, escalated = self.cascade_stats["local"], self.cascade_stats["escalated"]
+        total = local + escalated
+        return {
+            "local": local,
+            "escalated": escalated,
+            "escalation_rate": escalated / total if total else None
+        }
+    
+    def _headline_ticker(self, headline: str) -> Optional[str]:
+        """Return the ticker from a "XXXX: ..." headline prefix if it is a valid IDX ticker."""
+        headline_ticker_match = re.match(r'^([A-Z]{4}):', headline)
+        if headline_ticker_match and headline_ticker_match.group(1) in self.valid_tickers:
+            return headline_ticker_match.group(1)
+        return None
+    
+    def _analyze_sentiment_and_tickers(self, article: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Analyze sentiment and extract tickers from article with truncated content.
         
-        # Customize user prompt with headline ticker hint if available
-        user_prompt = f"""
-        Judul Berita: {headline}
-
-        Isi Berita: {content}
+        Args:
+            article (Dict[str, Any]): Article data including headline and content
+            
+        Returns:
+            Dict[str, Any]: Analysis data with sentiment and tickers
         """
+        headline = article.get("headline", "")
+        content = article.get("content", "")
         
+        # Extract tickers from headline if in format "XXXX: ..."
+        headline_ticker = self._headline_ticker(headline)
         if headline_ticker:
-            user_prompt += f"\n\nCatatan: Ticker {headline_ticker} ({self.ticker_company_map.get(headline_ticker, '')}) terdeteksi dalam judul berita dan kemungkinan besar relevan."
+            logger.debug("Found ticker %s in headline", headline_ticker)
         
-        user_prompt += "\n\nAnalisis sentimen dan ekstraksi ticker saham artikel berita keuangan ini dalam format JSON."
+        # Per-article hint goes after the article so the static prefix stays identical
+        note = None
+        if headline_ticker:
+            note = f"Catatan: Ticker {headline_ticker} ({self.ticker_company_map.get(headline_ticker, '')}) terdeteksi dalam judul berita dan kemungkinan besar relevan."
+        system_prompt, user_prompt = self.prompt_template.render(headline=headline, content=content, note=note)
         
         try:
             # Use a balanced temperature for analysis
@@ -177,14 +209,16 @@ class CombinedAnalysisService:
             return validated_data
             
         except Exception as e:
-            logger.error(f"Error in sentiment and ticker analysis: {str(e)}")
+            logger.error("Error in sentiment and ticker analysis: %s", e, extra={"event": "analysis_error"})
             # Return default values if analysis fails
             default_tickers = [headline_ticker] if headline_ticker else []
             return {
                 "sentiment": "neutral",
                 "confidence": 0.5,
                 "tickers": default_tickers,
-                "reasoning": "Error dalam proses analisis."
+                "reasoning": "Error dalam proses analisis.",
+                # Lets downstream consumers drop the placeholder neutral/0.5 label
+                "analysis_method": "failed"
             }
     
     def _validate_results(self, data: Dict[str, Any], headline_ticker: str = None) -> Dict[str, Any]:
@@ -202,14 +236,15 @@ class CombinedAnalysisService:
         
         # Validate sentiment
         if "sentiment" not in data or data["sentiment"].lower() not in SENTIMENT_OPTIONS:
-            logger.warning(f"Invalid sentiment value: {data.get('sentiment')}. Defaulting to 'neutral'.")
+            logger.warning("Invalid sentiment value: %s. Defaulting to 'neutral'.", data.get('sentiment'),
+                           extra={"event": "validation"})
             validated["sentiment"] = "neutral"
         else:
             validated["sentiment"] = data["sentiment"].lower()
         
         # Validate confidence
         if "confidence" not in data or not isinstance(data["confidence"], (int, float)):
-            logger.warning("Invalid confidence value. Defaulting to 0.5.")
+            logger.warning("Invalid confidence value. Defaulting to 0.5.", extra={"event": "validation"})
             validated["confidence"] = 0.5
         else:
             # Ensure confidence is between 0 and 1
@@ -217,7 +252,7 @@ class CombinedAnalysisService:
         
         # Validate tickers
         if "tickers" not in data or not isinstance(data["tickers"], list):
-            logger.warning("Invalid tickers value. Defaulting to empty list.")
+            logger.warning("Invalid tickers value. Defaulting to empty list.", extra={"event": "validation"})
             validated["tickers"] = []
         else:
             # Process tickers and keep only those that are valid
@@ -227,19 +262,19 @@ class CombinedAnalysisService:
                 if standardized in self.valid_tickers:
                     processed_tickers.append(standardized)
                 else:
-                    logger.warning(f"Removed invalid ticker: {standardized}")
+                    logger.warning("Removed invalid ticker: %s", standardized, extra={"event": "validation"})
             
             # Make sure headline ticker is included if it exists
             if headline_ticker and headline_ticker not in processed_tickers:
                 processed_tickers.insert(0, headline_ticker)
-                logger.info(f"Added headline ticker {headline_ticker} to results")
+                logger.debug("Added headline ticker %s to results", headline_ticker)
             
             # Limit to 5 tickers
             validated["tickers"] = processed_tickers[:5]
         
         # Validate reasoning
         if "reasoning" not in data or not isinstance(data["reasoning"], str):
-            logger.warning("Invalid reasoning. Defaulting to empty string.")
+            logger.warning("Invalid reasoning. Defaulting to empty string.", extra={"event": "validation"})
             validated["reasoning"] = ""
         else:
             validated["reasoning"] = data["reasoning"]
@@ -0,0 +1,112 @@
+"""
+Local extractive summarizer for financial news articles.
+Ranks sentences with TextRank over normalized Indonesian text and returns the
+top 1-3 sentences in their original order, without an LLM round trip.
+"""
+
+import math
+import re
+from collections import Counter
+from typing import List
+
+from config import EXTRACTIVE_MAX_SENTENCES
+
+# Dateline prefix of IQPlus articles, e.g. "Thursday 24/Aug/2023 at 14:16"
+DATELINE_PATTERN = re.compile(r'^\s*[A-Za-z]+\s+\d{1,2}/[A-Za-z]{3}/\d{4}\s+at\s+\d{1,2}:\d{2}\s*')
+# Sentence boundary: terminal punctuation followed by whitespace and an uppercase letter, digit or quote
+SENTENCE_PATTERN = re.compile(r'(?<=[.!?])\s+(?=["\'(]?[A-Z0-9])')
+# Abbreviations that end with a period but do not end a sentence
+ABBREVIATION_PATTERN = re.compile(r'\b(PT|Tbk|Rp|No|Jl|Dr|Ir|Prof|dll|dsb|yoy|qoq|mtd|ytd)\.$', re.IGNORECASE)
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+INDONESIAN_STOPWORDS = frozenset("""
+    ada adalah agar akan aku anda antara atas atau bagi bahwa baik banyak beberapa begitu belum
+    bisa dalam dan dapat dari demikian di dia dengan hal hanya harus hingga ia ini itu jika juga
+    kami kata ke kepada karena kita lain lalu lebih maka masih mereka namun oleh pada para per
+    pun saat sama saja sangat sebagai sebelum secara sedang sehingga sejak sekitar selama semua
+    sementara sendiri serta setelah siapa suatu sudah tahun tak tanpa telah tentang tersebut
+    tetapi tidak untuk yaitu yakni yang the and of to in for on at by with is are was were
+""".split())
+
+# TextRank parameters
+DAMPING = 0.85
+ITERATIONS = 30
+MIN_SENTENCE_WORDS = 5
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Split normalized article text into sentences.
+
+    Args:
+        text (str): Article content
+
+    Returns:
+        List[str]: Sentences in original order
+    """
+    text = DATELINE_PATTERN.sub('', text)
+    sentences = []
+    buffer = ""
+    for part in SENTENCE_PATTERN.split(text):
+        buffer = f"{buffer} {part}".strip() if buffer else part.strip()
+        # Merge back splits that happened right after an abbreviation such as "PT." or "Rp."
+        if ABBREVIATION_PATTERN.search(buffer):
+            continue
+        if buffer:
+            sentences.append(buffer)
+        buffer = ""
+    if buffer:
+        sentences.append(buffer)
+    return sentences
+
+
+def _tokens(sentence: str) -> Counter:
+    return Counter(token for token in TOKEN_PATTERN.findall(sentence.lower())
+                   if token not in INDONESIAN_STOPWORDS and len(token) > 1)
+
+
+def _cosine(a: Counter, b: Counter) -> float:
+    common = set(a) & set(b)
+    if not common:
+        return 0.0
+    dot = sum(a[token] * b[token] for token in common)
+    norm = math.sqrt(sum(v * v for v in a.values())) * math.sqrt(sum(v * v for v in b.values()))
+    return dot / norm if norm else 0.0
+
+
+def summarize(headline: str, content: str, max_sentences: int = EXTRACTIVE_MAX_SENTENCES) -> str:
+    """
+    Build an extractive summary of an article.
+
+    Args:
+        headline (str): Article headline, used when the content has no usable sentences
+        content (str): Normalized article content
+        max_sentences (int): Maximum number of sentences to keep
+
+    Returns:
+        str: The highest-ranked sentences joined in their original order
+    """
+    sentences = [s for s in split_sentences(content) if len(s.split()) >= MIN_SENTENCE_WORDS]
+    if not sentences:
+        return headline.strip()
+    if len(sentences) <= max_sentences:
+        return ' '.join(sentences)
+
+    # Similarity graph between sentences; the headline boosts sentences that restate it
+    vectors = [_tokens(s) for s in sentences]
+    headline_vector = _tokens(headline)
+    weights = [[_cosine(a, b) if i != j else 0.0 for j, b in enumerate(vectors)] for i, a in enumerate(vectors)]
+    out_sums = [sum(row) for row in weights]
+
+    n = len(sentences)
+    scores = [1.0 / n] * n
+    for _ in range(ITERATIONS):
+        scores = [
+            (1 - DAMPING) / n + DAMPING * sum(
+                weights[j][i] / out_sums[j] * scores[j] for j in range(n) if out_sums[j]
+            )
+            for i in range(n)
+        ]
+
+    ranked = sorted(range(n), key=lambda i: scores[i] * (1 + _cosine(vectors[i], headline_vector)), reverse=True)
+    return ' '.join(sentences[i] for i in sorted(ranked[:max_sentences]))
@@ -3,10 +3,6 @@ import requests
 import time
 import threading
 from typing import List, Dict, Any, Optional
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
-from queue import Queue, Empty
-import concurrent.futures
 
 from config import (
     LM_STUDIO_API_URL, 
@@ -17,30 +13,120 @@ from config import (
     REQUEST_TIMEOUT,
     MAX_RETRIES,
     RETRY_BACKOFF,
-    RETRY_DELAY
+    RETRY_DELAY,
+    RETRY_MAX_DELAY,
+    RETRY_BUDGET_RATIO,
+    RETRY_BUDGET_MIN,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    HEDGE_ENABLED,
+    HEDGE_DELAY,
+    LLM_STREAM
+)
+from services.resilience import (
+    RetryPolicy,
+    RetryBudget,
+    CircuitBreaker,
+    RetryBudgetExhausted,
+    hedged_call
 )
 from utils.logger import logger
 
+# HTTP status codes worth retrying; other 4xx responses are returned to the caller immediately
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+# Weight of the newest sample in the moving average of slot wait times
+WAIT_SMOOTHING = 0.3
+
 class APIRateLimiter:
     def __init__(self, max_concurrent_requests: int):
         self.semaphore = threading.Semaphore(max_concurrent_requests)
         self.active_requests = 0
+        self.waiting_requests = 0
+        self.average_wait = 0.0
         self.lock = threading.Lock()
     
     def __enter__(self):
         """Acquire the semaphore (wait if too many active requests)."""
+        with self.lock:
+            self.waiting_requests += 1
+        started = time.monotonic()
         self.semaphore.acquire()
+        waited = time.monotonic() - started
         with self.lock:
+            self.waiting_requests -= 1
             self.active_requests += 1
-            logger.debug(f"Active API requests: {self.active_requests}")
+            self.average_wait += WAIT_SMOOTHING * (waited - self.average_wait)
+            logger.debug("Active API requests: %d", self.active_requests)
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Release the semaphore when request is complete."""
         with self.lock:
             self.active_requests -= 1
-            logger.debug(f"Active API requests: {self.active_requests}")
+            logger.debug("Active API requests: %d", self.active_requests)
         self.semaphore.release()
+    
+    def acquire(self) -> None:
+        """Take a slot, waiting if necessary, without the context manager (used for hedged requests)."""
+        self.__enter__()
+    
+    def try_acquire(self) -> bool:
+        """Take a slot without waiting (used for hedged requests)."""
+        if not self.semaphore.acquire(blocking=False):
+            return False
+        with self.lock:
+            self.active_requests += 1
+        return True
+    
+    def release(self) -> None:
+        self.__exit__(None, None, None)
+
+class PromptTimingStats:
+    """Collects time-to-first-token and prompt-processing timings of streamed completions."""
+    
+    def __init__(self):
+        self.ttft = []
+        self.prompt_ms = []
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.lock = threading.Lock()
+    
+    def record(self, ttft: float, server_timings: Dict[str, Any]) -> None:
+        """
+        Record one request.
+        
+        Args:
+            ttft (float): Seconds from sending the request to the first content token
+            server_timings (Dict[str, Any]): Timings reported by the server in the final chunk, if any
+        """
+        with self.lock:
+            self.ttft.append(ttft)
+            if "prompt_ms" in server_timings:
+                self.prompt_ms.append(server_timings["prompt_ms"])
+            self.prompt_tokens += server_timings.get("prompt_tokens", 0)
+            self.cached_tokens += server_timings.get("cached_tokens", 0)
+    
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the recorded timings.
+        
+        Returns:
+            Dict[str, Any]: Request count, median/p95 TTFT, median prompt-processing time and prefix cache hit ratio
+        """
+        with self.lock:
+            ttft = sorted(self.ttft)
+            prompt_ms = sorted(self.prompt_ms)
+            prompt_tokens, cached_tokens = self.prompt_tokens, self.cached_tokens
+        if not ttft:
+            return {"requests": 0}
+        return {
+            "requests": len(ttft),
+            "ttft_p50": ttft[len(ttft) // 2],
+            "ttft_p95": ttft[min(len(ttft) - 1, int(len(ttft) * 0.95))],
+            "prompt_ms_p50": prompt_ms[len(prompt_ms) // 2] if prompt_ms else None,
+            "cache_hit_ratio": cached_tokens / prompt_tokens if prompt_tokens else None
+        }
 
 class LLMService:
     """Base service for interacting with the local LLM via HTTP API."""
@@ -52,17 +138,12 @@ class LLMService:
         self.temperature = TEMPERATURE
         self.rate_limiter = APIRateLimiter(MAX_CONCURRENT_REQUESTS)
         
-        # Create a session with retry capability
+        # Plain session: retries are handled once, below, by the resilience layer
         self.session = requests.Session()
-        retry_strategy = Retry(
-            total=MAX_RETRIES,
-            backoff_factor=RETRY_BACKOFF,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["POST"]
-        )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        self.retry_policy = RetryPolicy(MAX_RETRIES, RETRY_DELAY, RETRY_BACKOFF, RETRY_MAX_DELAY)
+        self.retry_budget = RetryBudget(RETRY_BUDGET_RATIO, RETRY_BUDGET_MIN)
+        self.circuit_breaker = CircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_TIMEOUT)
+        self.timing_stats = PromptTimingStats()
     
     def generate_completion(
         self, 
@@ -87,50 +168,152 @@ class LLMService:
             "max_tokens": max_tokens
         }
         
-        # Use rate limiter to limit concurrent requests
-        with self.rate_limiter:
+        self.retry_budget.record_request()
+        attempt = 0
+        while True:
+            # Fail fast while LM Studio is known to be down
+            self.circuit_breaker.before_call()
+            
+            # Hold a rate limiter slot only for the duration of the request itself
             try:
-                retry_count = 0
-                while retry_count <= MAX_RETRIES:
-                    try:
-                        logger.info("Sending request to LLM API")
-                        response = self.session.post(
-                            self.api_url,
-                            headers=self.headers,
-                            json=payload,
-                            timeout=REQUEST_TIMEOUT
-                        )
-                        
-                        response.raise_for_status()
-                        result = response.json()
-                        
-                        # Extract the content from the response
-                        if "choices" in result and len(result["choices"]) > 0:
-                            return result["choices"][0]["message"]["content"]
-                        else:
-                            logger.error(f"Unexpected API response structure: {result}")
-                            raise ValueError("Unexpected API response structure")
-                    
-                    except (requests.exceptions.RequestException, ValueError) as e:
-                        retry_count += 1
-                        if retry_count > MAX_RETRIES:
-                            logger.error(f"API request failed after {MAX_RETRIES} retries: {str(e)}")
-                            raise
-                        
-                        # Calculate exponential backoff delay
-                        delay = RETRY_DELAY * (RETRY_BACKOFF ** (retry_count - 1))
-                        logger.warning(f"API request failed, retrying in {delay:.1f} seconds (attempt {retry_count}/{MAX_RETRIES}): {str(e)}")
-                        time.sleep(delay)
-                
-                # This should not be reached due to the raise in the loop
-                raise Exception("Unexpected code flow in API request retry loop")
-                    
-            except requests.exceptions.RequestException as e:
-                logger.error(f"API request failed: {str(e)}")
-                raise Exception(f"Failed to get response from LLM API: {str(e)}")
-            except (KeyError, IndexError, json.JSONDecodeError) as e:
-                logger.error(f"Error processing API response: {str(e)}")
-                raise Exception(f"Error processing API response: {str(e)}")
+                if HEDGE_ENABLED:
+                    # hedged_call takes over the slot and releases it when the primary request
+                    # finishes, even if the hedge wins while the primary is still running
+                    self.rate_limiter.acquire()
+                    content = hedged_call(lambda: self._post(payload), HEDGE_DELAY,
+                                          self.rate_limiter.try_acquire, self.rate_limiter.release)
+                else:
+                    with self.rate_limiter:
+                        content = self._post(payload)
+                error = None
+            except (requests.exceptions.RequestException, ValueError, KeyError, IndexError) as e:
+                error = e
+            except BaseException:
+                # An unexpected error says nothing about the server, but must not keep the half-open trial taken
+                self.circuit_breaker.release_trial()
+                raise
+            
+            if error is None:
+                self.circuit_breaker.record_success()
+                return content
+            
+            if not self._is_retryable(error):
+                # The server answered, so this does not count against the circuit
+                self.circuit_breaker.record_success()
+                logger.error("API request failed with a non-retryable error: %s", error, extra={"event": "llm_error"})
+                raise Exception(f"Failed to get response from LLM API: {str(error)}")
+            
+            self.circuit_breaker.record_failure()
+            attempt += 1
+            if attempt > self.retry_policy.max_retries:
+                logger.error("API request failed after %d retries: %s", self.retry_policy.max_retries, error,
+                             extra={"event": "llm_error"})
+                raise Exception(f"Failed to get response from LLM API: {str(error)}")
+            if not self.retry_budget.try_withdraw():
+                logger.error("Retry budget exhausted, not retrying: %s", error, extra={"event": "llm_error"})
+                raise RetryBudgetExhausted(f"Retry budget exhausted: {str(error)}")
+            
+            # The slot is released while waiting, so other articles can use the API
+            delay = self.retry_policy.delay(attempt)
+            logger.warning("API request failed, retrying in %.1f seconds (attempt %d/%d): %s",
+                           delay, attempt, self.retry_policy.max_retries, error, extra={"event": "llm_retry"})
+            time.sleep(delay)
+    
+    def _post(self, payload: Dict[str, Any]) -> str:
+        """Send one chat completion request and return the message content."""
+        logger.info("Sending request to LLM API", extra={"event": "llm_request"})
+        if LLM_STREAM:
+            return self._post_streaming(payload)
+        response = self.session.post(
+            self.api_url,
+            headers=self.headers,
+            json=payload,
+            timeout=REQUEST_TIMEOUT
+        )
+        response.raise_for_status()
+        result = response.json()
+        
+        # Extract the content from the response
+        if "choices" in result and len(result["choices"]) > 0:
+            return result["choices"][0]["message"]["content"]
+        logger.error("Unexpected API response structure: %s", result, extra={"event": "llm_error"})
+        raise ValueError("Unexpected API response structure")
+    
+    def _post_streaming(self, payload: Dict[str, Any]) -> str:
+        """
+        Send a streamed chat completion request, recording time-to-first-token.
+        
+        Args:
+            payload (Dict[str, Any]): Chat completion request body
+            
+        Returns:
+            str: The concatenated message content
+        """
+        started = time.monotonic()
+        response = self.session.post(
+            self.api_url,
+            headers=self.headers,
+            json=dict(payload, stream=True, stream_options={"include_usage": True}),
+            timeout=REQUEST_TIMEOUT,
+            stream=True
+        )
+        response.raise_for_status()
+        
+        parts = []
+        ttft = None
+        server_timings = {}
+        with response:
+            for line in response.iter_lines():
+                if not line.startswith(b"data:"):
+                    continue
+                data = line[len(b"data:"):].strip()
+                if data == b"[DONE]":
+                    break
+                chunk = json.loads(data)
+                server_timings.update(self._server_timings(chunk))
+                for choice in chunk.get("choices") or []:
+                    content = (choice.get("delta") or {}).get("content")
+                    if content:
+                        if ttft is None:
+                            ttft = time.monotonic() - started
+                        parts.append(content)
+        
+        if ttft is None:
+            raise ValueError("Streamed response contained no content")
+        self.timing_stats.record(ttft, server_timings)
+        logger.debug("Time to first token: %.2fs, server timings: %s", ttft, server_timings, extra={"event": "llm_timing"})
+        return "".join(parts)
+    
+    def _server_timings(self, chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Extract prompt timings and token counts from a streamed chunk (llama.cpp, LM Studio or OpenAI style)."""
+        timings = {}
+        # llama.cpp server: {"timings": {"prompt_ms": ..., "prompt_n": ..., "cache_n": ...}}
+        if "timings" in chunk:
+            llama = chunk["timings"]
+            if "prompt_ms" in llama:
+                timings["prompt_ms"] = llama["prompt_ms"]
+            if "prompt_n" in llama:
+                timings["prompt_tokens"] = llama["prompt_n"] + llama.get("cache_n", 0)
+                timings["cached_tokens"] = llama.get("cache_n", 0)
+        # LM Studio: {"stats": {"time_to_first_token": seconds, ...}}
+        stats = chunk.get("stats") or {}
+        if "time_to_first_token" in stats:
+            timings["prompt_ms"] = stats["time_to_first_token"] * 1000
+        # OpenAI-compatible usage, sent with the last chunk when include_usage is set
+        usage = chunk.get("usage") or {}
+        if "prompt_tokens" in usage and "prompt_tokens" not in timings:
+            timings["prompt_tokens"] = usage["prompt_tokens"]
+            timings["cached_tokens"] = (usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+        return timings
+    
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, requests.exceptions.HTTPError) and error.response is not None:
+            return error.response.status_code in RETRYABLE_STATUS
+        return True
+    
+    def is_saturated(self, max_wait: float) -> bool:
+        """Return True when requests recently waited max_wait seconds or more, on average, for an API slot."""
+        return self.rate_limiter.average_wait >= max_wait
                 
     def shutdown(self):
         """Clean up resources when the service is no longer needed."""
@@ -0,0 +1,198 @@
+"""
+Local sentiment classifier used as the cheap first stage of the analysis cascade.
+A TF-IDF + logistic regression model trained on previous LLM results scores an
+article in milliseconds on CPU; only low-confidence articles are sent to the LLM.
+"""
+
+import os
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from config import (LOCAL_MODEL_PATH, LOCAL_MODEL_MAX_CHARS, MAX_CONTENT_LENGTH, MAX_HEADLINE_LENGTH,
+                    PRESERVE_END_CHARS, PRESERVE_START_CHARS, SENTIMENT_OPTIONS)
+from utils.logger import logger
+from utils.text_utils import normalize_text, truncate_text
+
+try:
+    import joblib
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+except ImportError:  # scikit-learn is optional; without it every article goes to the LLM
+    joblib = None
+
+
+def build_text(headline: str, content: str) -> str:
+    """
+    Build the classifier input from a prepared headline and article content.
+
+    Args:
+        headline (str): Normalized, truncated article headline
+        content (str): Normalized, truncated article content
+
+    Returns:
+        str: Lowercased text with the headline first
+    """
+    return f"{headline} {content[:LOCAL_MODEL_MAX_CHARS]}".lower()
+
+
+def raw_article_text(headline: str, content: str) -> str:
+    """
+    Build the classifier input from a raw article, preparing it the way main.py does before the cascade.
+
+    Args:
+        headline (str): Raw article headline
+        content (str): Raw article content
+
+    Returns:
+        str: Same text classify() scores at runtime for this article
+    """
+    content = truncate_text(normalize_text(content), MAX_CONTENT_LENGTH, PRESERVE_START_CHARS, PRESERVE_END_CHARS)
+    headline = truncate_text(normalize_text(headline), MAX_HEADLINE_LENGTH, MAX_HEADLINE_LENGTH, 0)
+    return build_text(headline, content)
+
+
+class LocalSentimentClassifier:
+    """TF-IDF + linear classifier trained on labeled LLM results."""
+
+    def __init__(self, model_path: str = LOCAL_MODEL_PATH):
+        self.model_path = model_path
+        self.model = None
+
+    @property
+    def available(self) -> bool:
+        return self.model is not None
+
+    def load(self) -> bool:
+        """
+        Load a trained model from disk.
+
+        Returns:
+            bool: True if the model was loaded and can be used
+        """
+        if joblib is None:
+            logger.warning("scikit-learn/joblib not installed; local sentiment cascade disabled")
+            return False
+        if not os.path.exists(self.model_path):
+            logger.warning("Local sentiment model not found at %s; run train_local_model.py", self.model_path)
+            return False
+        self.model = joblib.load(self.model_path)
+        logger.info("Loaded local sentiment model from %s", self.model_path)
+        return True
+
+    def train(self, texts: List[str], labels: List[str]) -> None:
+        """
+        Fit a new model on the given texts and sentiment labels.
+
+        Args:
+            texts (List[str]): Inputs built with build_text
+            labels (List[str]): Sentiment labels from the LLM
+        """
+        if joblib is None:
+            raise RuntimeError("scikit-learn and joblib are required to train the local model")
+        self.model = Pipeline([
+            ("tfidf", TfidfVectorizer(ngram_range=(1, 2), min_df=2, sublinear_tf=True, max_features=50000)),
+            ("clf", LogisticRegression(max_iter=1000, class_weight="balanced")),
+        ])
+        self.model.fit(texts, labels)
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.model_path), exist_ok=True)
+        joblib.dump(self.model, self.model_path)
+        logger.info("Saved local sentiment model to %s", self.model_path)
+
+    def predict(self, texts: List[str]) -> List[Tuple[str, float]]:
+        """
+        Score texts with the local model.
+
+        Args:
+            texts (List[str]): Inputs built with build_text
+
+        Returns:
+            List[Tuple[str, float]]: (sentiment, confidence) per text, confidence being the class probability
+        """
+        probabilities = self.model.predict_proba(texts)
+        classes = list(self.model.classes_)
+        predictions = []
+        for row in probabilities:
+            best = int(row.argmax())
+            predictions.append((str(classes[best]), float(row[best])))
+        return predictions
+
+    def classify(self, headline: str, content: str) -> Tuple[str, float]:
+        return self.predict([build_text(headline, content)])[0]
+
+
+class LocalTickerMatcher:
+    """Match IDX tickers in an article without an LLM call."""
+
+    def __init__(self, ticker_company_map: Dict[str, str]):
+        self.valid_tickers = set(ticker_company_map)
+        # Company names without the legal suffix, e.g. "Bank Rakyat Indonesia"
+        self.company_patterns = []
+        for ticker, company in ticker_company_map.items():
+            name = re.sub(r"\s+(\(Persero\)\s+)?T(bk?)?\.?$", "", company.strip(), flags=re.IGNORECASE)
+            if len(name) >= 6:
+                self.company_patterns.append((ticker, re.compile(r"\b" + re.escape(name) + r"\b", re.IGNORECASE)))
+
+    def match(self, headline: str, content: str, headline_ticker: Optional[str] = None, limit: int = 5) -> List[str]:
+        """
+        Find tickers mentioned in an article.
+
+        Args:
+            headline (str): Article headline
+            content (str): Article content
+            headline_ticker (str, optional): Ticker already found in the "XXXX: ..." headline prefix
+            limit (int): Maximum number of tickers to return
+
+        Returns:
+            List[str]: Tickers in order of first appearance, headline ticker first
+        """
+        text = f"{headline}\n{content}"
+        found = {}
+        # Headlines are usually all caps, so bare symbols are only trusted in the body
+        offset = len(headline) + 1
+        for match in re.finditer(r"\b[A-Z]{4}\b", content):
+            if match.group(0) in self.valid_tickers:
+                found.setdefault(match.group(0), offset + match.start())
+        for ticker, pattern in self.company_patterns:
+            match = pattern.search(text)
+            if match:
+                found[ticker] = min(found.get(ticker, match.start()), match.start())
+
+        tickers = sorted(found, key=found.get)
+        if headline_ticker:
+            tickers = [headline_ticker] + [t for t in tickers if t != headline_ticker]
+        return tickers[:limit]
+
+
+def labeled_examples(results: Iterable[Dict[str, Any]],
+                     articles: Iterable[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+    """
+    Extract training texts and labels from analysis.json results.
+
+    The text is the article headline + content, matched by headline from the raw articles,
+    so the model is trained and evaluated on the same input classify() sees at runtime.
+
+    Args:
+        results (Iterable[Dict[str, Any]]): Entries of the "results" list in analysis.json
+        articles (Iterable[Dict[str, Any]]): Raw articles (data/news.json) the results were produced from
+
+    Returns:
+        Tuple[List[str], List[str]]: Texts (headline + content) and LLM sentiment labels
+    """
+    content_by_headline = {article.get("headline", ""): article.get("content") or "" for article in articles}
+    texts, labels = [], []
+    for result in results:
+        # Skip articles that failed processing or LLM analysis; their sentiment is a placeholder
+        if result.get("error") or result.get("sentiment") not in SENTIMENT_OPTIONS:
+            continue
+        # Labels from the local model itself would teach it its own predictions
+        if result.get("analysis_method") in ("local", "failed"):
+            continue
+        headline = result.get("headline", "")
+        if headline not in content_by_headline:
+            continue
+        texts.append(raw_article_text(headline, content_by_headline[headline]))
+        labels.append(result["sentiment"])
+    return texts, labels
@@ -0,0 +1,184 @@
+"""
+Prompt templates for the LLM services.
+Templates are compiled once: the instructions (and the ticker reference) form a
+byte-identical static prefix, and the per-article payload is appended last, so
+the inference server can reuse its prompt cache across articles.
+"""
+
+import json
+import re
+import textwrap
+from typing import Dict, Optional, Tuple
+
+BLANK_LINES_PATTERN = re.compile(r'\n{3,}')
+TRAILING_SPACE_PATTERN = re.compile(r'[ \t]+\n')
+
+
+def canonicalize(text: str) -> str:
+    """
+    Canonicalize whitespace of a prompt fragment.
+
+    Args:
+        text (str): Prompt text, possibly indented as a triple-quoted literal
+
+    Returns:
+        str: Dedented text without trailing spaces and with at most one blank line in a row
+    """
+    text = textwrap.dedent(text).strip()
+    text = TRAILING_SPACE_PATTERN.sub('\n', text)
+    return BLANK_LINES_PATTERN.sub('\n\n', text)
+
+
+class PromptTemplate:
+    """A static system prompt and user-message prefix followed by a per-article payload."""
+
+    def __init__(self, system: str, instruction: str, payload: str):
+        """
+        Compile a template.
+
+        Args:
+            system (str): System prompt; must not vary between articles
+            instruction (str): Static start of the user message, sent before the article
+            payload (str): Format string for the per-article part, e.g. "Judul: {headline}"
+        """
+        self.system_prompt = canonicalize(system)
+        self.user_prefix = canonicalize(instruction) + "\n\n"
+        self.payload = canonicalize(payload)
+
+    def render(self, note: Optional[str] = None, **fields: str) -> Tuple[str, str]:
+        """
+        Build the messages for one article.
+
+        Args:
+            note (str, optional): Per-article hint appended after the payload
+            **fields (str): Values for the payload placeholders
+
+        Returns:
+            Tuple[str, str]: System prompt and user prompt
+        """
+        # Article text is whitespace-normalized too, so identical articles give identical prompts
+        values = {key: ' '.join(str(value).split()) for key, value in fields.items()}
+        user_prompt = self.user_prefix + self.payload.format(**values)
+        if note:
+            user_prompt += "\n\n" + note
+        return self.system_prompt, user_prompt
+
+
+SENTIMENT_TICKER_SYSTEM = """
+    You are a professional financial analyst specializing in Indonesian financial news. Perform the following two tasks based on the article content:
+
+    1. SENTIMENT ANALYSIS:
+    - Classify the sentiment as "positive", "neutral", or "negative"
+    - Provide a confidence score as a float between 0.0 and 1.0
+
+    2. TICKER EXTRACTION:
+    - Identify up to 5 Indonesian stock tickers (IDX-listed) that are either explicitly mentioned or strongly implied based on the headline or content
+    - Only include official ticker symbols listed on the Indonesia Stock Exchange (IDX)
+    - If you see a ticker format at the beginning of the headline (like "XXXX: ..."), prioritize this ticker
+    - Below is a partial list of valid IDX ticker symbols with their company names:
+      {ticker_reference}
+    - Provide a brief explanation (in Bahasa Indonesia) for why each ticker is relevant to the article
+    - DO NOT hallucinate or make up ticker symbols that are not in the IDX listing
+
+    Output format:
+    Return only a JSON object with the following structure:
+    {
+    "sentiment": "positive" | "neutral" | "negative",
+    "confidence": 0.0-1.0,
+    "tickers": ["BBCA", "TLKM"],
+    "reasoning": "BBCA disebutkan secara eksplisit terkait kinerja keuangan kuartalan, sementara TLKM relevan karena kerjasama strategis dalam proyek digitalisasi."
+    }
+
+    - Do not invent tickers that are not valid in the IDX or not in the provided reference.
+    - If there are no relevant tickers, return an empty array: "tickers": [], and explain accordingly in the reasoning.
+    - Ensure all text in "reasoning" is written in Bahasa Indonesia.
+"""
+
+SUMMARY_SYSTEM = """
+    You are a financial news editor who specializes in creating concise, informative summaries.
+    Your task is to summarize the given financial news article in 1-3 sentences, focusing on:
+
+    1. The key financial or market implications
+    2. Specific impacts on companies, sectors, or the broader economy
+    3. Any numerical data points that are significant (revenue, growth, market size, etc.)
+    4. Potential future implications for investors
+
+    CRITICAL FORMATTING REQUIREMENTS:
+    - Write ONLY 1-3 complete sentences in Bahasa Indonesia
+    - Do NOT include ANY thinking, reasoning or meta-commentary
+    - Do NOT use <think> tags or ANY other tags
+    - Do NOT include phrases like "Berikut ringkasannya:" or any other introduction
+    - NEVER explain your process or reasoning
+    - Start your response immediately with the first sentence of the summary
+
+    Your summary should be factual, concise, and focused on the financial aspects.
+    Do not include personal opinions or recommendations to buy/sell securities.
+
+    Example of the EXACT format required:
+    "Apple mengumumkan pendapatan kuartalan yang lebih tinggi dari ekspektasi analis, didorong oleh penjualan iPhone yang kuat. Perusahaan melaporkan pendapatan sebesar $123 miliar, naik 10% dibandingkan tahun lalu."
+"""
+
+SENTIMENT_SYSTEM = """
+    You are a financial analyst expert at determining market sentiment from news articles.
+    Analyze the given article for its potential impact on the stock market or on specific companies.
+    You must classify the sentiment as one of: "positive", "neutral", or "negative".
+    Also provide a confidence score from 0.0 to 1.0, where:
+    - 0.0-0.3 means low confidence in your assessment
+    - 0.4-0.7 means moderate confidence
+    - 0.8-1.0 means high confidence
+
+    Return ONLY a JSON object with two fields:
+    - "sentiment": "positive", "neutral", or "negative"
+    - "confidence": a float between 0.0 and 1.0
+
+    For example: {"sentiment": "positive", "confidence": 0.85}
+"""
+
+SUMMARY_TEMPLATE = PromptTemplate(
+    system=SUMMARY_SYSTEM,
+    instruction="""
+        Create a 1-3 sentence financial summary of the article below in Bahasa Indonesia.
+        ONLY include the final summary without ANY commentary or <think> tags.
+    """,
+    payload="""
+        Headline: {headline}
+
+        Content: {content}
+    """
+)
+
+SENTIMENT_TEMPLATE = PromptTemplate(
+    system=SENTIMENT_SYSTEM,
+    instruction="""
+        Analyze the sentiment of the financial news below and return only the JSON with sentiment and confidence.
+    """,
+    payload="""
+        Headline: {headline}
+
+        Content: {content}
+    """
+)
+
+
+def sentiment_ticker_template(ticker_company_map: Dict[str, str]) -> PromptTemplate:
+    """
+    Compile the combined sentiment and ticker extraction template.
+
+    Args:
+        ticker_company_map (Dict[str, str]): Ticker to company name mapping
+
+    Returns:
+        PromptTemplate: Template whose system prompt embeds a fixed ticker reference
+    """
+    # The first 50 items (in file order) keep the reference, and therefore the prefix, stable
+    ticker_reference = dict(list(ticker_company_map.items())[:50])
+    ticker_json = json.dumps(ticker_reference, ensure_ascii=False)
+    return PromptTemplate(
+        system=SENTIMENT_TICKER_SYSTEM.replace("{ticker_reference}", ticker_json),
+        instruction="Analisis sentimen dan ekstraksi ticker saham artikel berita keuangan berikut dalam format JSON.",
+        payload="""
+            Judul Berita: {headline}
+
+            Isi Berita: {content}
+        """
+    )
@@ -0,0 +1,176 @@
+"""
+Resilience primitives for calls to the local LLM API.
+One retry policy with jittered exponential backoff, a retry budget shared by the
+whole run, a circuit breaker that fails fast while the server is down, and
+optional hedged requests for tail-latency outliers.
+"""
+
+import random
+import threading
+import time
+import concurrent.futures
+from typing import Callable, Optional, TypeVar
+
+from utils.logger import logger
+
+T = TypeVar("T")
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit breaker is open."""
+
+
+class RetryBudgetExhausted(Exception):
+    """Raised when a failed call cannot be retried because the run's retry budget is spent."""
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter."""
+
+    def __init__(self, max_retries: int, base_delay: float, multiplier: float, max_delay: float):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.multiplier = multiplier
+        self.max_delay = max_delay
+
+    def delay(self, retry_number: int) -> float:
+        """
+        Delay before the given retry (1-based).
+
+        Args:
+            retry_number (int): Which retry is about to happen
+
+        Returns:
+            float: Seconds to wait, drawn uniformly from [0, capped exponential delay]
+        """
+        ceiling = min(self.max_delay, self.base_delay * (self.multiplier ** (retry_number - 1)))
+        return random.uniform(0, ceiling)
+
+
+class RetryBudget:
+    """
+    Limits retries to a fraction of all requests in a run.
+
+    Every request deposits `ratio` tokens and every retry withdraws one, with
+    `min_retries` available from the start. When LM Studio is struggling this
+    keeps retries from multiplying the load.
+    """
+
+    def __init__(self, ratio: float, min_retries: int):
+        self.ratio = ratio
+        self.tokens = float(min_retries)
+        self.lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self.lock:
+            self.tokens += self.ratio
+
+    def try_withdraw(self) -> bool:
+        with self.lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures; after
+    `reset_timeout` seconds one trial call is let through (half-open), and its
+    outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if the call should not be attempted."""
+        with self.lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at < self.reset_timeout or self.trial_in_flight:
+                raise CircuitOpenError("LLM API circuit breaker is open")
+            # Half-open: let exactly one trial call through
+            self.trial_in_flight = True
+
+    def record_success(self) -> None:
+        with self.lock:
+            if self.opened_at is not None:
+                logger.info("LLM API circuit breaker closed")
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """End a half-open trial that neither succeeded nor failed, so a later call can try again."""
+        with self.lock:
+            self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self.lock:
+            self.failures += 1
+            # A failed half-open trial re-opens the circuit for another reset_timeout
+            if self.trial_in_flight or (self.opened_at is None and self.failures >= self.failure_threshold):
+                logger.warning("LLM API circuit breaker opened after %d consecutive failures", self.failures)
+                self.opened_at = time.monotonic()
+                self.trial_in_flight = False
+
+
+def hedged_call(call: Callable[[], T], hedge_delay: float, acquire_slot: Callable[[], bool],
+                release_slot: Callable[[], None]) -> T:
+    """
+    Run `call`, and if it has not finished after `hedge_delay` seconds start a
+    second identical call; the first one to succeed wins.
+
+    The caller must already hold one concurrency slot for the primary call and
+    hands it over: every slot is released when its own call finishes, so a losing
+    request that is still running keeps its slot until it completes.
+
+    Args:
+        call (Callable[[], T]): The request to perform
+        hedge_delay (float): Seconds to wait before hedging
+        acquire_slot (Callable[[], bool]): Non-blocking acquisition of a concurrency slot for the hedge
+        release_slot (Callable[[], None]): Releases one slot
+
+    Returns:
+        T: Result of the first call that succeeds
+    """
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+    try:
+        try:
+            primary = executor.submit(call)
+        except BaseException:
+            release_slot()
+            raise
+        primary.add_done_callback(lambda _: release_slot())
+        done, _ = concurrent.futures.wait([primary], timeout=hedge_delay)
+        # Only hedge when a spare slot is available, so hedging never exceeds the concurrency limit
+        if done or not acquire_slot():
+            return primary.result()
+
+        logger.info("LLM request exceeded %.0fs, sending hedged request", hedge_delay)
+        try:
+            hedge = executor.submit(call)
+        except BaseException:
+            release_slot()
+            raise
+        hedge.add_done_callback(lambda _: release_slot())
+
+        pending = {primary, hedge}
+        error: Optional[BaseException] = None
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+        raise error
+    finally:
+        # Do not wait for the losing request; its result is discarded and its slot
+        # is released by its done-callback once the request actually finishes
+        executor.shutdown(wait=False)
@@ -7,6 +7,7 @@ import json
 from typing import Dict, Any, Tuple
 
 from services.llm_service import LLMService
+from services.prompt_templates import SENTIMENT_TEMPLATE
 from config import SENTIMENT_OPTIONS, CONFIDENCE_THRESHOLD
 from utils.logger import logger
 
@@ -35,30 +36,7 @@ class SentimentService:
         headline = article.get("headline", "")
         content = article.get("content", "")
         
-        # Create a prompt for sentiment analysis
-        system_prompt = """
-        You are a financial analyst expert at determining market sentiment from news articles.
-        Analyze the given article for its potential impact on the stock market or on specific companies.
-        You must classify the sentiment as one of: "positive", "neutral", or "negative".
-        Also provide a confidence score from 0.0 to 1.0, where:
-        - 0.0-0.3 means low confidence in your assessment
-        - 0.4-0.7 means moderate confidence
-        - 0.8-1.0 means high confidence
-        
-        Return ONLY a JSON object with two fields:
-        - "sentiment": "positive", "neutral", or "negative"
-        - "confidence": a float between 0.0 and 1.0
-        
-        For example: {"sentiment": "positive", "confidence": 0.85}
-        """
-        
-        user_prompt = f"""
-        Headline: {headline}
-        
-        Content: {content}
-        
-        Analyze the sentiment of this financial news and return only the JSON with sentiment and confidence.
-        """
+        system_prompt, user_prompt = SENTIMENT_TEMPLATE.render(headline=headline, content=content)
         
         try:
             # Use a cooler temperature for more consistent results
@@ -82,7 +60,7 @@ class SentimentService:
             
             # Validate the sentiment
             if "sentiment" not in sentiment_data or sentiment_data["sentiment"].lower() not in SENTIMENT_OPTIONS:
-                logger.warning(f"Invalid sentiment value: {sentiment_data.get('sentiment')}. Defaulting to 'neutral'.")
+                logger.warning("Invalid sentiment value: %s. Defaulting to 'neutral'.", sentiment_data.get("sentiment"))
                 sentiment_data["sentiment"] = "neutral"
             
             # Validate the confidence
@@ -96,6 +74,6 @@ class SentimentService:
             return sentiment_data
             
         except Exception as e:
-            logger.error(f"Error analyzing sentiment: {str(e)}")
+            logger.error("Error analyzing sentiment: %s", e)
             # Return default values if analysis fails
             return {"sentiment": "neutral", "confidence": 0.5}
\ No newline at end of file
@@ -5,9 +5,13 @@ Generates concise, financially-focused summaries of articles.
 
 import json
 import re
-from typing import Dict, Any
+import time
+from typing import Dict, Any, Optional
 
 from services.llm_service import LLMService
+from services.extractive_summarizer import summarize as extractive_summary
+from services.prompt_templates import SUMMARY_TEMPLATE
+from config import SHORT_ARTICLE_WORDS, LLM_QUEUE_MAX_WAIT
 from utils.logger import logger
 
 class SummarizerService:
@@ -22,52 +26,43 @@ class SummarizerService:
         """
         self.llm_service = llm_service
     
-    def generate_summary(self, article: Dict[str, Any]) -> str:
+    def generate_summary(self, article: Dict[str, Any], deadline: Optional[float] = None) -> Dict[str, str]:
         """
         Generate a financially focused summary of a news article.
         
+        Uses the LLM unless the article is very short, the per-article deadline has
+        passed, or the LLM queue is saturated; then a local extractive summary is used.
+        
         Args:
             article (Dict[str, Any]): Article data with headline and content
+            deadline (float, optional): time.monotonic() value after which the LLM is skipped
             
         Returns:
-            str: Concise financial summary of the article
+            Dict[str, str]: "summary" text and "summary_method" ("llm" or "extractive")
         """
         headline = article.get("headline", "")
         content = article.get("content", "")
         
-        # Create a prompt for summarization
-        system_prompt = """
-        You are a financial news editor who specializes in creating concise, informative summaries.
-        Your task is to summarize the given financial news article in 1-3 sentences, focusing on:
-        
-        1. The key financial or market implications
-        2. Specific impacts on companies, sectors, or the broader economy
-        3. Any numerical data points that are significant (revenue, growth, market size, etc.)
-        4. Potential future implications for investors
-        
-        CRITICAL FORMATTING REQUIREMENTS:
-        - Write ONLY 1-3 complete sentences in Bahasa Indonesia
-        - Do NOT include ANY thinking, reasoning or meta-commentary
-        - Do NOT use <think> tags or ANY other tags
-        - Do NOT include phrases like "Berikut ringkasannya:" or any other introduction
-        - NEVER explain your process or reasoning
-        - Start your response immediately with the first sentence of the summary
-        
-        Your summary should be factual, concise, and focused on the financial aspects.
-        Do not include personal opinions or recommendations to buy/sell securities.
-        
-        Example of the EXACT format required:
-        "Apple mengumumkan pendapatan kuartalan yang lebih tinggi dari ekspektasi analis, didorong oleh penjualan iPhone yang kuat. Perusahaan melaporkan pendapatan sebesar $123 miliar, naik 10% dibandingkan tahun lalu."
-        """
+        # Load shedding: cheap local summary instead of waiting for the LLM
+        if len(content.split()) < SHORT_ARTICLE_WORDS:
+            return self._extractive(headline, content, "short article")
+        if deadline is not None and time.monotonic() >= deadline:
+            return self._extractive(headline, content, "article deadline passed")
+        if self.llm_service.is_saturated(LLM_QUEUE_MAX_WAIT):
+            return self._extractive(headline, content, "LLM queue saturated")
         
-        user_prompt = f"""
-        Headline: {headline}
-        
-        Content: {content}
-        
-        Create a 1-3 sentence financial summary of this article in Bahasa Indonesia.
-        ONLY include the final summary without ANY commentary or <think> tags.
-        """
+        summary = self._llm_summary(headline, content)
+        if summary is None:
+            # Fall back to a local summary if generation fails
+            return self._extractive(headline, content, "LLM error")
+        return {"summary": summary, "summary_method": "llm"}
+    
+    def _extractive(self, headline: str, content: str, reason: str) -> Dict[str, str]:
+        logger.info("Using extractive summary (%s)", reason, extra={"event": "extractive_summary"})
+        return {"summary": extractive_summary(headline, content), "summary_method": "extractive"}
+    
+    def _llm_summary(self, headline: str, content: str) -> Optional[str]:
+        system_prompt, user_prompt = SUMMARY_TEMPLATE.render(headline=headline, content=content)
         
         try:
             # Use low temperature for more deterministic output
@@ -125,6 +120,5 @@ class SummarizerService:
             return summary
             
         except Exception as e:
-            logger.error(f"Error generating summary: {str(e)}")
-            # Return a minimal summary if generation fails
-            return f"Artikel tentang: {headline}"
\ No newline at end of file
+            logger.error("Error generating summary: %s", e, extra={"event": "summary_error"})
+            return None
\ No newline at end of file
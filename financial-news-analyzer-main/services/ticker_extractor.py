@@ -79,7 +79,7 @@ class TickerExtractorService:
             return ticker_data
             
         except Exception as e:
-            logger.error(f"Error extracting tickers: {str(e)}")
+            logger.error("Error extracting tickers: %s", e)
             # Return default values if extraction fails
             return {"tickers": [], "reasoning": "Error in ticker extraction process."}
     
@@ -0,0 +1,354 @@
+"""
+Distributed news analysis as a Spark job.
+Articles are read as a DataFrame, normalized and matched to tickers with
+vectorized pandas UDFs, then analyzed partition by partition with one
+CombinedAnalysisService (and one pooled HTTP session) per Python worker.
+"""
+
+import argparse
+import hashlib
+import json
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator
+
+import pandas as pd
+from pymongo import MongoClient, UpdateOne
+from pyspark.sql import SparkSession, Row
+from pyspark.sql import functions as F
+from pyspark.sql import types as T
+from pyspark.sql.functions import pandas_udf
+
+from config import (
+    BASE_DIR,
+    DATA_DIR,
+    MAX_CONCURRENT_REQUESTS,
+    MAX_CONTENT_LENGTH,
+    MAX_HEADLINE_LENGTH,
+    PRESERVE_START_CHARS,
+    PRESERVE_END_CHARS,
+    ARTICLE_DEADLINE_SECONDS,
+    NEWS_MONGO_URI,
+    NEWS_DATABASE,
+    NEWS_COLLECTION
+)
+from interfaces.news_store import ensure_indexes, refresh_daily_counts
+from utils.text_utils import extract_effective_date
+
+TRUNCATION_MARKER = "... [CONTENT TRUNCATED] ..."
+
+# Upserts per bulk_write call when writing results to MongoDB
+WRITE_BATCH_SIZE = 500
+
+RESULT_SCHEMA = T.StructType([
+    T.StructField("doc_key", T.StringType()),
+    T.StructField("headline", T.StringType()),
+    T.StructField("effective_date", T.StringType()),
+    T.StructField("sentiment", T.StringType()),
+    T.StructField("confidence", T.DoubleType()),
+    T.StructField("tickers", T.ArrayType(T.StringType())),
+    T.StructField("reasoning", T.StringType()),
+    T.StructField("summary", T.StringType()),
+    T.StructField("summary_method", T.StringType()),
+    T.StructField("analysis_method", T.StringType()),
+    T.StructField("error", T.StringType()),
+])
+
+# Per-Python-worker singletons; Spark reuses worker processes across tasks
+_analysis_service = None
+_ticker_matcher = None
+
+
+def normalize_series(text: pd.Series) -> pd.Series:
+    """
+    Vectorized equivalent of utils.text_utils.normalize_text.
+
+    Args:
+        text (pd.Series): Raw headlines or contents
+
+    Returns:
+        pd.Series: Whitespace-collapsed text without HTML tags
+    """
+    text = text.fillna("")
+    text = text.str.replace(r'\s+', ' ', regex=True)
+    text = text.str.replace(r'<[^>]+>', '', regex=True)
+    return text.str.strip()
+
+
+def truncate_series(text: pd.Series, max_length: int, preserve_start: int, preserve_end: int) -> pd.Series:
+    """
+    Vectorized equivalent of utils.text_utils.truncate_text.
+
+    Args:
+        text (pd.Series): Normalized text
+        max_length (int): Texts longer than this are truncated
+        preserve_start (int): Characters kept from the beginning
+        preserve_end (int): Characters kept from the end
+
+    Returns:
+        pd.Series: Text with the middle replaced by a truncation marker where needed
+    """
+    if preserve_start + preserve_end >= max_length:
+        preserve_end = max(0, max_length - preserve_start)
+    too_long = text.str.len() > max_length
+    end_part = text.str[-preserve_end:] if preserve_end > 0 else ""
+    truncated = text.str[:preserve_start] + TRUNCATION_MARKER + end_part
+    return text.where(~too_long, truncated)
+
+
+@pandas_udf(T.StringType())
+def normalize_udf(text: pd.Series) -> pd.Series:
+    return normalize_series(text)
+
+
+@pandas_udf(T.StringType())
+def truncate_content_udf(content: pd.Series) -> pd.Series:
+    return truncate_series(content, MAX_CONTENT_LENGTH, PRESERVE_START_CHARS, PRESERVE_END_CHARS)
+
+
+@pandas_udf(T.StringType())
+def truncate_headline_udf(headline: pd.Series) -> pd.Series:
+    return truncate_series(headline, MAX_HEADLINE_LENGTH, MAX_HEADLINE_LENGTH, 0)
+
+
+@pandas_udf(T.ArrayType(T.StringType()))
+def match_tickers_udf(headline: pd.Series, content: pd.Series) -> pd.Series:
+    matcher = ticker_matcher()
+    # "XXXX: ..." headline prefix, kept only when it is a valid ticker
+    prefix = headline.str.extract(r'^([A-Z]{4}):', expand=False)
+    prefix = prefix.where(prefix.isin(matcher.valid_tickers))
+    return pd.Series([
+        matcher.match(h, c, p if isinstance(p, str) else None)
+        for h, c, p in zip(headline, content, prefix)
+    ])
+
+
+@pandas_udf(T.StringType())
+def effective_date_udf(published_at: pd.Series, content: pd.Series) -> pd.Series:
+    return pd.Series([
+        extract_effective_date({"published_at": p, "content": c}).isoformat()
+        for p, c in zip(published_at.fillna(""), content.fillna(""))
+    ])
+
+
+def ticker_matcher():
+    """Return this worker's LocalTickerMatcher, loading the ticker reference once."""
+    global _ticker_matcher
+    if _ticker_matcher is None:
+        from services.local_classifier import LocalTickerMatcher
+        with open(DATA_DIR / "ticker_company.json", "r", encoding="utf-8") as f:
+            _ticker_matcher = LocalTickerMatcher(json.load(f))
+    return _ticker_matcher
+
+
+def analysis_service():
+    """Return this worker's CombinedAnalysisService, sharing one LLM client and HTTP session."""
+    global _analysis_service
+    if _analysis_service is None:
+        from services.llm_service import LLMService
+        from services.combined_analysis_service import CombinedAnalysisService
+        _analysis_service = CombinedAnalysisService(LLMService())
+    return _analysis_service
+
+
+def document_key(headline: str, published_at: str) -> str:
+    """Stable doc_key so re-running the job replaces documents instead of duplicating them."""
+    return hashlib.sha1(f"{headline}|{published_at}".encode("utf-8")).hexdigest()
+
+
+def analyze_partition(rows: Iterator[Row]) -> Iterator[Dict[str, Any]]:
+    """
+    Analyze the articles of one partition with the worker's shared service.
+
+    Args:
+        rows (Iterator[Row]): Prepared articles
+
+    Yields:
+        Dict[str, Any]: One result per article, in the analysis.json result format plus doc_key
+    """
+    service = analysis_service()
+    for row in rows:
+        deadline = time.monotonic() + ARTICLE_DEADLINE_SECONDS
+        result = {
+            "doc_key": document_key(row.headline, row.published_at),
+            "headline": row.headline,
+            "effective_date": row.effective_date,
+            "error": None
+        }
+        try:
+            analysis_data = service.analyze_article({
+                "headline": row.headline_truncated,
+                "content": row.content_truncated,
+                "original_content": row.content_normalized,
+                "original_headline": row.headline_normalized,
+                # Already matched by the pandas UDF; used when the local classifier answers
+                "matched_tickers": list(row.matched_tickers or [])
+            }, deadline)
+        except Exception as e:
+            result.update({
+                "sentiment": "neutral",
+                "confidence": 0.0,
+                "tickers": list(row.matched_tickers or []),
+                "reasoning": "Processing error",
+                "summary": "Article could not be processed",
+                "summary_method": None,
+                "analysis_method": None,
+                "error": f"Failed to process: {str(e)}"
+            })
+            yield result
+            continue
+
+        result.update({
+            "sentiment": analysis_data.get("sentiment", "neutral"),
+            "confidence": float(analysis_data.get("confidence", 0.5)),
+            "tickers": analysis_data.get("tickers", []),
+            "reasoning": analysis_data.get("reasoning", ""),
+            "summary": analysis_data.get("summary", ""),
+            "summary_method": analysis_data.get("summary_method", "llm"),
+            "analysis_method": analysis_data.get("analysis_method", "llm")
+        })
+        yield result
+
+
+def read_articles(spark: SparkSession, source: str, mongo_collection: str = None):
+    """
+    Read raw articles from a JSON/Parquet file or a MongoDB collection.
+
+    Args:
+        spark (SparkSession): Active session
+        source (str): Path to a .json (array or JSON lines) or .parquet input, or "mongo"
+        mongo_collection (str, optional): Source collection in NEWS_DATABASE when source is "mongo"
+
+    Returns:
+        DataFrame: headline, published_at and content columns
+    """
+    if source == "mongo":
+        df = spark.read.format("mongo") \
+            .option("uri", NEWS_MONGO_URI) \
+            .option("database", NEWS_DATABASE) \
+            .option("collection", mongo_collection) \
+            .load()
+    elif source.endswith(".parquet"):
+        df = spark.read.parquet(source)
+    else:
+        # data/news.json is a single JSON array
+        df = spark.read.option("multiLine", source.endswith(".json")).json(source)
+
+    for column in ("headline", "published_at", "content"):
+        if column not in df.columns:
+            df = df.withColumn(column, F.lit(None).cast("string"))
+    return df.select(
+        F.coalesce(F.col("headline").cast("string"), F.lit("")).alias("headline"),
+        F.coalesce(F.col("published_at").cast("string"), F.lit("")).alias("published_at"),
+        F.coalesce(F.col("content").cast("string"), F.lit("")).alias("content")
+    )
+
+
+def prepare_articles(articles):
+    """
+    Normalize, truncate, date and ticker-match articles with pandas UDFs.
+
+    Args:
+        articles (DataFrame): Output of read_articles
+
+    Returns:
+        DataFrame: Articles with the columns analyze_partition expects
+    """
+    prepared = articles \
+        .withColumn("headline_normalized", normalize_udf("headline")) \
+        .withColumn("content_normalized", normalize_udf("content"))
+    return prepared \
+        .withColumn("headline_truncated", truncate_headline_udf("headline_normalized")) \
+        .withColumn("content_truncated", truncate_content_udf("content_normalized")) \
+        .withColumn("effective_date", effective_date_udf("published_at", "content_normalized")) \
+        .withColumn("matched_tickers", match_tickers_udf("headline_normalized", "content_normalized"))
+
+
+def write_partition(rows: Iterator[Row], collection: str) -> None:
+    """
+    Upsert one partition of results by doc_key.
+
+    _id stays a server-generated ObjectId like the documents of upload_to_mongodb.py, so
+    consumers that order or filter by _id see one BSON type. updated_at is stamped at write
+    time, which lets api.py and sentiment_signal.py pick up only the documents this run touched.
+
+    Args:
+        rows (Iterator[Row]): Results matching RESULT_SCHEMA
+        collection (str): Target collection in NEWS_DATABASE
+    """
+    client = MongoClient(NEWS_MONGO_URI)
+    target = client[NEWS_DATABASE][collection]
+    batch = []
+    for row in rows:
+        document = row.asDict(recursive=True)
+        document["updated_at"] = datetime.utcnow()
+        batch.append(UpdateOne({"doc_key": document["doc_key"]}, {"$set": document}, upsert=True))
+        if len(batch) >= WRITE_BATCH_SIZE:
+            target.bulk_write(batch, ordered=False)
+            batch = []
+    if batch:
+        target.bulk_write(batch, ordered=False)
+    client.close()
+
+
+def create_spark_session() -> SparkSession:
+    """
+    Create the Spark session. Executors import the analyzer from BASE_DIR, so the
+    project directory must exist at the same path on every worker node.
+
+    Returns:
+        SparkSession: Session with the MongoDB connector and Arrow enabled
+    """
+    spark = SparkSession.builder \
+        .appName("Financial News Analyzer") \
+        .config("spark.jars.packages", "org.mongodb.spark:mongo-spark-connector_2.12:3.0.1") \
+        .config("spark.sql.execution.arrow.pyspark.enabled", "true") \
+        .config("spark.executorEnv.PYTHONPATH", str(BASE_DIR)) \
+        .getOrCreate()
+    return spark
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze financial news articles with Spark")
+    parser.add_argument("--input", default="data/news.json",
+                        help='Raw articles: .json, .parquet, or "mongo" to read --source-collection')
+    parser.add_argument("--source-collection", default="iqplus_raw",
+                        help=f"Raw article collection in {NEWS_DATABASE} when --input is mongo")
+    parser.add_argument("--output-collection", default=NEWS_COLLECTION,
+                        help=f"Collection in {NEWS_DATABASE} receiving the results")
+    parser.add_argument("--llm-partitions", type=int, default=MAX_CONCURRENT_REQUESTS,
+                        help="Partitions in the LLM stage, i.e. the maximum concurrent LLM requests")
+    parser.add_argument("--json-output", help="Also write the results as JSON lines to this directory")
+    args = parser.parse_args()
+
+    spark = create_spark_session()
+    started = time.perf_counter()
+
+    prepared = prepare_articles(read_articles(spark, args.input, args.source_collection))
+
+    # Each partition holds one LLM client; the partition count bounds the load on the LLM server
+    results = prepared.repartition(args.llm_partitions).rdd.mapPartitions(analyze_partition)
+    results = spark.createDataFrame(results, RESULT_SCHEMA).cache()
+
+    # The unique doc_key index must exist before partitions upsert concurrently
+    client = MongoClient(NEWS_MONGO_URI)
+    ensure_indexes(client[NEWS_DATABASE], args.output_collection)
+    output_collection = args.output_collection
+    results.foreachPartition(lambda rows: write_partition(rows, output_collection))
+    refresh_daily_counts(client[NEWS_DATABASE], collection=args.output_collection)
+    client.close()
+    if args.json_output:
+        results.drop("doc_key").write.mode("overwrite").json(args.json_output)
+
+    summary = results.groupBy("analysis_method", "summary_method").count().collect()
+    total = sum(row["count"] for row in summary)
+    print(f"Analyzed {total} articles in {time.perf_counter() - started:.1f} seconds")
+    for row in summary:
+        print(f"  analysis={row['analysis_method']} summary={row['summary_method']}: {row['count']}")
+
+    results.unpersist()
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
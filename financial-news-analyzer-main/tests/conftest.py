@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modules are imported the same way main.py imports them, from the project directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
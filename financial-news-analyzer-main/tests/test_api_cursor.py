@@ -0,0 +1,48 @@
+import mongomock
+import pytest
+from bson import ObjectId
+from werkzeug.exceptions import BadRequest
+
+import api
+from config import NEWS_COLLECTION
+
+
+@pytest.mark.parametrize("key", [
+    ("2024-05-02T09:30:00", ObjectId("66330a6e1f0c2a7d9b1e4f21")),
+    ("2024-05-02T09:30:00", "3f9a0c7e5b"),
+])
+def test_cursor_round_trip_keeps_the_id_type(key):
+    cursor = api._encode_cursor(key)
+    assert "/" not in cursor and "+" not in cursor
+    assert api._decode_cursor(cursor) == key
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "e30=", "bm90IGpzb24="])
+def test_malformed_cursor_is_a_bad_request(cursor):
+    with pytest.raises(BadRequest):
+        api._decode_cursor(cursor)
+
+
+def test_pages_follow_each_other_without_gaps_or_repeats(monkeypatch):
+    db = mongomock.MongoClient()["news"]
+    ids = [ObjectId() for _ in range(4)]
+    documents = [
+        {"_id": ids[0], "effective_date": "2024-05-03", "headline": "a"},
+        {"_id": ids[1], "effective_date": "2024-05-02", "headline": "b"},
+        {"_id": ids[2], "effective_date": "2024-05-02", "headline": "c"},
+        {"_id": "legacy-hash", "effective_date": "2024-05-02", "headline": "d"},
+        {"_id": ids[3], "effective_date": "2024-05-01", "headline": "e"},
+    ]
+    db[NEWS_COLLECTION].insert_many([dict(document, tickers=["BBRI"]) for document in documents])
+    monkeypatch.setattr(api, "db", db)
+    client = api.app.test_client()
+
+    headlines, cursor = [], None
+    for _ in range(len(documents)):
+        query = {"limit": 2, "cursor": cursor} if cursor else {"limit": 2}
+        page = client.get("/api/news/bbri", query_string=query).get_json()
+        headlines += [row["headline"] for row in page["results"]]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert headlines == ["a", "c", "b", "d", "e"]
@@ -0,0 +1,25 @@
+import json
+
+import mongomock
+import pymongo
+
+import build_search_index
+from config import NEWS_COLLECTION, NEWS_DATABASE
+from interfaces.search_index import SearchIndex
+
+
+def test_article_from_json_and_mongo_is_indexed_once(tmp_path, monkeypatch):
+    article = {"headline": "BBRI bagikan dividen", "summary": "Pembagian dividen tunai", "reasoning": "",
+               "sentiment": "positive", "confidence": 0.9, "effective_date": "2024-05-02T09:30:00",
+               "tickers": ["BBRI"]}
+    path = tmp_path / "analysis.json"
+    path.write_text(json.dumps({"results": [article]}), encoding="utf-8")
+    client = mongomock.MongoClient()
+    client[NEWS_DATABASE][NEWS_COLLECTION].insert_one(dict(article, error=None))
+    monkeypatch.setattr(pymongo, "MongoClient", lambda *args, **kwargs: client)
+
+    with SearchIndex(str(tmp_path / "search.db")) as index:
+        build_search_index.index_json(index, str(path), rebuild=False)
+        build_search_index.index_mongo(index, rebuild=False)
+        assert index.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0] == 1
+        assert len(index.search("dividen")) == 1
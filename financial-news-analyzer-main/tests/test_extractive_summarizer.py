@@ -0,0 +1,34 @@
+from services.extractive_summarizer import split_sentences, summarize
+
+ARTICLE = (
+    "Thursday 24/Aug/2023 at 14:16 "
+    "PT. Bank Rakyat Indonesia Tbk. mencatat laba bersih Rp. 29 triliun pada semester pertama. "
+    "Laba bersih bank tersebut naik 18 persen dibanding periode yang sama tahun lalu. "
+    "Cuaca di Jakarta cerah sepanjang hari dengan angin bertiup pelan dari utara. "
+    "Kenaikan laba bersih didorong penyaluran kredit mikro yang tumbuh kuat. "
+    "Direksi menyebut kredit mikro tetap menjadi penopang utama laba bank."
+)
+
+
+def test_dateline_and_abbreviations_do_not_split_sentences():
+    sentences = split_sentences(ARTICLE)
+    assert len(sentences) == 5
+    assert sentences[0] == "PT. Bank Rakyat Indonesia Tbk. mencatat laba bersih Rp. 29 triliun pada semester pertama."
+
+
+def test_summary_keeps_top_sentences_in_original_order():
+    summary = summarize("Laba bersih BRI naik 18 persen", ARTICLE, max_sentences=2)
+    sentences = split_sentences(ARTICLE)
+    kept = [sentence for sentence in sentences if sentence in summary]
+    assert len(kept) == 2
+    assert summary == " ".join(kept)
+    assert "Cuaca" not in summary
+
+
+def test_short_articles_are_returned_whole():
+    content = "Saham BBRI ditutup menguat dua persen hari ini. Investor asing mencatat beli bersih besar."
+    assert summarize("BBRI menguat", content, max_sentences=3) == content
+
+
+def test_headline_is_used_when_content_has_no_usable_sentence():
+    assert summarize("  BBRI menguat  ", "Singkat. Sekali.") == "BBRI menguat"
@@ -0,0 +1,35 @@
+import pytest
+
+from utils.indonesian_stemmer import stem, stem_tokens
+
+
+@pytest.mark.parametrize("words, root", [
+    (["membeli", "pembelian", "dibeli", "beli"], "beli"),
+    (["mencari", "dicari", "pencarian", "cari"], "cari"),
+    (["memulai", "mulai"], "mulai"),
+    (["memakai", "pakai"], "pakai"),
+    (["memiliki", "pemilik", "kepemilikan", "milik"], "milik"),
+    (["menaikkan", "kenaikan", "naik"], "naik"),
+    (["pendapatan", "dapatkan", "mendapat"], "dapat"),
+    (["diumumkan", "mengumumkan"], "umum"),
+    (["menilai", "penilaian", "nilai"], "nilai"),
+])
+def test_inflected_forms_share_a_stem(words, root):
+    assert [stem(word) for word in words] == [root] * len(words)
+
+
+@pytest.mark.parametrize("word", ["dividen", "direksi", "akuisisi", "mengakuisisi"])
+def test_words_that_only_look_prefixed_keep_their_root(word):
+    assert stem(word) in ("dividen", "direksi", "akuisisi")
+
+
+def test_suffixes_and_particles():
+    assert stem("dividennya") == "dividen"
+    assert stem("perusahaan") == "usaha"
+    assert stem("memperoleh") == "oleh"
+
+
+def test_short_words_and_numbers_are_unchanged():
+    assert stem("laba") == "laba"
+    assert stem("2024") == "2024"
+    assert stem_tokens("Pembagian Dividen 2024") == ["bagi", "dividen", "2024"]
@@ -0,0 +1,27 @@
+from services.local_classifier import labeled_examples, raw_article_text
+
+ARTICLES = [
+    {"headline": "BBRI  Cetak Laba", "content": "  Laba   bersih BBRI naik 18 persen.  "},
+    {"headline": "ADRO Rugi", "content": "ADRO mencatat rugi."},
+    {"headline": "TLKM Stagnan", "content": "Pendapatan TLKM stagnan."},
+    {"headline": "ANTM Gagal", "content": "Konten ANTM."},
+]
+
+
+def test_only_llm_labels_of_known_articles_are_used():
+    results = [
+        {"headline": "BBRI  Cetak Laba", "sentiment": "positive", "analysis_method": "llm"},
+        {"headline": "ADRO Rugi", "sentiment": "negative", "analysis_method": "local"},
+        {"headline": "TLKM Stagnan", "sentiment": "neutral", "analysis_method": "failed"},
+        {"headline": "ANTM Gagal", "sentiment": "neutral", "error": "timeout"},
+        {"headline": "Tidak Ada", "sentiment": "positive"},
+        {"headline": "ANTM Gagal", "sentiment": "unknown"},
+    ]
+    texts, labels = labeled_examples(results, ARTICLES)
+    assert labels == ["positive"]
+    assert texts == [raw_article_text("BBRI  Cetak Laba", "  Laba   bersih BBRI naik 18 persen.  ")]
+
+
+def test_training_text_is_the_normalized_article():
+    text = raw_article_text("BBRI  Cetak Laba", "  Laba   bersih BBRI naik 18 persen.  ")
+    assert text == "bbri cetak laba laba bersih bbri naik 18 persen."
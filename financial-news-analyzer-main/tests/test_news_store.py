@@ -0,0 +1,14 @@
+from interfaces.news_store import _changed_keys
+
+
+def test_changed_articles_recount_their_previous_and_current_keys():
+    docs = [
+        # Re-analyzed: ticker and date changed since the last refresh
+        {"_id": 1, "tickers": ["BBCA"], "effective_date": "2024-05-03T08:00:00", "daily_keys": ["BBRI|2024-05-02"]},
+        {"_id": 2, "tickers": ["BBRI", "BBCA"], "effective_date": "2024-05-02T09:30:00"},
+        # No longer counted anywhere
+        {"_id": 3, "tickers": [], "effective_date": None, "daily_keys": ["GOTO|2024-05-01"]},
+    ]
+    keys, current = _changed_keys(docs)
+    assert keys == ["BBCA|2024-05-02", "BBCA|2024-05-03", "BBRI|2024-05-02", "GOTO|2024-05-01"]
+    assert current == {1: ["BBCA|2024-05-03"], 2: ["BBCA|2024-05-02", "BBRI|2024-05-02"], 3: []}
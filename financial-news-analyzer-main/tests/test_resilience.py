@@ -0,0 +1,155 @@
+import threading
+import time
+
+import pytest
+
+from services.llm_service import LLMService
+from services.resilience import CircuitBreaker, CircuitOpenError, RetryBudget, RetryPolicy, hedged_call
+
+
+class Slots:
+    """Counts slot acquisitions and releases made by hedged_call."""
+
+    def __init__(self, available=True):
+        self.available = available
+        self.acquired = 0
+        self.released = 0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            if self.available:
+                self.acquired += 1
+            return self.available
+
+    def release(self):
+        with self.lock:
+            self.released += 1
+
+    def wait_released(self, count, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while self.released < count and time.monotonic() < deadline:
+            time.sleep(0.005)
+        return self.released
+
+
+def test_retry_delay_is_jittered_below_the_capped_exponential():
+    policy = RetryPolicy(max_retries=5, base_delay=1.0, multiplier=2.0, max_delay=5.0)
+    for retry_number, ceiling in [(1, 1.0), (2, 2.0), (3, 4.0), (4, 5.0), (10, 5.0)]:
+        delays = [policy.delay(retry_number) for _ in range(200)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+
+
+def test_retry_budget_grows_with_requests():
+    budget = RetryBudget(ratio=0.5, min_retries=1)
+    assert budget.try_withdraw()
+    assert not budget.try_withdraw()
+    budget.record_request()
+    assert not budget.try_withdraw()
+    budget.record_request()
+    assert budget.try_withdraw()
+    assert not budget.try_withdraw()
+
+
+def test_circuit_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    # A failed trial re-opens the circuit, a successful one closes it
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success()
+    breaker.before_call()
+    breaker.before_call()
+
+
+
+def test_released_trial_lets_the_next_call_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.release_trial()
+    breaker.before_call()
+
+
+def test_unexpected_error_in_a_trial_does_not_keep_the_circuit_open(monkeypatch):
+    service = LLMService()
+    service.circuit_breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    service.circuit_breaker.record_failure()
+
+    def broken_post(payload):
+        raise RuntimeError("bug in response handling")
+
+    monkeypatch.setattr(service, "_post", broken_post)
+    with pytest.raises(RuntimeError):
+        service.generate_completion("system", "user")
+    service.circuit_breaker.before_call()
+
+def test_fast_call_is_not_hedged():
+    slots = Slots()
+    assert hedged_call(lambda: "ok", 1.0, slots.acquire, slots.release) == "ok"
+    assert slots.acquired == 0
+    assert slots.wait_released(1) == 1
+
+
+def test_slow_primary_keeps_its_slot_until_it_finishes():
+    slots = Slots()
+    primary_may_finish = threading.Event()
+    calls = []
+
+    def call():
+        calls.append(None)
+        if len(calls) == 1:
+            primary_may_finish.wait(2.0)
+            return "primary"
+        return "hedge"
+
+    assert hedged_call(call, 0.05, slots.acquire, slots.release) == "hedge"
+    assert slots.acquired == 1
+    assert slots.wait_released(1) == 1
+    time.sleep(0.05)
+    assert slots.released == 1
+
+    primary_may_finish.set()
+    assert slots.wait_released(2) == 2
+
+
+def test_no_hedge_without_a_spare_slot():
+    slots = Slots(available=False)
+    calls = []
+
+    def call():
+        calls.append(None)
+        time.sleep(0.1)
+        return "primary"
+
+    assert hedged_call(call, 0.01, slots.acquire, slots.release) == "primary"
+    assert len(calls) == 1
+    assert slots.wait_released(1) == 1
+
+
+def test_error_is_raised_when_both_requests_fail():
+    slots = Slots()
+
+    def call():
+        time.sleep(0.05)
+        raise ConnectionError("LM Studio unavailable")
+
+    with pytest.raises(ConnectionError):
+        hedged_call(call, 0.01, slots.acquire, slots.release)
+    assert slots.wait_released(2) == 2
@@ -0,0 +1,76 @@
+import argparse
+import json
+import random
+from collections import Counter
+
+from config import DATA_FILE, OUTPUT_FILE, CONFIDENCE_THRESHOLD, LOCAL_MODEL_HOLDOUT, LOCAL_MODEL_PATH
+from services.local_classifier import LocalSentimentClassifier, labeled_examples
+from utils.logger import logger
+
+
+def split_holdout(texts, labels, fraction, seed=42):
+    """Stratified split so every sentiment class is represented in the held-out set."""
+    by_label = {}
+    for text, label in zip(texts, labels):
+        by_label.setdefault(label, []).append(text)
+
+    rng = random.Random(seed)
+    train, holdout = [], []
+    for label, items in by_label.items():
+        rng.shuffle(items)
+        cut = int(len(items) * fraction)
+        holdout.extend((text, label) for text in items[:cut])
+        train.extend((text, label) for text in items[cut:])
+    return train, holdout
+
+
+def evaluate(classifier, holdout, threshold):
+    """Escalation rate and agreement with the LLM labels on the held-out set."""
+    texts = [text for text, _ in holdout]
+    labels = [label for _, label in holdout]
+    predictions = classifier.predict(texts)
+
+    accepted = [(pred, label) for (pred, confidence), label in zip(predictions, labels) if confidence >= threshold]
+    overall = sum(pred == label for (pred, _), label in zip(predictions, labels))
+    return {
+        "holdout_size": len(holdout),
+        "escalation_rate": 1 - len(accepted) / len(holdout),
+        "agreement_all": overall / len(holdout),
+        "agreement_accepted": sum(pred == label for pred, label in accepted) / len(accepted) if accepted else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the local sentiment classifier from LLM results")
+    parser.add_argument("--input", default=str(OUTPUT_FILE), help="analysis.json with labeled LLM results")
+    parser.add_argument("--articles", default=str(DATA_FILE), help="Raw articles the results were produced from")
+    parser.add_argument("--output", default=str(LOCAL_MODEL_PATH), help="Where to save the trained model")
+    parser.add_argument("--holdout", type=float, default=LOCAL_MODEL_HOLDOUT)
+    parser.add_argument("--threshold", type=float, default=CONFIDENCE_THRESHOLD)
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        results = json.load(f).get("results", [])
+    with open(args.articles, "r", encoding="utf-8") as f:
+        articles = json.load(f)
+    texts, labels = labeled_examples(results, articles)
+    logger.info("Loaded %d of %d results as LLM-labeled examples: %s", len(texts), len(results), dict(Counter(labels)))
+
+    # Measure agreement with the LLM on data the model has not seen
+    train, holdout = split_holdout(texts, labels, args.holdout)
+    classifier = LocalSentimentClassifier(args.output)
+    classifier.train([text for text, _ in train], [label for _, label in train])
+    report = evaluate(classifier, holdout, args.threshold)
+    logger.info("Held-out set: %d articles, threshold %s", report["holdout_size"], args.threshold)
+    logger.info("Escalation rate: %.1f%%", report["escalation_rate"] * 100)
+    logger.info("Agreement with LLM (all): %.1f%%", report["agreement_all"] * 100)
+    if report["agreement_accepted"] is not None:
+        logger.info("Agreement with LLM (not escalated): %.1f%%", report["agreement_accepted"] * 100)
+
+    # The shipped model is refit on every labeled result
+    classifier.train(texts, labels)
+    classifier.save()
+
+
+if __name__ == "__main__":
+    main()
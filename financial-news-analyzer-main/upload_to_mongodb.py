@@ -1,8 +1,11 @@
 import json
 import ssl
+from datetime import datetime
 from pymongo import MongoClient
 from pathlib import Path
 
+from interfaces.news_store import ensure_indexes, refresh_daily_counts
+
 # Constants for MongoDB connection
 MONGO_CONNECTION_STRING = "your-connection-string-here"  # Replace with your MongoDB connection string
 DATABASE_NAME = "idx_financial_news"
@@ -56,6 +59,8 @@ def upload_to_mongodb(client, database_name, collection_name, data):
             # Check if all required fields are present
             required_fields = ["headline", "sentiment", "confidence", "tickers", "reasoning", "summary"]
             if all(field in entry for field in required_fields):
+                # Marks the entry for the incremental refresh of the daily sentiment counts
+                entry["updated_at"] = datetime.utcnow()
                 try:
                     # Create a unique filter using headline and timestamp if available, or just headline
                     filter_criteria = {"headline": entry["headline"]}
@@ -123,6 +128,9 @@ def main():
     success = upload_to_mongodb(client, DATABASE_NAME, COLLECTION_NAME, data)
     if success:
         print("Data upload completed successfully")
+        # Keep the API indexes and per-ticker daily sentiment counts up to date
+        ensure_indexes(client[DATABASE_NAME])
+        refresh_daily_counts(client[DATABASE_NAME])
     else:
         print("Data upload failed")
     
@@ -0,0 +1,132 @@
+"""
+Light, dictionary-free Indonesian stemmer for the search index.
+Strips particles, possessive pronouns, derivational suffixes and the common
+prefixes (with nasal-assimilation rules for me-/pe-). It is applied to both
+indexed text and queries, so "pendapatan", "dapatkan" and "mendapat" all
+match the same stem "dapat".
+"""
+
+import re
+from functools import lru_cache
+from typing import List
+
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+PARTICLES = ("lah", "kah", "tah", "pun")
+POSSESSIVES = ("nya", "ku", "mu")
+MIN_STEM_LENGTH = 4
+
+# me-/pe- prefixes: (prefix, letters the root may start with, letter restored in front of the root)
+NASAL_PREFIXES = (
+    ("meny", "aiueo", "s"), ("peny", "aiueo", "s"),
+    ("meng", "aiueogh", ""), ("peng", "aiueogh", ""),
+    ("mem", "bfpv", ""), ("pem", "bfpv", ""),
+    ("mem", "aiueo", "p"), ("pem", "aiueo", "p"),
+    ("men", "cdjz", ""), ("pen", "cdjz", ""),
+    ("men", "aiueo", "t"), ("pen", "aiueo", "t"),
+    ("me", "lnrwy", ""), ("pe", "lnrwy", ""),
+)
+PLAIN_PREFIXES = ("ber", "ter", "per", "di", "ke", "se", "be")
+
+# "mem-"/"men-" before a vowel usually hides a "p"/"t" (memakai -> pakai, menarik -> tarik),
+# but in these roots the nasal belongs to the root (memulai -> mulai, menaikkan -> naik)
+NASAL_ROOTS = frozenset({
+    "mulai", "milik", "minta", "minat", "masuk", "makan", "muat", "maju", "manfaat",
+    "mohon", "muncul", "mundur", "naik", "nilai", "nikmat",
+})
+
+# Roots ending in "i", which must not lose it to the "-i" suffix rule (membeli -> beli)
+I_ROOTS = frozenset({
+    "beli", "cari", "mulai", "pakai", "nilai", "bagi", "capai", "ganti", "kunci", "kendali",
+})
+
+# Common (mostly loan) words whose first letters only look like a prefix, e.g. "di-viden"
+NON_PREFIXED = frozenset({
+    "dividen", "direksi", "direktur", "direktorat", "digital", "diskon", "distribusi",
+    "distributor", "diversifikasi", "dinamika", "disiplin", "diskusi", "dimensi", "divisi",
+    "dilusi", "sektor", "sekuritas", "sertifikat", "segmen", "sentimen", "terminal",
+})
+
+
+def _strip_suffix(word: str, suffixes) -> str:
+    for suffix in suffixes:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[:-len(suffix)]
+    return word
+
+
+def _strip_prefix(word: str) -> str:
+    # "per-" before the pe- rules, so "perusahaan" gives "usaha" rather than "rusaha"
+    if word.startswith("per") and len(word) - 3 >= MIN_STEM_LENGTH:
+        return word[3:]
+    for prefix, root_starts, restore in NASAL_PREFIXES:
+        if word.startswith(prefix) and len(word) > len(prefix) and word[len(prefix)] in root_starts:
+            root = restore + word[len(prefix):]
+            if restore in ("p", "t") and prefix[-1] + word[len(prefix):] in NASAL_ROOTS:
+                root = prefix[-1] + word[len(prefix):]
+            # The first matching rule decides; a shorter prefix would cut into the root ("me-ncar")
+            return root if len(root) >= MIN_STEM_LENGTH else word
+    for prefix in PLAIN_PREFIXES:
+        if word.startswith(prefix) and len(word) - len(prefix) >= MIN_STEM_LENGTH:
+            return word[len(prefix):]
+    return word
+
+
+def _strip_prefixes(word: str) -> str:
+    # At most two prefixes, e.g. "mem-per-oleh"
+    for _ in range(2):
+        stripped = _strip_prefix(word)
+        if stripped == word:
+            break
+        word = stripped
+    return word
+
+
+@lru_cache(maxsize=65536)
+def stem(word: str) -> str:
+    """
+    Stem one lowercase word.
+
+    Args:
+        word (str): Lowercase token
+
+    Returns:
+        str: The stem; short words and tokens with digits are returned unchanged
+    """
+    if len(word) <= MIN_STEM_LENGTH or not word.isalpha():
+        return word
+    word = _strip_suffix(word, PARTICLES)
+    word = _strip_suffix(word, POSSESSIVES)
+    if word in NON_PREFIXED:
+        return word
+
+    # ke-...-an and pe-...-an confixes take "an", so "kenaikan" keeps its root "naik"
+    if word.startswith(("ke", "pe")) and word.endswith("an"):
+        word = _strip_suffix(word, ("an",))
+    else:
+        # One derivational suffix at most; "i" only after a verbal prefix and
+        # not after "s" (loanwords such as "akuisisi")
+        stripped = _strip_suffix(word, ("kan", "an"))
+        if stripped == word and word.startswith(("me", "di", "ber", "ter", "per")) and not word.endswith("si"):
+            # Only when the prefix then comes off a long enough root ("mem-bel" would leave "bel")
+            # and the word is not a known root ending in "i" ("memulai" -> "mulai")
+            candidate = _strip_suffix(word, ("i",))
+            root = _strip_prefixes(candidate)
+            if root != candidate and _strip_prefixes(word) not in I_ROOTS:
+                return root
+        word = stripped
+
+    return _strip_prefixes(word)
+
+
+def stem_tokens(text: str) -> List[str]:
+    """
+    Tokenize and stem a text.
+
+    Args:
+        text (str): Headline, summary, reasoning or search query
+
+    Returns:
+        List[str]: Stems in text order
+    """
+    return [stem(token) for token in TOKEN_PATTERN.findall(text.lower())]
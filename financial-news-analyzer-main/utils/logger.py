@@ -1,24 +1,143 @@
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import logging.handlers
+import queue
 import sys
-from config import LOG_LEVEL, LOG_FORMAT
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from config import LOG_LEVEL, LOG_FORMAT, LOG_JSON, LOG_SAMPLE_EVERY
+
+# Article and pipeline stage of the current thread, attached to every record it logs
+_article_id = contextvars.ContextVar("article_id", default=None)
+_stage = contextvars.ContextVar("stage", default=None)
+
+
+@contextmanager
+def log_context(article_id: Optional[str] = None, stage: Optional[str] = None):
+    """
+    Attach an article ID and/or stage to all records logged inside the block.
+
+    Args:
+        article_id (str, optional): Article being processed
+        stage (str, optional): Pipeline stage, e.g. "analysis" or "write"
+    """
+    tokens = []
+    if article_id is not None:
+        tokens.append((_article_id, _article_id.set(article_id)))
+    if stage is not None:
+        tokens.append((_stage, _stage.set(stage)))
+    try:
+        yield
+    finally:
+        for var, token in reversed(tokens):
+            var.reset(token)
+
+
+class ContextFilter(logging.Filter):
+    """
+    Copy the thread's article ID and stage onto the record. Handler filters run in the
+    thread that logs, before the record is queued, so the context variables are still
+    those of the article being processed.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "article_id", None) is None:
+            record.article_id = _article_id.get()
+        if getattr(record, "stage", None) is None:
+            record.stage = _stage.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep 1 in N INFO/DEBUG records per event type (the "event" extra field).
+    Warnings and errors, and records without a sampled event, always pass.
+    """
+
+    def __init__(self, sample_every: Dict[str, int]):
+        super().__init__()
+        self.sample_every = sample_every
+        self.counts: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        every = self.sample_every.get(event, 1)
+        if every <= 1 or record.levelno >= logging.WARNING:
+            return True
+        with self.lock:
+            count = self.counts.get(event, 0)
+            self.counts[event] = count + 1
+        record.sample_every = every
+        return count % every == 0
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the structured fields of the record."""
+
+    FIELDS = ("article_id", "stage", "event", "sample_every")
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for field in self.FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that leaves formatting to the listener thread.
+
+    The stock prepare() formats the message in the calling thread and drops args and
+    exc_info, which folds tracebacks into the message and hides them from JsonFormatter.
+    Here the queued record is a shallow copy that keeps args and exc_info.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return copy.copy(record)
+
 
 def setup_logger(name="financial_news_analyzer"):
     logger = logging.getLogger(name)
-    
+
     # Set log level from config
     logger.setLevel(getattr(logging, LOG_LEVEL))
-    
-    # Create handler for console output
+
+    # Create handler for console output; it runs on a background listener thread
     console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
-    
-    # Add handlers to logger
-    logger.addHandler(console_handler)
-    
+    console_handler.setFormatter(JsonFormatter() if LOG_JSON else logging.Formatter(LOG_FORMAT))
+    listener = logging.handlers.QueueListener(queue.SimpleQueue(), console_handler)
+
+    # Worker threads only enqueue records; formatting and writing happen on the listener thread
+    queue_handler = DeferredQueueHandler(listener.queue)
+    queue_handler.addFilter(ContextFilter())
+    logger.addFilter(SamplingFilter(LOG_SAMPLE_EVERY))
+    logger.addHandler(queue_handler)
+
     # Avoid duplicate log messages
     logger.propagate = False
-    
+
+    listener.start()
+    # Flush queued records on exit
+    atexit.register(listener.stop)
+
     return logger
 
 # Application-wide logger instance
-logger = setup_logger()
\ No newline at end of file
+logger = setup_logger()
@@ -0,0 +1,110 @@
+import math
+
+from pyspark.sql import functions as F
+from pyspark.sql.window import Window
+
+# Koleksi bar OHLCV per granularitas beserta field kuncinya
+OHLCV_COLLECTIONS = {
+    "daily_ohlcv_ticker": ["Date"],
+    "monthly_ohlcv_ticker": ["Year", "Month"],
+    "yearly_ohlcv_ticker": ["Year"],
+    "2year_ohlcv_ticker": ["YearRange"],
+}
+
+INDICATOR_COLLECTION = "daily_indicators_ticker"
+
+# Panjang jendela indikator (dalam hari bursa)
+SMA_WINDOWS = [20, 50]
+EMA_SPANS = [12, 26]
+VOLATILITY_WINDOW = 20
+VWAP_WINDOW = 20
+TRADING_DAYS_PER_YEAR = 252
+
+# Jumlah hari kalender sebelum data baru yang perlu dibaca ulang agar jendela indikator terisi
+INDICATOR_LOOKBACK_DAYS = 120
+
+INDICATOR_SCHEMA = (
+    "Date date, ticker string, close double, "
+    + ", ".join(f"ema_{span} double" for span in EMA_SPANS)
+    + ", macd double"
+)
+
+
+# Bar harian dari agregat parsial harian: satu baris sumber per ticker per hari bursa
+def build_daily_bars(daily_partials):
+    return daily_partials.select(
+        "Date", "ticker", "Year", "Month", "YearRange",
+        F.col("first_open").alias("open"),
+        F.col("max_high").alias("high"),
+        F.col("min_low").alias("low"),
+        F.col("last_close").alias("close"),
+        F.col("sum_volume").alias("volume"),
+        F.col("sum_dividends").alias("dividends"),
+    )
+
+
+# Bar OHLCV yang benar untuk periode yang lebih kasar: open pertama, high maksimum,
+# low minimum, close terakhir, volume dan dividen dijumlahkan
+def rollup_bars(daily_bars, key_fields):
+    if key_fields == ["Date"]:
+        return daily_bars.select("Date", "ticker", "open", "high", "low", "close", "volume", "dividends")
+    return daily_bars.groupBy(*key_fields, "ticker").agg(
+        F.min_by("open", "Date").alias("open"),
+        F.max("high").alias("high"),
+        F.min("low").alias("low"),
+        F.max_by("close", "Date").alias("close"),
+        F.sum("volume").alias("volume"),
+        F.sum("dividends").alias("dividends"),
+        F.count("Date").alias("trading_days"),
+        F.min("Date").alias("start_date"),
+        F.max("Date").alias("end_date"),
+    )
+
+
+# EMA dihitung per ticker dengan pandas di atas batch Arrow (rekursif, tidak bisa dengan window SQL)
+def _ema_per_ticker(pdf):
+    pdf = pdf.sort_values("Date")
+    result = pdf[["Date", "ticker", "close"]].copy()
+    for span in EMA_SPANS:
+        result[f"ema_{span}"] = pdf["close"].ewm(span=span, adjust=False).mean()
+    result["macd"] = result[f"ema_{EMA_SPANS[0]}"] - result[f"ema_{EMA_SPANS[1]}"]
+    return result
+
+
+# Indikator teknikal per ticker: return, SMA, EMA/MACD, volatilitas, dan VWAP bergulir
+def build_indicators(daily_bars):
+    by_ticker = Window.partitionBy("ticker").orderBy("Date")
+
+    def trailing(rows):
+        return by_ticker.rowsBetween(-(rows - 1), Window.currentRow)
+
+    typical_price = (F.col("high") + F.col("low") + F.col("close")) / 3
+    bars = daily_bars.select("Date", "ticker", "high", "low", "close", "volume") \
+        .withColumn("return", F.col("close") / F.lag("close").over(by_ticker) - 1)
+
+    indicators = bars.select(
+        "Date", "ticker", "close", "volume", "return",
+        F.log(F.col("close") / F.lag("close").over(by_ticker)).alias("log_return"),
+        *[F.avg("close").over(trailing(n)).alias(f"sma_{n}") for n in SMA_WINDOWS],
+        (F.stddev("return").over(trailing(VOLATILITY_WINDOW)) * math.sqrt(TRADING_DAYS_PER_YEAR))
+            .alias(f"volatility_{VOLATILITY_WINDOW}"),
+        (F.sum(typical_price * F.col("volume")).over(trailing(VWAP_WINDOW))
+            / F.sum("volume").over(trailing(VWAP_WINDOW))).alias(f"vwap_{VWAP_WINDOW}"),
+    )
+
+    ema = daily_bars.select("Date", "ticker", "close") \
+        .groupBy("ticker").applyInPandas(_ema_per_ticker, schema=INDICATOR_SCHEMA) \
+        .drop("close")
+
+    return indicators.join(ema, ["Date", "ticker"])
+
+
+# Seluruh keluaran tahap analitik: {nama koleksi: (DataFrame, field kunci)}
+def build_analytics(daily_partials):
+    daily_bars = build_daily_bars(daily_partials)
+    outputs = {
+        collection_name: (rollup_bars(daily_bars, key_fields), key_fields)
+        for collection_name, key_fields in OHLCV_COLLECTIONS.items()
+    }
+    outputs[INDICATOR_COLLECTION] = (build_indicators(daily_bars), ["Date"])
+    return outputs
@@ -1,57 +1,239 @@
-from flask import Flask, jsonify, abort
+import os
+from datetime import datetime
+
+from flask import Flask, jsonify, abort, request, Response
 from pymongo import MongoClient
 from flask_cors import CORS  # Mengaktifkan CORS untuk mengizinkan akses dari domain lain
 
+from cache import ResponseCache, CollectionVersions, make_cache_key, make_etag
+from serialization import negotiate_mimetype, negotiate_encoding, encode_columnar, compress
+from granularity import GRANULARITIES, valid_column
+from hot_tier import HotTier
+
 # Inisialisasi aplikasi Flask
 app = Flask(__name__)
 CORS(app)  # Mengaktifkan CORS untuk aplikasi React
 
-# Koneksi ke MongoDB lokal
-client = MongoClient("mongodb://localhost:27017")  # Koneksi ke MongoDB lokal
-db = client["stock_data"]  # Menggunakan database "stock_data"
+# Koneksi ke MongoDB (default lokal); dapat diganti lewat environment variable
+# MongoClient dibuat per proses worker, jangan gunakan preload_app di gunicorn
+client = MongoClient(os.environ.get("MONGO_URI", "mongodb://localhost:27017"))
+db = client[os.environ.get("MONGO_DB", "stock_data")]  # Default database "stock_data"
+
+# Cache respons in-process; entri dibuang saat spark.py menaikkan versi koleksi
+response_cache = ResponseCache(max_entries=1024, ttl=300)
+collection_versions = CollectionVersions(db, check_interval=5)
+
+# Seri harga memory-mapped hasil spark.py; dibagi antar worker lewat page cache OS.
+# Jika hot tier belum diekspor atau kolom tidak tersedia, request dilayani MongoDB
+hot_tier = HotTier(check_interval=5)
+
+# API untuk mengambil data saham berdasarkan emiten dan kolom untuk setiap granularitas
+# (daily, monthly, yearly, 2year, serta rollup weekly dan quarterly)
+@app.route('/api/<granularity>/<ticker>/<column>', methods=['GET'])
+def get_stock_data_by_granularity(granularity, ticker, column):
+    return cached_response(_granularity(granularity), ticker, _column(column))
+
+# Batas jumlah ticker per request bulk
+MAX_BULK_TICKERS = 200
+
+# API bulk: banyak ticker dan kolom dalam satu query $in, respons kolumnar terkompresi
+@app.route('/api/bulk/<granularity>', methods=['GET', 'POST'])
+def get_stock_data_bulk(granularity):
+    granularity = _granularity(granularity)
+
+    params = request.get_json(silent=True) or {}
+    if not isinstance(params, dict):
+        abort(400, description="Body JSON harus berupa object")
+    tickers = _list_param(params, "tickers")
+    columns = [_column(column) for column in _list_param(params, "columns")]
+    if not tickers or not columns:
+        abort(400, description="Parameter tickers dan columns wajib diisi")
+    if len(tickers) > MAX_BULK_TICKERS:
+        abort(400, description=f"Maksimal {MAX_BULK_TICKERS} ticker per request")
+
+    date_from = _date_param(params, "from")
+    date_to = _date_param(params, "to")
+
+    mimetype = negotiate_mimetype(request.accept_mimetypes)
+    encoding = negotiate_encoding(request.accept_encodings)
+
+    version = (collection_versions.get(granularity.collection), hot_tier.generation)
+    key = ("bulk", granularity.name, tuple(tickers), tuple(columns), date_from, date_to, mimetype, encoding)
+
+    cached = response_cache.get(key, version)
+    if cached is None:
+        series = fetch_bulk_series(granularity, tickers, columns, date_from, date_to)
+        if not series:
+            abort(404, description="Ticker not found")
+        body, content_encoding = compress(
+            encode_columnar(series, granularity.key_fields, columns, mimetype), encoding)
+        etag = make_etag(body)
+        response_cache.set(key, version, (body, content_encoding), etag)
+    else:
+        (body, content_encoding), etag = cached
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype=mimetype)
+        if content_encoding:
+            response.headers["Content-Encoding"] = content_encoding
+    response.headers["Vary"] = "Accept, Accept-Encoding"
+    response.set_etag(etag)
+    return response
+
+# Mengambil seluruh ticker dengan satu query dan menyusunnya menjadi array paralel per ticker
+def fetch_bulk_series(granularity, tickers, columns, date_from=None, date_to=None):
+    series = fetch_hot_series(granularity, tickers, columns, date_from, date_to)
+    if series is not None:
+        return series
+
+    match = {"ticker": {"$in": tickers}}
+    match.update(granularity.range_filter(date_from, date_to))
+    fields = granularity.key_fields + columns
+
+    series = {}
+    for item in granularity.find(db, match, columns):
+        values = series.get(item["ticker"])
+        if values is None:
+            values = series[item["ticker"]] = {field: [] for field in fields}
+        for field in fields:
+            values[field].append(item.get(field))
+    return series
 
-# API untuk mengambil data saham berdasarkan emiten dan kolom untuk daily
-@app.route('/api/daily/<ticker>/<column>', methods=['GET'])
-def get_stock_data_daily(ticker, column):
-    collection = db["daily_aggregation_ticker"]  # Mengakses koleksi daily_aggregation_ticker
-    return get_stock_data(collection, ticker, column)
+# Seri dari hot tier tanpa query MongoDB; None jika hot tier tidak dapat melayani request ini
+def fetch_hot_series(granularity, tickers, columns, date_from=None, date_to=None):
+    series = {}
+    for ticker in sorted(set(tickers)):
+        values = hot_tier.series(granularity, ticker, columns, date_from, date_to)
+        if values is None:
+            return None
+        # Urutan ticker dan ticker tanpa data mengikuti hasil query $in
+        if values.get(granularity.range_field):
+            series[ticker] = values
+    return series
 
-# API untuk mengambil data saham berdasarkan emiten dan kolom untuk monthly
-@app.route('/api/monthly/<ticker>/<column>', methods=['GET'])
-def get_stock_data_monthly(ticker, column):
-    collection = db["monthly_aggregation_ticker"]  # Mengakses koleksi monthly_aggregation_ticker
-    return get_stock_data(collection, ticker, column)
+# Koleksi hasil sentiment_signal.py: skor sentimen berita harian + harga per ticker
+SIGNAL_COLLECTION = "daily_sentiment_signal_ticker"
 
-# API untuk mengambil data saham berdasarkan emiten dan kolom untuk yearly (tahunan)
-@app.route('/api/yearly/<ticker>/<column>', methods=['GET'])
-def get_stock_data_yearly(ticker, column):
-    collection = db["yearly_aggregation_ticker"]  # Mengakses koleksi yearly_aggregation_ticker
-    return get_stock_data(collection, ticker, column)
+# API sinyal harian: harga dan sentimen satu ticker dalam satu query (filter from/to opsional)
+@app.route('/api/signal/<ticker>', methods=['GET'])
+def get_sentiment_signal(ticker):
+    # Koleksi sinyal menyimpan ticker tanpa suffix bursa ("BBRI"); "BBRI.JK" juga diterima
+    ticker = ticker.strip().upper()
+    if ticker.endswith(".JK"):
+        ticker = ticker[:-3]
+    date_from = _date_param({}, "from")
+    date_to = _date_param({}, "to")
+
+    version = collection_versions.get(SIGNAL_COLLECTION)
+    key = ("signal", ticker, date_from, date_to)
+
+    cached = response_cache.get(key, version)
+    if cached is None:
+        match = {"ticker": ticker}
+        bounds = {}
+        if date_from:
+            bounds["$gte"] = date_from
+        if date_to:
+            bounds["$lte"] = date_to
+        if bounds:
+            match["Date"] = bounds
+        rows = list(db[SIGNAL_COLLECTION].find(match, {"_id": 0}).sort("Date", 1))
+        if not rows:
+            abort(404, description="Ticker not found")
+        body = jsonify(rows).get_data()
+        etag = make_etag(body)
+        response_cache.set(key, version, body, etag)
+    else:
+        body, etag = cached
+
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response
+
+def _granularity(name):
+    if name not in GRANULARITIES:
+        abort(404, description="Granularity not found")
+    return GRANULARITIES[name]
+
+def _column(column):
+    if not valid_column(column):
+        abort(400, description=f"Nama kolom tidak valid: {column}")
+    return column
+
+# Parameter list dapat dikirim sebagai "a,b,c", diulang (?tickers=a&tickers=b), atau array JSON
+def _list_param(params, name):
+    if name in params:
+        values = params[name]
+        if isinstance(values, str):
+            return [values]
+        if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+            abort(400, description=f"Parameter {name} harus berupa string atau array string")
+        return values
+    values = []
+    for value in request.args.getlist(name):
+        values.extend(v.strip() for v in value.split(",") if v.strip())
+    return values
+
+def _date_param(params, name):
+    value = params[name] if name in params else request.args.get(name)
+    if value is None or value == "":
+        return None
+    if not isinstance(value, str):
+        abort(400, description=f"Parameter {name} harus berupa string tanggal")
+    try:
+        value = datetime.fromisoformat(value)
+    except ValueError:
+        abort(400, description=f"Format tanggal {name} harus YYYY-MM-DD")
+    # Date tersimpan tanpa zona waktu; offset (mis. +07:00) diabaikan dan waktunya dibaca apa adanya
+    return value.replace(tzinfo=None)
+
+# Melayani request dari cache jika versi koleksi belum berubah, mendukung If-None-Match
+def cached_response(granularity, ticker, column):
+    version = (collection_versions.get(granularity.collection), hot_tier.generation)
+    key = make_cache_key(request.path, ticker, column, request.args)
+
+    cached = response_cache.get(key, version)
+    if cached is None:
+        body = get_stock_data(granularity, ticker, column).get_data()
+        etag = make_etag(body)
+        response_cache.set(key, version, body, etag)
+    else:
+        body, etag = cached
+
+    # Klien yang sudah memiliki seri yang sama tidak perlu mengunduh ulang
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    return response
 
 # Fungsi untuk mengambil data saham berdasarkan emiten dan kolom yang diminta
-def get_stock_data(collection, ticker, column):
-    # Mengambil data berdasarkan ticker dan kolom yang diminta
-    if collection.name == "daily_aggregation_ticker":
-        # Mengambil data daily
-        data = collection.find({"ticker": ticker}, {"_id": 0, "Date": 1, column: 1}).limit(100)
-    elif collection.name == "monthly_aggregation_ticker":
-        # Mengambil data monthly
-        data = collection.find({"ticker": ticker}, {"_id": 0, "Year": 1, "Month": 1, column: 1}).limit(100)
-    elif collection.name == "yearly_aggregation_ticker":
-        # Mengambil data yearly
-        data = collection.find({"ticker": ticker}, {"_id": 0, "Year": 1, column: 1}).limit(100)
-    
-    # Jika tidak ada data ditemukan, kirim error 404
-    if data.count() == 0:
-        abort(404, description="Ticker not found")
+def get_stock_data(granularity, ticker, column):
+    # Hot tier lebih dulu; baris dibentuk ulang dari array paralel dengan urutan yang sama
+    series = hot_tier.series(granularity, ticker, [column], limit=100)
+    if series is not None:
+        fields = granularity.key_fields + [column]
+        data = [dict(zip(fields, values)) for values in zip(*(series.get(field, []) for field in fields))]
+    else:
+        # Field kunci, urutan, dan proyeksi sudah dideklarasikan per granularitas
+        data = granularity.find(db, {"ticker": ticker}, [column], limit=100)
 
     # Menyusun data untuk dikirim dalam format JSON
-    if collection.name == "daily_aggregation_ticker":
-        stock_data = [{"Date": item["Date"], column: item.get(column, "Column not available")} for item in data]
-    elif collection.name == "monthly_aggregation_ticker":
-        stock_data = [{"Year": item["Year"], "Month": item["Month"], column: item.get(column, "Column not available")} for item in data]
-    elif collection.name == "yearly_aggregation_ticker":
-        stock_data = [{"Year": item["Year"], column: item.get(column, "Column not available")} for item in data]
+    stock_data = []
+    for item in data:
+        row = {field: item[field] for field in granularity.key_fields}
+        row[column] = item.get(column, "Column not available")
+        stock_data.append(row)
+
+    # Jika tidak ada data ditemukan, kirim error 404
+    if not stock_data:
+        abort(404, description="Ticker not found")
 
     return jsonify(stock_data)  # Mengembalikan data dalam format JSON
 
@@ -60,5 +242,11 @@ def get_stock_data(collection, ticker, column):
 def not_found_error(error):
     return jsonify({"error": str(error)}), 404
 
+# Menangani parameter request yang tidak valid
+@app.errorhandler(400)
+def bad_request_error(error):
+    return jsonify({"error": str(error)}), 400
+
 if __name__ == '__main__':
-    app.run(debug=True)  # Menjalankan aplikasi Flask di localhost:5000
+    # Server development Werkzeug; untuk produksi gunakan gunicorn (lihat gunicorn.conf.py)
+    app.run(debug=os.environ.get("FLASK_DEBUG") == "1")  # Menjalankan aplikasi Flask di localhost:5000
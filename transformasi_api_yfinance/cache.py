@@ -0,0 +1,91 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+# Nama koleksi tempat spark.py menulis stempel versi setiap koleksi agregasi
+VERSION_COLLECTION = "aggregation_versions"
+
+
+class ResponseCache:
+    """Cache LRU dengan TTL untuk respons API yang sudah diserialisasi.
+
+    Setiap entri menyimpan versi koleksi saat entri dibuat, sehingga entri
+    otomatis dianggap basi begitu spark.py menulis ulang koleksi tersebut.
+    """
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version):
+        """Mengembalikan (body, etag) jika entri masih valid, selain itu None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, entry_version, body, etag = entry
+            if expires_at < time.monotonic() or entry_version != version:
+                # Entri kedaluwarsa atau koleksi sudah dihitung ulang oleh Spark
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body, etag
+
+    def set(self, key, version, body, etag):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, version, body, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class CollectionVersions:
+    """Membaca stempel versi koleksi dari MongoDB dengan interval pengecekan.
+
+    Stempel tidak dibaca pada setiap request; hasilnya disimpan selama
+    `check_interval` detik agar pengecekan versi tetap murah.
+    """
+
+    def __init__(self, db, check_interval=5):
+        self.collection = db[VERSION_COLLECTION]
+        self.check_interval = check_interval
+        self._versions = {}
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, collection_name):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at >= self.check_interval:
+                self._versions = {
+                    doc["_id"]: doc.get("generation", 0)
+                    for doc in self.collection.find({}, {"generation": 1})
+                }
+                self._checked_at = now
+            return self._versions.get(collection_name, 0)
+
+
+def make_cache_key(route, ticker, column, args):
+    """Menyusun kunci cache dari route, ticker, kolom, dan query parameter."""
+    params = tuple(sorted((key, tuple(args.getlist(key))) for key in args.keys()))
+    return (route, ticker, column, params)
+
+
+def make_etag(body):
+    """ETag dari isi respons, sehingga seri yang tidak berubah setelah Spark
+    dijalankan ulang tetap menghasilkan ETag yang sama."""
+    return hashlib.sha1(body).hexdigest()
@@ -0,0 +1,61 @@
+"""Konstanta dan helper job agregasi yang dipakai bersama spark.py, staging.py, dan local_engine.py.
+
+Modul ini tidak mengimpor pyspark, sehingga engine DuckDB (local_engine.py) dapat
+berjalan di mesin tanpa Spark.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from pymongo import MongoClient
+
+MONGO_URI = "mongodb://localhost:27017"
+DATABASE = "stock_data"
+SOURCE_COLLECTION = "idx_emiten"
+
+STAGING_DIR = os.environ.get("STAGING_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                         "staging", "idx_emiten"))
+
+# Koleksi berisi stempel versi per koleksi agregasi, dibaca oleh cache di app.py
+VERSION_COLLECTION = "aggregation_versions"
+
+# Koleksi berisi high-watermark Date per ticker untuk mode inkremental
+WATERMARK_COLLECTION = "aggregation_watermarks"
+
+# Kolom harga di koleksi sumber dan nama kolom hasil agregasinya (avg_<nama>)
+PRICE_COLUMNS = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Volume": "volume",
+    "Dividends": "dividends",
+    "Stock Splits": "stock_splits",
+}
+
+# Field kunci setiap koleksi agregasi yang dibuat dari agregat parsial harian
+ROLLUPS = {
+    "monthly_aggregation_ticker": ["Year", "Month"],
+    "yearly_aggregation_ticker": ["Year"],
+    "2year_aggregation_ticker": ["YearRange"],
+}
+
+mongo_client = MongoClient(MONGO_URI)
+
+# Menaikkan nomor generasi koleksi setelah koleksi selesai ditulis ulang
+def write_version_stamp(collection_name):
+    mongo_client[DATABASE][VERSION_COLLECTION].update_one(
+        {"_id": collection_name},
+        {"$inc": {"generation": 1}, "$set": {"updated_at": datetime.utcnow()}},
+        upsert=True
+    )
+
+# Mencatat dan menampilkan durasi setiap tahap job
+@contextmanager
+def stage(name, timings):
+    started = time.perf_counter()
+    yield
+    timings[name] = time.perf_counter() - started
+    print(f"[{name}] selesai dalam {timings[name]:.2f} detik")
@@ -0,0 +1,95 @@
+import re
+
+# Nama kolom yang boleh diminta; mencegah operator Mongo ($) atau path bertingkat (.)
+COLUMN_PATTERN = re.compile(r"^[A-Za-z0-9_ ]+$")
+
+# Koleksi harian yang menjadi sumber rollup on-the-fly
+DAILY_COLLECTION = "daily_aggregation_ticker"
+
+
+def _year_bucket(date):
+    start = date.year // 2 * 2
+    return f"{start}-{start + 1}"
+
+
+class Granularity:
+    """Deskripsi satu granularitas agregasi yang dapat dilayani API.
+
+    Granularitas dengan `collection` dibaca langsung dari koleksi hasil
+    spark.py. Granularitas dengan `group_keys` dihitung on-the-fly dengan
+    pipeline agregasi Mongo di atas koleksi harian.
+    """
+
+    def __init__(self, name, key_fields, collection=None, group_keys=None,
+                 range_field="Date", range_value=None):
+        self.name = name
+        self.key_fields = key_fields
+        self.collection = collection or DAILY_COLLECTION
+        self.is_rollup = group_keys is not None
+        self.range_field = range_field
+        self.range_value = range_value or (lambda date: date)
+
+        # Proyeksi, urutan, dan tahap $group disusun sekali saat modul dimuat
+        self._projection = {"_id": 0, "ticker": 1}
+        self._projection.update({field: 1 for field in key_fields})
+        self._sort = [("ticker", 1)] + [(field, 1) for field in key_fields]
+        if self.is_rollup:
+            self._group_id = dict(group_keys, ticker="$ticker")
+            self._project_keys = {field: f"$_id.{field}" for field in key_fields}
+            self._project_keys.update({"_id": 0, "ticker": "$_id.ticker"})
+            self._sort_stage = dict(self._sort)
+
+    def range_filter(self, date_from=None, date_to=None):
+        bounds = {}
+        if date_from:
+            bounds["$gte"] = self.range_value(date_from)
+        if date_to:
+            bounds["$lte"] = self.range_value(date_to)
+        return {self.range_field: bounds} if bounds else {}
+
+    def find(self, db, match, columns, limit=0):
+        """Mengambil dokumen {ticker, key_fields..., columns...} terurut per ticker dan periode."""
+        collection = db[self.collection]
+        if not self.is_rollup:
+            projection = dict(self._projection)
+            projection.update({column: 1 for column in columns})
+            return collection.find(match, projection).sort(self._sort).limit(limit)
+
+        group = {"_id": self._group_id}
+        group.update({column: {"$avg": f"${column}"} for column in columns})
+        project = dict(self._project_keys)
+        project.update({column: 1 for column in columns})
+        pipeline = [
+            {"$match": match},
+            {"$group": group},
+            {"$project": project},
+            {"$sort": self._sort_stage},
+        ]
+        if limit:
+            pipeline.append({"$limit": limit})
+        return collection.aggregate(pipeline)
+
+
+# Seluruh granularitas yang dilayani API, dideklarasikan sekali
+GRANULARITIES = {
+    granularity.name: granularity
+    for granularity in [
+        Granularity("daily", ["Date"], collection="daily_aggregation_ticker"),
+        Granularity("monthly", ["Year", "Month"], collection="monthly_aggregation_ticker",
+                    range_field="Year", range_value=lambda date: date.year),
+        Granularity("yearly", ["Year"], collection="yearly_aggregation_ticker",
+                    range_field="Year", range_value=lambda date: date.year),
+        Granularity("2year", ["YearRange"], collection="2year_aggregation_ticker",
+                    range_field="YearRange", range_value=_year_bucket),
+        # Rollup on-the-fly dari koleksi harian
+        Granularity("weekly", ["Year", "Week"],
+                    group_keys={"Year": {"$isoWeekYear": "$Date"}, "Week": {"$isoWeek": "$Date"}}),
+        Granularity("quarterly", ["Year", "Quarter"],
+                    group_keys={"Year": {"$year": "$Date"},
+                                "Quarter": {"$toInt": {"$ceil": {"$divide": [{"$month": "$Date"}, 3]}}}}),
+    ]
+}
+
+
+def valid_column(column):
+    return bool(COLUMN_PATTERN.match(column))
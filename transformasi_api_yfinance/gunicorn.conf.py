@@ -0,0 +1,30 @@
+# Konfigurasi gunicorn untuk menjalankan API dalam mode produksi:
+#
+#   gunicorn -c gunicorn.conf.py app:app
+#
+# Jumlah worker dan thread sebaiknya dipilih dari hasil loadtest.py --sweep.
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:5000")
+
+# Worker proses terpisah (masing-masing dengan MongoClient dan cache sendiri),
+# masing-masing melayani beberapa request secara bersamaan dengan thread
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+# MongoClient tidak aman dibagi setelah fork, jadi aplikasi dimuat di tiap worker
+preload_app = False
+
+timeout = 30
+graceful_timeout = 30
+keepalive = 5
+
+# Worker di-restart berkala untuk membatasi pertumbuhan memori cache
+max_requests = 10000
+max_requests_jitter = 1000
+
+accesslog = os.environ.get("ACCESS_LOG")  # Nonaktif secara default agar tidak menambah latensi
+errorlog = "-"
+loglevel = "info"
@@ -0,0 +1,279 @@
+"""Hot tier: seri agregasi per ticker sebagai array NumPy di file memory-mapped.
+
+    spark-submit hot_tier.py     # ekspor ulang dari koleksi MongoDB saat ini
+
+spark.py menulis generasi baru langsung dari DataFrame yang baru dihitungnya: mode penuh
+dari seluruh hasil build_averages, mode inkremental dengan menimpa baris bucket terdampak
+pada generasi aktif (update_generation), tanpa membaca ulang koleksi dari MongoDB.
+local_engine.py memanggil write_generation() dengan hasil DuckDB. Setiap granularitas
+disimpan sebagai array kontigu (int64 untuk kolom kunci, float64 untuk kolom
+nilai) yang terurut per ticker dan periode, ditambah indeks offset
+{ticker: [awal, akhir]}. Generasi baru ditulis ke direktori tersendiri lalu
+symlink `current` diganti secara atomik; app.py membaca lewat np.load(mmap_mode="r"),
+sehingga semua worker berbagi satu salinan data lewat page cache OS.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from granularity import GRANULARITIES
+
+HOT_TIER_DIR = os.environ.get("HOT_TIER_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "hot_tier"))
+CURRENT_LINK = "current"
+MANIFEST_FILE = "manifest.json"
+
+# Jumlah generasi lama yang disimpan; reader yang masih memetakan file lama tetap aman
+# karena file yang di-unlink baru benar-benar dihapus setelah mmap ditutup
+KEEP_GENERATIONS = 2
+
+EPOCH = datetime(1970, 1, 1)
+
+
+# Kolom kunci disimpan sebagai int64: Date sebagai jumlah hari sejak epoch,
+# YearRange ("2022-2023") sebagai tahun awalnya
+def encode_key(field, value):
+    if field == "Date":
+        return (value - EPOCH).days
+    if field == "YearRange":
+        return int(value.split("-")[0])
+    return int(value)
+
+
+def decode_keys(field, values):
+    if field == "Date":
+        return [EPOCH + timedelta(days=days) for days in values.tolist()]
+    if field == "YearRange":
+        return [f"{start}-{start + 1}" for start in values.tolist()]
+    return values.tolist()
+
+
+# Granularitas yang dibaca langsung dari koleksi (rollup on-the-fly tetap dilayani MongoDB)
+def hot_granularities():
+    return {name: granularity for name, granularity in GRANULARITIES.items() if not granularity.is_rollup}
+
+
+def _key_column(field):
+    from pyspark.sql import functions as F
+    if field == "Date":
+        return F.datediff(F.to_date("Date"), F.lit("1970-01-01")).cast("long").alias(field)
+    if field == "YearRange":
+        return F.split(F.col(field), "-").getItem(0).cast("long").alias(field)
+    return F.col(field).cast("long").alias(field)
+
+
+# Versi pandas dari _key_column untuk frame yang tidak berasal dari Spark
+def encode_frame(frame, key_fields):
+    frame = frame.copy()
+    for field in key_fields:
+        if field == "Date":
+            frame[field] = (pd.to_datetime(frame[field]) - EPOCH).dt.days
+        elif field == "YearRange":
+            frame[field] = frame[field].str.split("-").str[0]
+        frame[field] = frame[field].astype("int64")
+    return frame
+
+
+# Frame pandas hot tier dari DataFrame Spark (ticker, kunci, avg_*); kunci di-encode di executor
+def spark_frame(df, key_fields):
+    from pyspark.sql import functions as F
+
+    columns = sorted(column for column in df.columns if column.startswith("avg_"))
+    return df.select("ticker", *[_key_column(field) for field in key_fields],
+                     *[F.col(column).cast("double") for column in columns]) \
+        .toPandas()
+
+
+def export_hot_tier(spark, mongo_uri, database, target_dir=HOT_TIER_DIR):
+    """Menulis generasi baru hot tier dari koleksi agregasi lalu menukarnya secara atomik."""
+    frames = {}
+    for name, granularity in hot_granularities().items():
+        df = spark.read.format("mongo") \
+            .option("uri", mongo_uri) \
+            .option("database", database) \
+            .option("collection", granularity.collection) \
+            .load()
+        frames[name] = spark_frame(df, granularity.key_fields)
+    return write_generation(frames, target_dir)
+
+
+def load_generation_frames(target_dir=HOT_TIER_DIR):
+    """Membaca generasi aktif sebagai {granularitas: frame pandas}; None jika belum ada generasi."""
+    link = os.path.join(target_dir, CURRENT_LINK)
+    if not os.path.islink(link):
+        return None
+    path = os.path.realpath(link)
+    with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    frames = {}
+    for name, meta in manifest["granularities"].items():
+        with open(os.path.join(path, f"{name}.index.json"), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        tickers = np.empty(meta["rows"], dtype=object)
+        for ticker, (start, stop) in index.items():
+            tickers[start:stop] = ticker
+        frame = {"ticker": tickers}
+        frame.update({field: np.load(os.path.join(path, f"{name}.{field}.npy"))
+                      for field in meta["key_fields"] + meta["columns"]})
+        frames[name] = pd.DataFrame(frame)
+    return frames
+
+
+def update_generation(changed, target_dir=HOT_TIER_DIR):
+    """Generasi baru = generasi aktif dengan baris {granularitas: frame} yang berubah menggantikan
+    baris (ticker, kunci) yang sama. Mengembalikan None jika belum ada generasi aktif yang lengkap."""
+    previous = load_generation_frames(target_dir)
+    if previous is None or not set(changed) <= set(previous):
+        return None
+    frames = {}
+    for name, frame in changed.items():
+        keys = ["ticker"] + GRANULARITIES[name].key_fields
+        frames[name] = pd.concat([previous[name], frame], ignore_index=True) \
+            .drop_duplicates(keys, keep="last")
+    return write_generation(frames, target_dir)
+
+
+def write_generation(frames, target_dir=HOT_TIER_DIR):
+    """Menulis frame pandas {granularitas: frame} (kunci sudah di-encode) sebagai generasi baru."""
+    generation = datetime.utcnow().strftime("%Y%m%d%H%M%S%f")
+    generation_dir = os.path.join(target_dir, f"gen-{generation}")
+    os.makedirs(generation_dir)
+    manifest = {"generation": generation, "granularities": {}}
+
+    for name, frame in frames.items():
+        keys = GRANULARITIES[name].key_fields
+        columns = sorted(column for column in frame.columns if column.startswith("avg_"))
+        # Urutan (ticker, kunci periode) membuat seri setiap ticker menjadi satu potongan kontigu
+        frame = frame.sort_values(["ticker"] + keys, kind="stable").reset_index(drop=True)
+
+        tickers = frame["ticker"].to_numpy()
+        boundaries = np.flatnonzero(tickers[1:] != tickers[:-1]) + 1
+        starts = np.concatenate([[0], boundaries]) if len(tickers) else np.array([], dtype=np.int64)
+        stops = np.concatenate([boundaries, [len(tickers)]]) if len(tickers) else np.array([], dtype=np.int64)
+        index = {tickers[start]: [int(start), int(stop)] for start, stop in zip(starts, stops)}
+
+        for field in keys:
+            np.save(os.path.join(generation_dir, f"{name}.{field}.npy"), frame[field].to_numpy(np.int64))
+        for column in columns:
+            # Nilai null menjadi NaN dan dikembalikan sebagai null oleh API
+            np.save(os.path.join(generation_dir, f"{name}.{column}.npy"), frame[column].to_numpy(np.float64))
+        with open(os.path.join(generation_dir, f"{name}.index.json"), "w", encoding="utf-8") as f:
+            json.dump(index, f)
+
+        manifest["granularities"][name] = {"key_fields": keys, "columns": columns, "rows": len(frame)}
+        print(f"[hot tier] {name}: {len(frame)} baris, {len(index)} ticker")
+
+    with open(os.path.join(generation_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+
+    # Symlink sementara lalu os.replace: reader selalu melihat generasi lama atau baru yang lengkap
+    link = os.path.join(target_dir, CURRENT_LINK)
+    if os.path.lexists(link + ".tmp"):
+        os.remove(link + ".tmp")
+    os.symlink(os.path.basename(generation_dir), link + ".tmp")
+    os.replace(link + ".tmp", link)
+
+    generations = sorted(entry for entry in os.listdir(target_dir) if entry.startswith("gen-"))
+    for old in generations[:-KEEP_GENERATIONS]:
+        shutil.rmtree(os.path.join(target_dir, old), ignore_errors=True)
+    return generation
+
+
+class _Generation:
+    """Satu generasi hot tier yang sudah dipetakan ke memori."""
+
+    def __init__(self, path):
+        with open(os.path.join(path, MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.generation = manifest["generation"]
+        self.granularities = {}
+        for name, meta in manifest["granularities"].items():
+            with open(os.path.join(path, f"{name}.index.json"), "r", encoding="utf-8") as f:
+                index = json.load(f)
+            arrays = {field: np.load(os.path.join(path, f"{name}.{field}.npy"), mmap_mode="r")
+                      for field in meta["key_fields"] + meta["columns"]}
+            self.granularities[name] = (meta["key_fields"], set(meta["columns"]), index, arrays)
+
+
+class HotTier:
+    """Pembaca hot tier untuk app.py; generasi baru dideteksi dengan interval pengecekan."""
+
+    def __init__(self, root=HOT_TIER_DIR, check_interval=5):
+        self.link = os.path.join(root, CURRENT_LINK)
+        self.check_interval = check_interval
+        self._current = None
+        self._target = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _snapshot(self):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                target = os.path.realpath(self.link) if os.path.islink(self.link) else None
+                if target != self._target:
+                    self._current = _Generation(target) if target else None
+                    self._target = target
+            return self._current
+
+    @property
+    def generation(self):
+        current = self._snapshot()
+        return current.generation if current else None
+
+    def series(self, granularity, ticker, columns, date_from=None, date_to=None, limit=0):
+        """Mengembalikan {field: [..]} untuk satu ticker, {} jika ticker tidak ada,
+        atau None jika granularitas/kolom tidak tersedia di hot tier (gunakan MongoDB)."""
+        current = self._snapshot()
+        if current is None or granularity.name not in current.granularities:
+            return None
+        key_fields, available, index, arrays = current.granularities[granularity.name]
+        if not set(columns) <= available:
+            return None
+        if ticker not in index:
+            return {}
+
+        start, stop = index[ticker]
+        # Kolom rentang adalah kunci pertama, terurut naik dalam potongan setiap ticker
+        range_keys = arrays[granularity.range_field][start:stop]
+        lo, hi = 0, stop - start
+        if date_from:
+            lo = int(np.searchsorted(range_keys, encode_key(granularity.range_field,
+                                                            granularity.range_value(date_from)), side="left"))
+        if date_to:
+            hi = int(np.searchsorted(range_keys, encode_key(granularity.range_field,
+                                                            granularity.range_value(date_to)), side="right"))
+        if limit:
+            hi = min(hi, lo + limit)
+
+        # Potongan array mmap tidak menyalin data; hanya baris yang diminta yang dibaca dari page cache
+        series = {field: decode_keys(field, arrays[field][start + lo:start + hi]) for field in key_fields}
+        for column in columns:
+            values = arrays[column][start + lo:start + hi]
+            series[column] = [None if value != value else value for value in values.tolist()]
+        return series
+
+
+def main():
+    from pyspark.sql import SparkSession
+    from spark import MONGO_URI, DATABASE
+
+    spark = SparkSession.builder \
+        .appName("Hot Tier Export") \
+        .config("spark.jars.packages", "org.mongodb.spark:mongo-spark-connector_2.12:3.0.1") \
+        .getOrCreate()
+    generation = export_hot_tier(spark, MONGO_URI, DATABASE)
+    print(f"Hot tier generasi {generation} aktif di {HOT_TIER_DIR}")
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
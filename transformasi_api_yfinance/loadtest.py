@@ -0,0 +1,216 @@
+"""Load test untuk API yfinance.
+
+Contoh penggunaan:
+
+    # Mengisi database uji dengan data sintetis di mongod lokal
+    python loadtest.py --seed --db stock_data_loadtest
+
+    # Menguji server yang sudah berjalan
+    python loadtest.py --url http://localhost:5000 --concurrency 32 --duration 30
+
+    # Menjalankan gunicorn dengan beberapa jumlah worker dan membandingkan hasilnya
+    python loadtest.py --sweep 1,2,4,8 --db stock_data_loadtest
+"""
+
+import argparse
+import http.client
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+DEFAULT_TICKERS = ["BBRI", "BBCA", "BMRI", "TLKM", "ASII", "UNVR", "ANTM", "ICBP", "INDF", "BBNI"]
+COLUMNS = ["avg_open", "avg_high", "avg_low", "avg_close", "avg_volume"]
+
+
+# Mengisi koleksi agregasi dengan random walk harga agar API dapat diuji tanpa Spark
+def seed_database(mongo_uri, db_name, tickers, days):
+    from pymongo import MongoClient, ASCENDING
+
+    db = MongoClient(mongo_uri)[db_name]
+    start = datetime(2015, 1, 1)
+    daily, monthly, yearly, two_year = [], {}, {}, {}
+
+    for ticker in tickers:
+        price = random.uniform(500, 10000)
+        for offset in range(days):
+            date = start + timedelta(days=offset)
+            if date.weekday() >= 5:
+                continue
+            price = max(50.0, price * (1 + random.gauss(0, 0.02)))
+            row = {
+                "ticker": ticker,
+                "avg_open": price * random.uniform(0.99, 1.01),
+                "avg_high": price * random.uniform(1.0, 1.03),
+                "avg_low": price * random.uniform(0.97, 1.0),
+                "avg_close": price,
+                "avg_volume": random.uniform(1e6, 1e8),
+            }
+            daily.append(dict(row, Date=date))
+            year_range = f"{date.year // 2 * 2}-{date.year // 2 * 2 + 1}"
+            for bucket, key in ((monthly, (ticker, date.year, date.month)),
+                                (yearly, (ticker, date.year)),
+                                (two_year, (ticker, year_range))):
+                bucket.setdefault(key, []).append(row)
+
+    def averaged(groups, key_fields):
+        for key, rows in groups.items():
+            doc = dict(zip(["ticker"] + key_fields, key))
+            doc.update({c: sum(r[c] for r in rows) / len(rows) for c in COLUMNS})
+            yield doc
+
+    collections = {
+        "daily_aggregation_ticker": (daily, ["Date"]),
+        "monthly_aggregation_ticker": (list(averaged(monthly, ["Year", "Month"])), ["Year", "Month"]),
+        "yearly_aggregation_ticker": (list(averaged(yearly, ["Year"])), ["Year"]),
+        "2year_aggregation_ticker": (list(averaged(two_year, ["YearRange"])), ["YearRange"]),
+    }
+    for name, (docs, key_fields) in collections.items():
+        db[name].drop()
+        db[name].insert_many(docs, ordered=False)
+        db[name].create_index([("ticker", ASCENDING)] + [(f, ASCENDING) for f in key_fields])
+        print(f"{name}: {len(docs)} dokumen")
+
+
+def build_paths(tickers):
+    paths = []
+    for ticker in tickers:
+        for granularity in ("daily", "monthly", "yearly", "2year", "weekly"):
+            for column in COLUMNS:
+                paths.append(f"/api/{granularity}/{ticker}/{column}")
+    bulk = ",".join(tickers)
+    paths.append(f"/api/bulk/daily?tickers={bulk}&columns=avg_close&from=2016-01-01&to=2016-12-31")
+    return paths
+
+
+# Setiap thread memakai satu koneksi keep-alive, seperti klien dashboard sungguhan
+def _worker(base_url, paths, deadline, latencies, errors, lock):
+    parsed = urlparse(base_url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+    local_latencies, local_errors = [], 0
+    while time.perf_counter() < deadline:
+        path = random.choice(paths)
+        started = time.perf_counter()
+        try:
+            conn.request("GET", path, headers={"Accept-Encoding": "gzip"})
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                local_errors += 1
+        except (OSError, http.client.HTTPException):
+            local_errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=30)
+            continue
+        local_latencies.append(time.perf_counter() - started)
+    conn.close()
+    with lock:
+        latencies.extend(local_latencies)
+        errors.append(local_errors)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run_load(base_url, paths, concurrency, duration):
+    latencies, errors, lock = [], [], threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=_worker, args=(base_url, paths, deadline, latencies, errors, lock))
+        for _ in range(concurrency)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": sum(errors),
+        "rps": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p90_ms": percentile(latencies, 90) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+    }
+
+
+def print_report(label, report):
+    print(f"{label:>12} | {report['rps']:9.1f} req/s | p50 {report['p50_ms']:7.2f} ms | "
+          f"p90 {report['p90_ms']:7.2f} ms | p99 {report['p99_ms']:7.2f} ms | "
+          f"max {report['max_ms']:7.2f} ms | {report['requests']} req, {report['errors']} error")
+
+
+def wait_until_ready(base_url, timeout=30):
+    parsed = urlparse(base_url)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port or 80, timeout=2)
+            conn.request("GET", "/api/yearly/__ready__/avg_close")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f"Server di {base_url} tidak merespons dalam {timeout} detik")
+
+
+# Menjalankan gunicorn untuk setiap jumlah worker dan mengukur throughput/latensi
+def sweep_workers(worker_counts, args, paths):
+    env = dict(os.environ, MONGO_URI=args.mongo_uri, MONGO_DB=args.db)
+    base_url = "http://127.0.0.1:%d" % args.port
+    here = os.path.dirname(os.path.abspath(__file__))
+    for workers in worker_counts:
+        process = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+             "-w", str(workers), "-b", f"127.0.0.1:{args.port}", "app:app"],
+            cwd=here, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            wait_until_ready(base_url)
+            run_load(base_url, paths, args.concurrency, min(3, args.duration))  # Pemanasan cache
+            print_report(f"{workers} worker", run_load(base_url, paths, args.concurrency, args.duration))
+        finally:
+            process.terminate()
+            process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test API yfinance")
+    parser.add_argument("--url", default="http://localhost:5000", help="Base URL server yang diuji")
+    parser.add_argument("--concurrency", type=int, default=16, help="Jumlah klien bersamaan")
+    parser.add_argument("--duration", type=float, default=20, help="Durasi pengujian (detik)")
+    parser.add_argument("--tickers", default=",".join(DEFAULT_TICKERS))
+    parser.add_argument("--mongo-uri", default="mongodb://localhost:27017")
+    parser.add_argument("--db", default="stock_data_loadtest", help="Database untuk --seed dan --sweep")
+    parser.add_argument("--seed", action="store_true", help="Isi database dengan data sintetis lalu keluar")
+    parser.add_argument("--days", type=int, default=3650, help="Jumlah hari data sintetis per ticker")
+    parser.add_argument("--sweep", help="Daftar jumlah worker gunicorn, contoh: 1,2,4,8")
+    parser.add_argument("--port", type=int, default=5055, help="Port gunicorn saat --sweep")
+    args = parser.parse_args()
+
+    tickers = [t.strip() for t in args.tickers.split(",") if t.strip()]
+    if args.seed:
+        seed_database(args.mongo_uri, args.db, tickers, args.days)
+        return
+
+    paths = build_paths(tickers)
+    if args.sweep:
+        sweep_workers([int(n) for n in args.sweep.split(",")], args, paths)
+    else:
+        print_report("server", run_load(args.url, paths, args.concurrency, args.duration))
+
+
+if __name__ == "__main__":
+    main()
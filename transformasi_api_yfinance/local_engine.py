@@ -0,0 +1,207 @@
+"""Engine lokal tanpa JVM: agregasi rata-rata spark.py dengan DuckDB in-process.
+
+    python spark.py --engine duckdb --source parquet     # agregasi + tulis MongoDB + hot tier
+    python local_engine.py --source parquet --dry-run    # hanya hitung, tanpa menulis
+    spark-submit local_engine.py --parity --source parquet
+
+Logika sama dengan build_daily_partials/build_averages di spark.py: sum dan count
+per hari per ticker, lalu rollup bulanan, tahunan, dan 2 tahunan dari agregat parsial
+tersebut. Hasilnya berupa {koleksi: (DataFrame pandas, field kunci)} yang ditulis lewat
+mongo_writer.write_documents dengan _id dan stempel versi yang sama seperti Spark.
+
+Engine ini selalu menghitung ulang seluruh histori (mode penuh) dan hanya mencakup
+koleksi avg_*; bar OHLCV, indikator, dan mode inkremental tetap dijalankan Spark.
+Watermark tidak diubah, sehingga run Spark inkremental berikutnya tetap memperbarui
+koleksi analitik.
+"""
+
+import argparse
+import os
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+from pymongo import ASCENDING
+
+from common import (DATABASE, MONGO_URI, PRICE_COLUMNS, ROLLUPS, SOURCE_COLLECTION, STAGING_DIR, mongo_client,
+                    stage, write_version_stamp)
+from hot_tier import encode_frame, hot_granularities, write_generation
+from mongo_writer import write_documents
+
+DAILY_COLLECTION = "daily_aggregation_ticker"
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+# Registrasi view `prices` (Date, ticker, kolom harga) dari snapshot Parquet staging.py atau MongoDB
+def register_source(con, source="parquet"):
+    columns = ", ".join(_quote(column) for column in PRICE_COLUMNS)
+    if source == "parquet":
+        pattern = os.path.join(STAGING_DIR, "**", "*.parquet")
+        con.execute(f"CREATE OR REPLACE VIEW prices AS SELECT CAST(Date AS DATE) AS Date, "
+                    f"CAST(ticker AS VARCHAR) AS ticker, {columns} "
+                    f"FROM read_parquet('{pattern}', hive_partitioning = true)")
+        return
+
+    projection = {"_id": 0, "Date": 1, "ticker": 1}
+    projection.update({column: 1 for column in PRICE_COLUMNS})
+    cursor = mongo_client[DATABASE][SOURCE_COLLECTION].find({}, projection, batch_size=10000)
+    frame = pd.DataFrame(list(cursor), columns=["Date", "ticker", *PRICE_COLUMNS])
+    con.register("prices_frame", frame)
+    con.execute(f"CREATE OR REPLACE VIEW prices AS SELECT CAST(Date AS DATE) AS Date, ticker, {columns} "
+                f"FROM prices_frame")
+
+
+# Agregat parsial harian + kolom periode, setara with_period_columns(build_daily_partials(df))
+def build_daily_partials(con):
+    aggregations = []
+    for source, name in PRICE_COLUMNS.items():
+        aggregations.append(f"SUM({_quote(source)}) AS sum_{name}")
+        aggregations.append(f"COUNT({_quote(source)}) AS count_{name}")
+    con.execute(f"""
+        CREATE OR REPLACE TEMP TABLE daily_partials AS
+        SELECT *,
+               year(Date) AS Year,
+               month(Date) AS Month,
+               CAST(year(Date) // 2 * 2 AS VARCHAR) || '-' || CAST(year(Date) // 2 * 2 + 1 AS VARCHAR) AS YearRange
+        FROM (SELECT Date, ticker, {", ".join(aggregations)} FROM prices GROUP BY Date, ticker)
+    """)
+
+
+# {koleksi: (DataFrame, field kunci)} dengan kolom field kunci, ticker, avg_<nama> seperti finalize_averages
+def build_averages(con):
+    outputs = {}
+    for collection_name, key_fields in [(DAILY_COLLECTION, ["Date"])] + list(ROLLUPS.items()):
+        keys = ", ".join(key_fields)
+        if key_fields == ["Date"]:
+            averages = [f"sum_{name} / count_{name} AS avg_{name}" for name in PRICE_COLUMNS.values()]
+            query = f"SELECT CAST(Date AS TIMESTAMP) AS Date, ticker, {', '.join(averages)} FROM daily_partials"
+        else:
+            averages = [f"SUM(sum_{name}) / SUM(count_{name}) AS avg_{name}" for name in PRICE_COLUMNS.values()]
+            query = (f"SELECT {keys}, ticker, {', '.join(averages)} FROM daily_partials "
+                     f"GROUP BY {keys}, ticker")
+        outputs[collection_name] = (con.execute(query).df(), key_fields)
+    return outputs
+
+
+def aggregate(source="parquet"):
+    """Menghitung seluruh koleksi rata-rata dalam satu koneksi DuckDB in-memory."""
+    con = duckdb.connect()
+    register_source(con, source)
+    build_daily_partials(con)
+    outputs = build_averages(con)
+    con.close()
+    return outputs
+
+
+# _id sama dengan with_document_id di spark.py: ticker|yyyy-MM-dd atau ticker|kunci
+def with_document_id(frame, key_fields):
+    keys = [frame[field].dt.strftime("%Y-%m-%d") if field == "Date" else frame[field].astype(str)
+            for field in key_fields]
+    frame = frame.copy()
+    frame["_id"] = frame["ticker"].str.cat(keys, sep="|")
+    return frame
+
+
+def run_local(timings, source="parquet", hot_tier=True):
+    """Mode penuh spark.py tanpa JVM: agregasi, swap koleksi, stempel versi, hot tier."""
+    with stage("agregasi duckdb", timings):
+        outputs = aggregate(source)
+        print(f"{len(outputs[DAILY_COLLECTION][0])} baris agregat harian")
+
+    for collection_name, (frame, key_fields) in outputs.items():
+        with stage(collection_name, timings):
+            index = [("ticker", ASCENDING)] + [(field, ASCENDING) for field in key_fields]
+            write_documents(with_document_id(frame, key_fields), MONGO_URI, DATABASE, collection_name,
+                            indexes=[index])
+            write_version_stamp(collection_name)
+
+    if hot_tier:
+        with stage("hot tier", timings):
+            write_generation({name: encode_frame(outputs[granularity.collection][0], granularity.key_fields)
+                              for name, granularity in hot_granularities().items()})
+
+
+def _normalize(frame, key_fields):
+    frame = frame.copy()
+    if "Date" in key_fields:
+        frame["Date"] = pd.to_datetime(frame["Date"])
+    return frame.sort_values(["ticker"] + key_fields).reset_index(drop=True)
+
+
+def compare_outputs(expected, actual, rtol=1e-9):
+    """Membandingkan dua hasil {koleksi: (DataFrame, field kunci)}; mengembalikan daftar selisih."""
+    problems = []
+    for collection_name, (frame, key_fields) in expected.items():
+        left = _normalize(frame, key_fields)
+        right = _normalize(actual[collection_name][0], key_fields)
+        if len(left) != len(right):
+            problems.append(f"{collection_name}: {len(left)} vs {len(right)} baris")
+            continue
+        keys = ["ticker"] + key_fields
+        if not left[keys].equals(right[keys].astype(left[keys].dtypes.to_dict())):
+            problems.append(f"{collection_name}: kunci berbeda")
+            continue
+        for column in [column for column in left.columns if column.startswith("avg_")]:
+            # Urutan penjumlahan floating point berbeda antar engine, jadi dibandingkan dengan toleransi
+            same = np.isclose(left[column].astype(float), right[column].astype(float), rtol=rtol, equal_nan=True)
+            if not same.all():
+                problems.append(f"{collection_name}.{column}: {int((~same).sum())} nilai berbeda")
+    return problems
+
+
+def check_parity(source="parquet"):
+    """Menjalankan Spark dan DuckDB pada sumber yang sama dan membandingkan hasilnya."""
+    from spark import build_averages as spark_averages, build_daily_partials as spark_partials, \
+        create_spark_session, read_source, with_period_columns
+
+    started = time.perf_counter()
+    local = aggregate(source)
+    local_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    spark = create_spark_session("Parity Check")
+    partials = with_period_columns(spark_partials(read_source(spark, source)))
+    expected = {name: (result.toPandas(), key_fields)
+                for name, (result, key_fields) in spark_averages(partials).items()}
+    spark_seconds = time.perf_counter() - started
+    spark.stop()
+
+    problems = compare_outputs(expected, local)
+    print(f"Spark {spark_seconds:.2f} detik (termasuk start JVM), DuckDB {local_seconds:.2f} detik")
+    for problem in problems:
+        print(f"  BEDA {problem}")
+    print("Parity OK" if not problems else f"Parity GAGAL: {len(problems)} selisih")
+    return not problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Agregasi harga per ticker tanpa JVM (DuckDB)")
+    parser.add_argument("--source", choices=["mongo", "parquet"], default="parquet",
+                        help="Snapshot Parquet staging.py atau idx_emiten di MongoDB")
+    parser.add_argument("--parity", action="store_true",
+                        help="Bandingkan hasil DuckDB dengan Spark pada sumber yang sama (butuh JVM)")
+    parser.add_argument("--dry-run", action="store_true", help="Hanya hitung dan tampilkan jumlah baris")
+    parser.add_argument("--no-hot-tier", action="store_true")
+    args = parser.parse_args()
+
+    if args.parity:
+        raise SystemExit(0 if check_parity(args.source) else 1)
+
+    timings = {}
+    if args.dry_run:
+        with stage("agregasi duckdb", timings):
+            outputs = aggregate(args.source)
+        for collection_name, (frame, _) in outputs.items():
+            print(f"{collection_name}: {len(frame)} baris")
+        return
+    run_local(timings, args.source, hot_tier=not args.no_hot_tier)
+    print("Ringkasan durasi: " + ", ".join(f"{name}={seconds:.2f}s" for name, seconds in timings.items()))
+    mongo_client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import time
+from datetime import datetime
+
+from pymongo import MongoClient, ReplaceOne
+
+# Ukuran batch insert per partisi; default connector (512) terlalu kecil untuk dokumen agregasi yang ringkas
+DEFAULT_MAX_BATCH_SIZE = 2048
+
+
+def write_collection(df, uri, database, collection, partition_key="ticker", num_partitions=None,
+                     indexes=(), mode="swap", max_batch_size=DEFAULT_MAX_BATCH_SIZE):
+    """Menulis DataFrame ke MongoDB secara paralel dan mengembalikan jumlah dokumen yang ditulis.
+
+    mode "swap": data ditulis ke koleksi sementara, indeks dibuat di sana, lalu koleksi
+    tersebut menggantikan koleksi tujuan secara atomik dengan renameCollection. Pembaca
+    tidak pernah melihat koleksi kosong atau setengah terisi.
+
+    mode "upsert": dokumen ditulis langsung ke koleksi tujuan dan mengganti dokumen
+    dengan _id yang sama (dipakai untuk pembaruan inkremental).
+    """
+    spark = df.sparkSession
+    num_partitions = num_partitions or spark.sparkContext.defaultParallelism * 2
+    client = MongoClient(uri)
+    db = client[database]
+
+    # Partisi merata per ticker agar setiap executor menulis dengan beban yang seimbang
+    df = df.repartition(num_partitions, partition_key)
+
+    if mode == "upsert":
+        df = df.cache()
+        target = collection
+        rows = df.count()
+    else:
+        target = f"{collection}__staging_{datetime.utcnow():%Y%m%d%H%M%S}"
+
+    started = time.perf_counter()
+    df.write.format("mongo") \
+        .option("uri", uri) \
+        .option("database", database) \
+        .option("collection", target) \
+        .option("maxBatchSize", str(max_batch_size)) \
+        .option("ordered", "false") \
+        .option("replaceDocument", "true") \
+        .mode("overwrite" if mode == "swap" else "append") \
+        .save()
+
+    if mode == "swap":
+        rows = db[target].estimated_document_count()
+    else:
+        df.unpersist()
+    write_seconds = time.perf_counter() - started
+
+    # Indeks query API dibuat sebelum koleksi dipakai (pada koleksi sementara untuk mode swap)
+    for index in indexes:
+        db[target].create_index(list(index))
+
+    if mode == "swap":
+        client.admin.command("renameCollection", f"{database}.{target}",
+                             to=f"{database}.{collection}", dropTarget=True)
+
+    client.close()
+    print(f"[{collection}] {rows} dokumen ditulis dalam {write_seconds:.2f} detik "
+          f"({rows / max(write_seconds, 1e-9):.0f} dokumen/detik, {num_partitions} partisi, mode {mode})")
+    return rows
+
+
+def write_documents(frame, uri, database, collection, indexes=(), mode="swap", batch_size=DEFAULT_MAX_BATCH_SIZE):
+    """Versi write_collection untuk DataFrame pandas (engine lokal tanpa Spark), dengan mode yang sama."""
+    client = MongoClient(uri)
+    db = client[database]
+    target = collection if mode == "upsert" else f"{collection}__staging_{datetime.utcnow():%Y%m%d%H%M%S}"
+    if mode == "swap":
+        db.create_collection(target)
+
+    # NaN menjadi null seperti kolom null pada DataFrame Spark
+    documents = frame.astype(object).where(frame.notna(), None).to_dict("records")
+
+    started = time.perf_counter()
+    for offset in range(0, len(documents), batch_size):
+        batch = documents[offset:offset + batch_size]
+        if mode == "upsert":
+            db[target].bulk_write([ReplaceOne({"_id": doc["_id"]}, doc, upsert=True) for doc in batch],
+                                  ordered=False)
+        else:
+            db[target].insert_many(batch, ordered=False)
+    write_seconds = time.perf_counter() - started
+    rows = len(documents)
+
+    for index in indexes:
+        db[target].create_index(list(index))
+
+    if mode == "swap":
+        client.admin.command("renameCollection", f"{database}.{target}",
+                             to=f"{database}.{collection}", dropTarget=True)
+
+    client.close()
+    print(f"[{collection}] {rows} dokumen ditulis dalam {write_seconds:.2f} detik "
+          f"({rows / max(write_seconds, 1e-9):.0f} dokumen/detik, mode {mode})")
+    return rows
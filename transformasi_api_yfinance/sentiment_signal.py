@@ -0,0 +1,195 @@
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+
+from pyspark.sql import SparkSession
+from pyspark.sql import functions as F
+
+from spark import (MONGO_URI, DATABASE, WATERMARK_COLLECTION, load_watermarks, mongo_client, stage,
+                   write_collection)
+
+# Hasil financial-news-analyzer (upload_to_mongodb.py); dapat berada di server MongoDB lain
+NEWS_URI = os.environ.get("NEWS_MONGO_URI", MONGO_URI)
+NEWS_DATABASE = "idx_financial_news"
+NEWS_COLLECTION = "iqplus_processed"
+
+PRICE_COLLECTION = "daily_aggregation_ticker"
+SIGNAL_COLLECTION = "daily_sentiment_signal_ticker"
+PRICE_FIELDS = ["avg_open", "avg_high", "avg_low", "avg_close", "avg_volume"]
+
+# Dokumen watermark di aggregation_watermarks: updated_at berita terakhir yang sudah diproses
+# (upload_to_mongodb.py mengisi updated_at pada setiap insert maupun update, jadi berita yang
+# diperbarui di tempat juga terdeteksi, tidak seperti watermark ObjectId)
+WATERMARK_ID = "sentiment_signal"
+
+# Nilai numerik setiap label sentimen; skor harian = rata-rata nilai berbobot confidence
+SENTIMENT_VALUES = {"positive": 1.0, "neutral": 0.0, "negative": -1.0}
+
+# reasoning default combined_analysis_service.py saat analisis LLM gagal
+FAILED_REASONING = "Error dalam proses analisis."
+
+# Ticker berita ("BBRI") dan ticker harga ("BBRI.JK") disamakan tanpa suffix bursa
+def ticker_key(column):
+    return F.regexp_replace(F.upper(F.trim(column)), r"\.JK$", "")
+
+def read_news(spark, pipeline):
+    return spark.read.format("mongo") \
+        .option("uri", NEWS_URI) \
+        .option("database", NEWS_DATABASE) \
+        .option("collection", NEWS_COLLECTION) \
+        .option("pipeline", json.dumps(pipeline)) \
+        .load()
+
+# Mencari tanggal berita yang terdampak oleh dokumen baru sejak watermark
+def detect_new_news(spark, last_updated_at):
+    pipeline = [{"$project": {"_id": 0, "effective_date": 1, "updated_at": 1}}]
+    if last_updated_at:
+        # $gte: dokumen dengan stempel yang sama dengan watermark diproses ulang (upsert idempoten)
+        since = last_updated_at.strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+        pipeline.insert(0, {"$match": {"updated_at": {"$gte": {"$date": since}}}})
+    summary = read_news(spark, pipeline) \
+        .agg(F.collect_set(F.substring("effective_date", 1, 10)).alias("dates"),
+             # Detik epoch (bukan timestamp) agar tidak dikonversi ke zona waktu lokal driver saat collect
+             F.max(F.col("updated_at").cast("double")).alias("last_updated_at")) \
+        .first()
+    last_updated_at = summary["last_updated_at"]
+    if last_updated_at is not None:
+        last_updated_at = datetime.utcfromtimestamp(last_updated_at)
+    return sorted(date for date in summary["dates"] if date), last_updated_at
+
+# Berita yang benar-benar dianalisis: hasil gagal diproses (field error, confidence 0) dan analisis
+# LLM yang gagal (analysis_method "failed", disimpan sebagai neutral dengan confidence 0.5) dibuang
+def analyzed(news):
+    condition = F.col("confidence") > 0
+    if "error" in news.columns:
+        condition = condition & F.col("error").isNull()
+    if "analysis_method" in news.columns:
+        condition = condition & (F.coalesce(F.col("analysis_method"), F.lit("")) != "failed")
+    # Hasil lama sebelum analysis_method "failed" hanya dapat dikenali dari reasoning default-nya
+    return news.where(condition & (F.coalesce(F.col("reasoning"), F.lit("")) != FAILED_REASONING))
+
+# Skor sentimen harian per ticker dari seluruh berita pada tanggal yang diminta
+def build_daily_sentiment(spark, dates=None):
+    pipeline = [{"$project": {"effective_date": 1, "tickers": 1, "sentiment": 1, "confidence": 1,
+                              "error": 1, "analysis_method": 1, "reasoning": 1}}]
+    if dates is not None:
+        # effective_date disimpan sebagai string ISO; bandingkan bagian tanggalnya saja
+        pipeline.insert(0, {"$match": {"$expr": {"$in": [{"$substrCP": ["$effective_date", 0, 10]}, dates]}}})
+
+    value = F.create_map(*[F.lit(x) for pair in SENTIMENT_VALUES.items() for x in pair])[F.col("sentiment")]
+    news = analyzed(read_news(spark, pipeline)) \
+        .select(F.to_date(F.substring("effective_date", 1, 10)).alias("Date"),
+                F.explode("tickers").alias("news_ticker"),
+                "sentiment", "confidence", value.alias("value")) \
+        .withColumn("ticker_key", ticker_key(F.col("news_ticker")))
+
+    return news.groupBy("ticker_key", "Date").agg(
+        (F.sum(F.col("value") * F.col("confidence")) / F.sum("confidence")).alias("sentiment_score"),
+        F.count(F.lit(1)).alias("article_count"),
+        F.avg("confidence").alias("avg_confidence"),
+        *[F.sum(F.when(F.col("sentiment") == label, 1).otherwise(0)).alias(f"{label}_count")
+          for label in SENTIMENT_VALUES],
+    )
+
+# Tanggal yang harganya baru diagregasi spark.py sejak run terakhir, dari watermark Date per ticker.
+# Harga hari ini baru masuk setelah penutupan pasar, sesudah beritanya diproses, sehingga baris
+# sinyal tanggal tersebut perlu dihitung ulang. None berarti ada ticker baru (seluruh tanggal).
+def detect_new_prices(previous, current):
+    if previous is None:
+        return []
+    starts = []
+    for ticker, last_date in current.items():
+        if ticker not in previous:
+            return None
+        if last_date > previous[ticker]:
+            starts.append(previous[ticker] + timedelta(days=1))
+    if not starts:
+        return []
+    first, last = min(starts), max(current.values())
+    return [(first + timedelta(days=offset)).strftime("%Y-%m-%d") for offset in range((last - first).days + 1)]
+
+# Harga harian hanya untuk rentang tanggal yang memiliki berita (tanpa batas jika first_date None)
+def read_prices(spark, first_date=None, last_date=None):
+    pipeline = []
+    if first_date:
+        pipeline.append({"$match": {"Date": {"$gte": {"$date": f"{first_date}T00:00:00Z"},
+                                             "$lte": {"$date": f"{last_date}T23:59:59Z"}}}})
+    return spark.read.format("mongo") \
+        .option("uri", MONGO_URI) \
+        .option("database", DATABASE) \
+        .option("collection", PRICE_COLLECTION) \
+        .option("pipeline", json.dumps(pipeline)) \
+        .load() \
+        .select(F.to_date("Date").alias("Date"), "ticker", *PRICE_FIELDS) \
+        .withColumn("ticker_key", ticker_key(F.col("ticker")))
+
+# Menggabungkan skor sentimen dengan harga pada (ticker, tanggal)
+# Hari tanpa perdagangan (akhir pekan, libur) tetap disimpan dengan kolom harga null.
+# ticker selalu berupa ticker_key ("BBRI"), sehingga seri satu emiten berada di bawah satu _id/ticker
+def build_signal(sentiment, prices):
+    return sentiment.join(prices.drop("ticker"), ["ticker_key", "Date"], "left") \
+        .withColumnRenamed("ticker_key", "ticker")
+
+# Mengembalikan (updated_at berita terakhir, snapshot watermark harga per ticker) dari run sebelumnya.
+# Watermark lama (last_id berbasis ObjectId) tidak dipakai lagi; tanpa last_updated_at dihitung penuh
+def load_watermark():
+    doc = mongo_client[DATABASE][WATERMARK_COLLECTION].find_one({"_id": WATERMARK_ID}) or {}
+    prices = doc.get("price_watermarks")
+    # Disimpan sebagai list karena ticker seperti "BBRI.JK" tidak valid sebagai nama field
+    prices = {entry["ticker"]: entry["last_date"] for entry in prices} if prices is not None else None
+    return doc.get("last_updated_at"), prices
+
+def save_watermark(last_updated_at, price_watermarks):
+    prices = [{"ticker": ticker, "last_date": last_date} for ticker, last_date in sorted(price_watermarks.items())]
+    mongo_client[DATABASE][WATERMARK_COLLECTION].update_one(
+        {"_id": WATERMARK_ID},
+        {"$set": {"last_updated_at": last_updated_at, "price_watermarks": prices, "updated_at": datetime.utcnow()},
+         "$unset": {"last_id": ""}},
+        upsert=True
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description="Sinyal harian per ticker: sentimen berita + harga")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="Hitung ulang seluruh berita dan tulis ulang koleksi sinyal")
+    args = parser.parse_args()
+
+    spark = SparkSession.builder \
+        .appName("Sentiment Signal") \
+        .config("spark.jars.packages", "org.mongodb.spark:mongo-spark-connector_2.12:3.0.1") \
+        .getOrCreate()
+
+    timings = {}
+    last_updated_at, previous_prices = (None, None) if args.full_rebuild else load_watermark()
+    incremental = last_updated_at is not None
+    # Dibaca sebelum berita: harga yang masuk selama job berjalan diproses pada run berikutnya
+    current_prices = load_watermarks()
+
+    # 1. Tanggal yang perlu dihitung ulang: berita baru/diperbarui dan harga baru (seluruhnya pada run pertama)
+    with stage("deteksi berita dan harga baru", timings):
+        dates, new_last_updated_at = detect_new_news(spark, last_updated_at)
+        if incremental:
+            price_dates = detect_new_prices(previous_prices, current_prices)
+            dates = None if price_dates is None else sorted(set(dates) | set(price_dates))
+    if dates is not None and not dates:
+        print("Tidak ada berita atau harga baru sejak run terakhir.")
+        spark.stop()
+        return
+
+    # 2. Skor harian untuk tanggal terdampak, digabung dengan harga, lalu di-upsert per (ticker, Date)
+    with stage(SIGNAL_COLLECTION, timings):
+        sentiment = build_daily_sentiment(spark, dates if incremental else None)
+        prices = read_prices(spark, dates[0], dates[-1]) if dates else read_prices(spark)
+        signal = build_signal(sentiment, prices)
+        write_collection(signal, SIGNAL_COLLECTION, ["Date"], mode="upsert" if incremental else "swap")
+
+    save_watermark(new_last_updated_at or last_updated_at, current_prices)
+    print(f"{len(dates) if dates else 'seluruh'} tanggal diproses ({'inkremental' if incremental else 'penuh'})")
+    print("Ringkasan durasi: " + ", ".join(f"{name}={seconds:.2f}s" for name, seconds in timings.items()))
+
+    mongo_client.close()
+    spark.stop()
+
+if __name__ == "__main__":
+    main()
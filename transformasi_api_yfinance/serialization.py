@@ -0,0 +1,91 @@
+import gzip
+import json
+from datetime import date, datetime
+
+# Format biner bersifat opsional; API tetap berjalan dengan JSON + gzip tanpanya
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+JSON_MIMETYPE = "application/json"
+MSGPACK_MIMETYPE = "application/x-msgpack"
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+
+# Kompresi hanya sepadan untuk payload yang cukup besar
+MIN_COMPRESS_SIZE = 1024
+
+
+def supported_mimetypes():
+    mimetypes = [JSON_MIMETYPE]
+    if msgpack is not None:
+        mimetypes.append(MSGPACK_MIMETYPE)
+    if pa is not None:
+        mimetypes.append(ARROW_MIMETYPE)
+    return mimetypes
+
+
+def negotiate_mimetype(accept):
+    """Memilih format respons dari header Accept, default JSON."""
+    return accept.best_match(supported_mimetypes(), default=JSON_MIMETYPE)
+
+
+def negotiate_encoding(accept_encodings):
+    """Memilih kompresi dari header Accept-Encoding (br lebih diutamakan)."""
+    if brotli is not None and accept_encodings["br"]:
+        return "br"
+    if accept_encodings["gzip"]:
+        return "gzip"
+    return None
+
+
+def _to_plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.date().isoformat() if isinstance(value, datetime) else value.isoformat()
+    return value
+
+
+def encode_columnar(series, key_fields, columns, mimetype):
+    """Mengubah seri kolumnar {ticker: {field: [..]}} menjadi bytes sesuai format.
+
+    JSON dan msgpack mengirim array paralel per ticker; Arrow IPC mengirim satu
+    tabel dengan kolom `ticker` yang sudah terurut per ticker.
+    """
+    if mimetype == ARROW_MIMETYPE:
+        fields = ["ticker"] + key_fields + columns
+        arrays = {field: [] for field in fields}
+        for ticker, values in series.items():
+            arrays["ticker"].extend([ticker] * len(values[key_fields[0]]))
+            for field in fields[1:]:
+                arrays[field].extend(values[field])
+        table = pa.table(arrays)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    plain = {
+        ticker: {field: [_to_plain(v) for v in values] for field, values in fields.items()}
+        for ticker, fields in series.items()
+    }
+    if mimetype == MSGPACK_MIMETYPE:
+        return msgpack.packb(plain, use_bin_type=True)
+    return json.dumps(plain, separators=(",", ":")).encode("utf-8")
+
+
+def compress(body, encoding):
+    if encoding is None or len(body) < MIN_COMPRESS_SIZE:
+        return body, None
+    if encoding == "br":
+        return brotli.compress(body, quality=5), "br"
+    return gzip.compress(body, compresslevel=6), "gzip"
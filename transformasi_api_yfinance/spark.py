@@ -1,109 +1,308 @@
+import argparse
+import json
+import operator
+from functools import reduce
+from datetime import datetime, timedelta
+
+from pymongo import UpdateOne, ASCENDING
+from pyspark import StorageLevel
 from pyspark.sql import SparkSession
 from pyspark.sql import functions as F
 
-# Inisialisasi Spark session
-spark = SparkSession.builder \
-    .appName("MongoDB Integration") \
-    .config("spark.mongodb.input.uri", "mongodb://localhost:27017/stock_data.idx_emiten") \
-    .config("spark.mongodb.output.uri", "mongodb://localhost:27017/stock_data.idx_emiten") \
-    .config("spark.jars.packages", "org.mongodb.spark:mongo-spark-connector_2.12:3.0.1") \
-    .getOrCreate()
-
-# Membaca data dari MongoDB koleksi
-df = spark.read.format("mongo").load()
-
-# Mengonversi kolom 'Date' menjadi tipe tanggal yang benar
-df = df.withColumn("Date", F.to_date(F.col("Date")))
-
-# 1. Agregasi Harian (per hari), berdasarkan ticker
-df_daily = df.groupBy("Date", "ticker").agg(
-    F.avg("Open").alias("avg_open"),
-    F.avg("High").alias("avg_high"),
-    F.avg("Low").alias("avg_low"),
-    F.avg("Close").alias("avg_close"),
-    F.avg("Volume").alias("avg_volume"),
-    F.avg("Dividends").alias("avg_dividends"),
-    F.avg("Stock Splits").alias("avg_stock_splits")
-)
-
-# Menyimpan hasil agregasi harian ke MongoDB
-df_daily.write.format("mongo") \
-    .option("uri", "mongodb://localhost:27017") \
-    .option("database", "stock_data") \
-    .option("collection", "daily_aggregation_ticker") \
-    .mode("overwrite") \
-    .save()
-
-# print("Harian agregasi per ticker berhasil disimpan ke MongoDB!")
-
-# 2. Agregasi Bulanan (per bulan), berdasarkan ticker
-df_monthly = df.withColumn("Year", F.year(F.col("Date"))) \
-               .withColumn("Month", F.month(F.col("Date"))) \
-               .groupBy("Year", "Month", "ticker").agg(
-                   F.avg("Open").alias("avg_open"),
-                   F.avg("High").alias("avg_high"),
-                   F.avg("Low").alias("avg_low"),
-                   F.avg("Close").alias("avg_close"),
-                   F.avg("Volume").alias("avg_volume"),
-                   F.avg("Dividends").alias("avg_dividends"),
-                   F.avg("Stock Splits").alias("avg_stock_splits")
-               )
-
-# Menyimpan hasil agregasi bulanan ke MongoDB
-df_monthly.write.format("mongo") \
-    .option("uri", "mongodb://localhost:27017") \
-    .option("database", "stock_data") \
-    .option("collection", "monthly_aggregation_ticker") \
-    .mode("overwrite") \
-    .save()
-
-# print("Bulanan agregasi per ticker berhasil disimpan ke MongoDB!")
-
-# 3. Agregasi Tahunan (per tahun), berdasarkan ticker
-df_yearly = df.withColumn("Year", F.year(F.col("Date"))) \
-              .groupBy("Year", "ticker").agg(
-                  F.avg("Open").alias("avg_open"),
-                  F.avg("High").alias("avg_high"),
-                  F.avg("Low").alias("avg_low"),
-                  F.avg("Close").alias("avg_close"),
-                  F.avg("Volume").alias("avg_volume"),
-                  F.avg("Dividends").alias("avg_dividends"),
-                  F.avg("Stock Splits").alias("avg_stock_splits")
-              )
-
-# Menyimpan hasil agregasi tahunan ke MongoDB
-df_yearly.write.format("mongo") \
-    .option("uri", "mongodb://localhost:27017") \
-    .option("database", "stock_data") \
-    .option("collection", "yearly_aggregation_ticker") \
-    .mode("overwrite") \
-    .save()
-
-# print("Tahunan agregasi per ticker berhasil disimpan ke MongoDB!")
-
-# 4. Agregasi 2 Tahun (per 2 tahun), berdasarkan ticker
-df_2year = df.withColumn("Year", F.year(F.col("Date"))) \
-             .withColumn("YearRange", F.concat_ws("-", 
-                 F.floor(F.col("Year") / 2) * 2,
-                 F.floor(F.col("Year") / 2) * 2 + 1)) \
-             .groupBy("YearRange", "ticker").agg(
-                 F.avg("Open").alias("avg_open"),
-                 F.avg("High").alias("avg_high"),
-                 F.avg("Low").alias("avg_low"),
-                 F.avg("Close").alias("avg_close"),
-                 F.avg("Volume").alias("avg_volume"),
-                 F.avg("Dividends").alias("avg_dividends"),
-                 F.avg("Stock Splits").alias("avg_stock_splits")
-             )
-
-# Menyimpan hasil agregasi 2 tahunan ke MongoDB
-df_2year.write.format("mongo") \
-    .option("uri", "mongodb://localhost:27017") \
-    .option("database", "stock_data") \
-    .option("collection", "2year_aggregation_ticker") \
-    .mode("overwrite") \
-    .save()
-
-print("2 Tahun agregasi per ticker berhasil disimpan ke MongoDB!")
+from analytics import build_analytics, INDICATOR_LOOKBACK_DAYS
+from common import (DATABASE, MONGO_URI, PRICE_COLUMNS, ROLLUPS, STAGING_DIR, WATERMARK_COLLECTION, mongo_client,
+                    stage, write_version_stamp)
+from mongo_writer import write_collection as write_mongo_collection
+from hot_tier import export_hot_tier, hot_granularities, spark_frame, update_generation, write_generation
+
+# Syarat bucket yang terdampak data baru, relatif terhadap tanggal baru paling awal per ticker
+def affected_buckets(key_fields, first):
+    if key_fields == ["Date"]:
+        return F.col("Date") >= first
+    if key_fields == ["Year", "Month"]:
+        return F.col("Year") * 100 + F.col("Month") >= F.year(first) * 100 + F.month(first)
+    if key_fields == ["Year"]:
+        return F.col("Year") >= F.year(first)
+    # YearRange berbentuk "2022-2023"; bandingkan tahun awalnya
+    return F.split(F.col("YearRange"), "-").getItem(0).cast("int") >= F.floor(F.year(first) / 2) * 2
+
+# Operator perbandingan Date dalam bentuk MongoDB dan Spark
+DATE_OPERATORS = {"$gt": operator.gt, "$gte": operator.ge}
+
+# Satu klausa filter sumber dalam dua bentuk: $match untuk MongoDB dan kolom Spark untuk Parquet.
+# Untuk Parquet, syarat Year ikut ditambahkan agar partisi tahun yang tidak relevan dilewati.
+def source_clause(tickers=None, exclude=False, date_op=None, date=None):
+    match, condition = {}, F.lit(True)
+    if tickers is not None:
+        match["ticker"] = {"$nin" if exclude else "$in": list(tickers)}
+        in_tickers = F.col("ticker").isin(list(tickers))
+        condition = ~in_tickers if exclude else in_tickers
+    if date_op is not None:
+        match["Date"] = {date_op: _bson_date(date)}
+        condition = condition & DATE_OPERATORS[date_op](F.col("Date"), F.lit(date)) \
+                              & (F.col("Year") >= date.year)
+    return match, condition
+
+# Menggabungkan beberapa klausa dengan OR
+def any_of(clauses):
+    return {"$or": [match for match, _ in clauses]}, reduce(operator.or_, [cond for _, cond in clauses])
+
+# Membaca sumber sekali, hanya kolom yang dibutuhkan
+# source "mongo" membaca idx_emiten lewat connector (filter dikirim sebagai $match ke server),
+# source "parquet" membaca snapshot dari staging.py (filter menjadi partition pruning)
+def read_source(spark, source="mongo", source_filter=None):
+    if source == "parquet":
+        df = spark.read.parquet(STAGING_DIR)
+        if source_filter is not None:
+            df = df.where(source_filter[1])
+        return df.select("Date", "ticker", *[F.col(f"`{c}`") for c in PRICE_COLUMNS])
+
+    reader = spark.read.format("mongo")
+    if source_filter is not None:
+        reader = reader.option("pipeline", json.dumps([{"$match": source_filter[0]}]))
+    df = reader.load() \
+        .select("Date", "ticker", *[F.col(f"`{c}`") for c in PRICE_COLUMNS])
+    # Mengonversi kolom 'Date' menjadi tipe tanggal yang benar
+    return df.withColumn("Date", F.to_date(F.col("Date")))
+
+# Agregat parsial harian (sum dan count per kolom) yang menjadi dasar seluruh rollup,
+# ditambah bar OHLC harian untuk tahap analitik
+def build_daily_partials(df):
+    aggregations = []
+    for source, name in PRICE_COLUMNS.items():
+        aggregations.append(F.sum(F.col(f"`{source}`")).alias(f"sum_{name}"))
+        aggregations.append(F.count(F.col(f"`{source}`")).alias(f"count_{name}"))
+    aggregations += [
+        F.first("Open", ignorenulls=True).alias("first_open"),
+        F.max("High").alias("max_high"),
+        F.min("Low").alias("min_low"),
+        F.last("Close", ignorenulls=True).alias("last_close"),
+    ]
+    return df.groupBy("Date", "ticker").agg(*aggregations)
+
+# Menambahkan kolom periode (Year, Month, YearRange) dari kolom Date
+def with_period_columns(df):
+    year = F.year(F.col("Date"))
+    return df.withColumn("Year", year) \
+             .withColumn("Month", F.month(F.col("Date"))) \
+             .withColumn("YearRange", F.concat_ws("-",
+                 F.floor(year / 2) * 2,
+                 F.floor(year / 2) * 2 + 1))
+
+# Menggabungkan agregat parsial ke granularitas yang lebih kasar (sum dari sum dan count)
+def rollup_partials(partials, key_fields):
+    aggregations = []
+    for name in PRICE_COLUMNS.values():
+        aggregations.append(F.sum(f"sum_{name}").alias(f"sum_{name}"))
+        aggregations.append(F.sum(f"count_{name}").alias(f"count_{name}"))
+    return partials.groupBy(*key_fields, "ticker").agg(*aggregations)
+
+# Mengubah agregat parsial menjadi kolom rata-rata avg_<nama>
+def finalize_averages(partials, key_fields):
+    averages = [
+        (F.col(f"sum_{name}") / F.col(f"count_{name}")).alias(f"avg_{name}")
+        for name in PRICE_COLUMNS.values()
+    ]
+    return partials.select(*key_fields, "ticker", *averages)
+
+# Seluruh koleksi rata-rata dari agregat parsial harian: {koleksi: (DataFrame, field kunci)}
+# local_engine.py menghasilkan struktur yang sama dengan DuckDB
+def build_averages(daily_partials):
+    outputs = {"daily_aggregation_ticker": (finalize_averages(daily_partials, ["Date"]), ["Date"])}
+    for collection_name, key_fields in ROLLUPS.items():
+        rolled = finalize_averages(rollup_partials(daily_partials, key_fields), key_fields)
+        outputs[collection_name] = (rolled, key_fields)
+    return outputs
+
+# _id deterministik (ticker + kunci periode) agar penulisan ulang sebuah bucket menjadi upsert
+def with_document_id(df, key_fields):
+    keys = [F.date_format("Date", "yyyy-MM-dd") if field == "Date" else F.col(field).cast("string")
+            for field in key_fields]
+    return df.withColumn("_id", F.concat_ws("|", F.col("ticker"), *keys))
+
+# Menyimpan DataFrame ke koleksi MongoDB lalu menandai versi barunya
+# mode "swap" mengganti seluruh koleksi secara atomik, mode "upsert" mengganti dokumen berdasarkan _id
+# Indeks (ticker, field kunci) yang dipakai query app.py dibuat sebagai bagian dari penulisan
+def write_collection(df, collection_name, key_fields, mode="swap"):
+    index = [("ticker", ASCENDING)] + [(field, ASCENDING) for field in key_fields]
+    write_mongo_collection(with_document_id(df, key_fields), MONGO_URI, DATABASE, collection_name,
+                           partition_key="ticker", indexes=[index], mode=mode)
+    write_version_stamp(collection_name)
+
+# Mengambil high-watermark Date per ticker dari run sebelumnya
+def load_watermarks():
+    return {doc["_id"]: doc["last_date"]
+            # Koleksi yang sama juga menyimpan watermark job lain (mis. sentiment_signal.py)
+            for doc in mongo_client[DATABASE][WATERMARK_COLLECTION].find({"last_date": {"$exists": True}})}
+
+# Menyimpan Date terakhir per ticker yang sudah diagregasi
+# Mode penuh memakai "$set" (watermark diatur ulang), mode inkremental "$max" (hanya maju)
+def save_watermarks(daily_partials, operator="$max"):
+    rows = daily_partials.groupBy("ticker").agg(F.max("Date").alias("last_date")).collect()
+    operations = [
+        UpdateOne({"_id": row["ticker"]},
+                  {operator: {"last_date": datetime.combine(row["last_date"], datetime.min.time())}},
+                  upsert=True)
+        for row in rows if row["last_date"] is not None
+    ]
+    if operations:
+        mongo_client[DATABASE][WATERMARK_COLLECTION].bulk_write(operations, ordered=False)
+
+def _bson_date(value):
+    return {"$date": datetime.combine(value, datetime.min.time()).strftime("%Y-%m-%dT%H:%M:%SZ")}
+
+# Mode penuh: seluruh histori dihitung ulang dan setiap koleksi ditulis ulang
+def run_full(spark, timings, source, hot_tier=True):
+    # 1. Membaca sumber sekali dan menghitung agregat parsial harian
+    with stage("baca sumber + agregat harian", timings):
+        df = read_source(spark, source).persist(StorageLevel.MEMORY_AND_DISK)
+        daily_partials = with_period_columns(build_daily_partials(df)) \
+            .persist(StorageLevel.MEMORY_AND_DISK)
+        print(f"{daily_partials.count()} baris agregat harian")
+        # Data mentah tidak lagi dibutuhkan setelah agregat harian tersimpan di cache
+        df.unpersist()
+
+    # 2-3. Agregasi Harian, Bulanan, Tahunan, dan 2 Tahunan dari agregat parsial harian
+    averages = build_averages(daily_partials)
+    for collection_name, (result, key_fields) in averages.items():
+        with stage(collection_name, timings):
+            write_collection(result, collection_name, key_fields)
+
+    # 4. Bar OHLCV dan indikator teknikal dari frame harian yang sama
+    for collection_name, (result, key_fields) in build_analytics(daily_partials).items():
+        with stage(collection_name, timings):
+            write_collection(result, collection_name, key_fields)
+
+    with stage("watermark", timings):
+        save_watermarks(daily_partials, operator="$set")
+
+    # Snapshot seri harga untuk app.py dari hasil yang sama, ditukar setelah koleksi selesai ditulis
+    if hot_tier:
+        with stage("hot tier", timings):
+            write_generation({name: spark_frame(averages[granularity.collection][0], granularity.key_fields)
+                              for name, granularity in hot_granularities().items()})
+    daily_partials.unpersist()
+
+# Mode inkremental: hanya baris setelah watermark yang dibaca, hanya bucket terdampak yang di-upsert
+def run_incremental(spark, timings, watermarks, source, hot_tier=True):
+    # 1. Mencari baris baru; filter Date dijalankan di MongoDB, ticker baru dibaca seluruhnya
+    with stage("deteksi data baru", timings):
+        new_rows = any_of([
+            source_clause(date_op="$gt", date=min(watermarks.values()).date()),
+            source_clause(tickers=watermarks, exclude=True),
+        ])
+        known = spark.createDataFrame(
+            [(ticker, last_date.date()) for ticker, last_date in watermarks.items()],
+            "ticker string, last_date date")
+        affected = read_source(spark, source, new_rows) \
+            .join(F.broadcast(known), "ticker", "left") \
+            .where(F.col("last_date").isNull() | (F.col("Date") > F.col("last_date"))) \
+            .groupBy("ticker").agg(F.min("Date").alias("first_new_date")) \
+            .collect()
+
+    if not affected:
+        print("Tidak ada data baru sejak run terakhir.")
+        return
+
+    # 2. Membaca ulang baris mulai awal bucket 2 tahun terdampak (atau lebih awal lagi agar
+    #    jendela indikator terisi), dikelompokkan per tanggal awal
+    starts = {}
+    for row in affected:
+        first = row["first_new_date"]
+        start = min(first.replace(year=first.year // 2 * 2, month=1, day=1),
+                    first - timedelta(days=INDICATOR_LOOKBACK_DAYS))
+        starts.setdefault(start, []).append(row["ticker"])
+    rebuild = any_of([
+        source_clause(tickers=tickers, date_op="$gte", date=start)
+        for start, tickers in starts.items()
+    ])
+    first_dates = F.broadcast(spark.createDataFrame(
+        [(row["ticker"], row["first_new_date"]) for row in affected],
+        "ticker string, first_new_date date"))
+
+    with stage("baca bucket terdampak + agregat harian", timings):
+        df = read_source(spark, source, rebuild).persist(StorageLevel.MEMORY_AND_DISK)
+        daily_partials = with_period_columns(build_daily_partials(df)) \
+            .persist(StorageLevel.MEMORY_AND_DISK)
+        print(f"{len(affected)} ticker terdampak, {daily_partials.count()} baris agregat harian dihitung ulang")
+        df.unpersist()
+
+    # 3. Upsert bucket terdampak untuk setiap granularitas, bar OHLCV, dan indikator
+    outputs = build_averages(daily_partials)
+    outputs.update(build_analytics(daily_partials))
+
+    changed = {}
+    for collection_name, (result, key_fields) in outputs.items():
+        with stage(collection_name, timings):
+            result = result.join(first_dates, "ticker") \
+                .where(affected_buckets(key_fields, F.col("first_new_date"))) \
+                .drop("first_new_date")
+            write_collection(result, collection_name, key_fields, mode="upsert")
+            changed[collection_name] = result
+
+    with stage("watermark", timings):
+        save_watermarks(daily_partials)
+
+    # Hot tier: hanya bucket terdampak yang dikumpulkan ke driver dan menimpa generasi aktif;
+    # ekspor penuh dari MongoDB hanya jika belum ada generasi
+    if hot_tier:
+        with stage("hot tier", timings):
+            frames = {name: spark_frame(changed[granularity.collection], granularity.key_fields)
+                      for name, granularity in hot_granularities().items()}
+            if update_generation(frames) is None:
+                export_hot_tier(spark, MONGO_URI, DATABASE)
+    daily_partials.unpersist()
+
+def create_spark_session(app_name="MongoDB Integration"):
+    return SparkSession.builder \
+        .appName(app_name) \
+        .config("spark.mongodb.input.uri", f"{MONGO_URI}/{DATABASE}.idx_emiten") \
+        .config("spark.mongodb.output.uri", f"{MONGO_URI}/{DATABASE}.idx_emiten") \
+        .config("spark.jars.packages", "org.mongodb.spark:mongo-spark-connector_2.12:3.0.1") \
+        .getOrCreate()
+
+def main():
+    parser = argparse.ArgumentParser(description="Agregasi data saham per ticker ke MongoDB")
+    parser.add_argument("--full-rebuild", action="store_true",
+                        help="Hitung ulang seluruh histori dan tulis ulang semua koleksi (backfill)")
+    parser.add_argument("--source", choices=["mongo", "parquet"], default="mongo",
+                        help="Baca idx_emiten langsung dari MongoDB atau dari snapshot Parquet staging.py")
+    parser.add_argument("--no-hot-tier", action="store_true",
+                        help="Lewati ekspor hot tier (array memory-mapped untuk app.py)")
+    parser.add_argument("--engine", choices=["spark", "duckdb"], default="spark",
+                        help="duckdb: agregasi in-process tanpa JVM (lihat local_engine.py)")
+    args = parser.parse_args()
+
+    if args.engine == "duckdb" and args.full_rebuild:
+        # Engine DuckDB selalu menghitung ulang koleksi avg_* saja; bar OHLCV, indikator, dan watermark
+        # hanya dibangun ulang oleh Spark
+        parser.error("--full-rebuild hanya didukung --engine spark")
+
+    timings = {}
+    if args.engine == "duckdb":
+        from local_engine import run_local
+        run_local(timings, args.source, hot_tier=not args.no_hot_tier)
+        print("Ringkasan durasi: " + ", ".join(f"{name}={seconds:.2f}s" for name, seconds in timings.items()))
+        mongo_client.close()
+        return
+
+    # Inisialisasi Spark session
+    spark = create_spark_session()
+
+    # Tanpa watermark (run pertama) job otomatis berjalan dalam mode penuh
+    watermarks = {} if args.full_rebuild else load_watermarks()
+    if watermarks:
+        print(f"Mode inkremental: {len(watermarks)} ticker memiliki watermark")
+        run_incremental(spark, timings, watermarks, args.source, hot_tier=not args.no_hot_tier)
+    else:
+        print("Mode penuh: seluruh histori dihitung ulang")
+        run_full(spark, timings, args.source, hot_tier=not args.no_hot_tier)
+
+    print("Agregasi per ticker berhasil disimpan ke MongoDB!")
+    print("Ringkasan durasi: " + ", ".join(f"{name}={seconds:.2f}s" for name, seconds in timings.items()))
 
+    mongo_client.close()
+    spark.stop()
 
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Snapshot koleksi idx_emiten ke Parquet lokal yang dipartisi per ticker/tahun.
+
+    spark-submit staging.py            # refresh inkremental (hanya baris baru)
+    spark-submit staging.py --full     # snapshot ulang seluruh koleksi
+
+Job Spark lain membaca snapshot ini dengan `spark-submit spark.py --source parquet`,
+sehingga mendapat column pruning, partition pruning, dan input yang dapat diulang.
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from pyspark.sql import SparkSession
+from pyspark.sql import functions as F
+
+from common import DATABASE, MONGO_URI, SOURCE_COLLECTION, STAGING_DIR
+
+STATE_FILE = "_staging_state.json"
+
+# Kolom yang disalin dari MongoDB; kolom lain tidak pernah dibaca job hilir
+STAGED_COLUMNS = ["Date", "ticker", "Open", "High", "Low", "Close", "Volume", "Dividends", "Stock Splits"]
+
+
+def load_state(staging_dir):
+    path = os.path.join(staging_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(staging_dir, state):
+    # Ditulis ke file sementara lalu di-rename agar state tidak pernah setengah tertulis
+    path = os.path.join(staging_dir, STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def snapshot_prices(spark, staging_dir=STAGING_DIR, full=False):
+    """Menyalin baris idx_emiten ke Parquet dan mengembalikan jumlah baris yang ditulis."""
+    state = {} if full else load_state(staging_dir)
+    watermarks = state.get("tickers")
+    if state and watermarks is None:
+        # State lama hanya menyimpan satu last_date global; tidak dapat dilanjutkan per ticker
+        print("State staging tanpa watermark per ticker, snapshot ulang penuh")
+        full, state = True, {}
+
+    reader = spark.read.format("mongo") \
+        .option("uri", MONGO_URI) \
+        .option("database", DATABASE) \
+        .option("collection", SOURCE_COLLECTION)
+    if watermarks:
+        # Watermark per ticker: ticker yang tertinggal atau baru tetap tersalin seluruhnya.
+        # Ticker dengan last_date yang sama digabung dalam satu klausa; filter dijalankan di MongoDB
+        by_date = {}
+        for ticker, last_date in watermarks.items():
+            by_date.setdefault(last_date, []).append(ticker)
+        clauses = [{"ticker": {"$in": tickers}, "Date": {"$gt": {"$date": last_date}}}
+                   for last_date, tickers in by_date.items()]
+        clauses.append({"ticker": {"$nin": list(watermarks)}})
+        reader = reader.option("pipeline", json.dumps([{"$match": {"$or": clauses}}]))
+
+    df = reader.load() \
+        .select(*[F.col(f"`{c}`") for c in STAGED_COLUMNS]) \
+        .withColumn("source_date", F.col("Date")) \
+        .withColumn("Date", F.to_date(F.col("Date"))) \
+        .withColumn("Year", F.year(F.col("Date")))
+    if watermarks:
+        # $gt di MongoDB memakai timestamp mentah; hari yang sudah di-stage per ticker tetap
+        # disaring di sini (sama seperti run_incremental di spark.py) agar tidak pernah ditulis dua kali
+        staged = spark.createDataFrame(list(watermarks.items()), "ticker string, watermark string") \
+            .select("ticker", F.to_date(F.to_timestamp("watermark")).alias("last_date"))
+        df = df.join(F.broadcast(staged), "ticker", "left") \
+            .where(F.col("last_date").isNull() | (F.col("Date") > F.col("last_date"))) \
+            .drop("last_date")
+    df = df.cache()
+
+    # Watermark = Date mentah terbesar dalam UTC, bukan tanggal yang dibulatkan ke tengah malam
+    timezone = spark.conf.get("spark.sql.session.timeZone")
+    last_dates = df.groupBy("ticker").agg(
+        F.count(F.lit(1)).alias("rows"),
+        F.date_format(F.to_utc_timestamp(F.max("source_date"), timezone),
+                      "yyyy-MM-dd'T'HH:mm:ss.SSS'Z'").alias("last_date")) \
+        .collect()
+    rows = sum(row["rows"] for row in last_dates)
+    if rows:
+        df.drop("source_date") \
+            .repartition("ticker", "Year") \
+            .write.mode("overwrite" if full else "append") \
+            .partitionBy("ticker", "Year") \
+            .parquet(staging_dir)
+
+        watermarks = dict(watermarks or {})
+        for row in last_dates:
+            if row["last_date"] is None:
+                continue
+            watermarks[row["ticker"]] = max(row["last_date"], watermarks.get(row["ticker"], row["last_date"]))
+        state = {"tickers": watermarks, "refreshed_at": datetime.utcnow().isoformat()}
+        os.makedirs(staging_dir, exist_ok=True)
+        save_state(staging_dir, state)
+
+    df.unpersist()
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot idx_emiten ke Parquet lokal")
+    parser.add_argument("--full", action="store_true", help="Snapshot ulang seluruh koleksi")
+    parser.add_argument("--staging-dir", default=STAGING_DIR)
+    args = parser.parse_args()
+
+    spark = SparkSession.builder \
+        .appName("Staging idx_emiten") \
+        .config("spark.jars.packages", "org.mongodb.spark:mongo-spark-connector_2.12:3.0.1") \
+        .getOrCreate()
+
+    started = time.perf_counter()
+    rows = snapshot_prices(spark, args.staging_dir, full=args.full)
+    print(f"{rows} baris ditulis ke {args.staging_dir} dalam {time.perf_counter() - started:.2f} detik")
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
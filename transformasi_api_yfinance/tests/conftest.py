@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Modul diimpor seperti oleh app.py dan spark.py, dari direktori proyek
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,42 @@
+import mongomock
+import pandas as pd
+import pytest
+
+import app as api
+from cache import CollectionVersions, ResponseCache
+from hot_tier import HotTier, encode_frame, write_generation
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    db = mongomock.MongoClient().db
+    frame = pd.DataFrame({"ticker": ["BBRI.JK"] * 3,
+                          "Date": pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04"]),
+                          "avg_close": [1.0, 2.0, 3.0]})
+    write_generation({"daily": encode_frame(frame, ["Date"])}, str(tmp_path))
+    monkeypatch.setattr(api, "db", db)
+    monkeypatch.setattr(api, "collection_versions", CollectionVersions(db, check_interval=0))
+    monkeypatch.setattr(api, "response_cache", ResponseCache(max_entries=16, ttl=60))
+    monkeypatch.setattr(api, "hot_tier", HotTier(str(tmp_path), check_interval=0))
+    return api.app.test_client()
+
+
+def test_dates_with_an_offset_are_read_as_written(client):
+    response = client.get("/api/bulk/daily", query_string={
+        "tickers": "BBRI.JK", "columns": "avg_close",
+        "from": "2024-01-03T00:00:00+07:00", "to": "2024-01-04T00:00:00+07:00"})
+    assert response.status_code == 200
+    assert response.get_json()["BBRI.JK"]["avg_close"] == [2.0, 3.0]
+
+
+@pytest.mark.parametrize("body", [
+    {"tickers": None, "columns": ["avg_close"]},
+    {"tickers": 5, "columns": ["avg_close"]},
+    {"tickers": ["BBRI.JK", 5], "columns": ["avg_close"]},
+    {"tickers": ["BBRI.JK"], "columns": ["avg_close"], "from": 5},
+    {"tickers": ["BBRI.JK"], "columns": ["avg_close"], "to": 0},
+    ["BBRI.JK"],
+])
+def test_bulk_body_with_wrong_types_is_rejected(client, body):
+    response = client.post("/api/bulk/daily", json=body)
+    assert response.status_code == 400
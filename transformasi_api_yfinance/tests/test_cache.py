@@ -0,0 +1,67 @@
+import time
+
+from werkzeug.datastructures import MultiDict
+
+from cache import CollectionVersions, ResponseCache, make_cache_key, make_etag
+
+
+def test_hit_requires_same_version():
+    cache = ResponseCache()
+    cache.set("key", 1, b"body", "etag")
+    assert cache.get("key", 1) == (b"body", "etag")
+    # Spark menulis ulang koleksi: entri lama dianggap basi dan dibuang
+    assert cache.get("key", 2) is None
+    assert cache.get("key", 1) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_expired_entries_are_misses():
+    cache = ResponseCache(ttl=-1)
+    cache.set("key", 1, b"body", "etag")
+    assert cache.get("key", 1) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", 1, b"a", "a")
+    cache.set("b", 1, b"b", "b")
+    cache.get("a", 1)
+    cache.set("c", 1, b"c", "c")
+    assert cache.get("b", 1) is None
+    assert cache.get("a", 1) is not None
+    assert cache.get("c", 1) is not None
+
+
+def test_cache_key_ignores_query_parameter_order():
+    first = make_cache_key("ticker", "BBRI.JK", None, MultiDict([("from", "2024-01-01"), ("to", "2024-12-31")]))
+    second = make_cache_key("ticker", "BBRI.JK", None, MultiDict([("to", "2024-12-31"), ("from", "2024-01-01")]))
+    assert first == second
+    assert first != make_cache_key("ticker", "BBCA.JK", None, MultiDict([("from", "2024-01-01")]))
+
+
+def test_etag_depends_only_on_body():
+    assert make_etag(b"[1, 2]") == make_etag(b"[1, 2]")
+    assert make_etag(b"[1, 2]") != make_etag(b"[1, 3]")
+
+
+class _FakeCollection:
+    def __init__(self, docs):
+        self.docs = docs
+        self.reads = 0
+
+    def find(self, *args):
+        self.reads += 1
+        return list(self.docs)
+
+
+def test_collection_versions_are_read_once_per_interval():
+    collection = _FakeCollection([{"_id": "daily_aggregation_ticker", "generation": 3}])
+    versions = CollectionVersions({"aggregation_versions": collection}, check_interval=60)
+    assert versions.get("daily_aggregation_ticker") == 3
+    assert versions.get("yearly_aggregation_ticker") == 0
+    assert collection.reads == 1
+
+    versions.check_interval = 0
+    collection.docs = [{"_id": "daily_aggregation_ticker", "generation": 4}]
+    time.sleep(0.001)
+    assert versions.get("daily_aggregation_ticker") == 4
@@ -0,0 +1,43 @@
+from datetime import datetime
+
+import mongomock
+import pytest
+
+from granularity import GRANULARITIES, valid_column
+
+
+def test_range_filter_uses_the_granularity_key():
+    date_from, date_to = datetime(2021, 3, 1), datetime(2024, 6, 30)
+    assert GRANULARITIES["daily"].range_filter(date_from, date_to) == {"Date": {"$gte": date_from, "$lte": date_to}}
+    assert GRANULARITIES["monthly"].range_filter(date_from) == {"Year": {"$gte": 2021}}
+    assert GRANULARITIES["2year"].range_filter(date_from, date_to) == {"YearRange": {"$gte": "2020-2021",
+                                                                                     "$lte": "2024-2025"}}
+    assert GRANULARITIES["daily"].range_filter() == {}
+
+
+@pytest.mark.parametrize("column, valid", [
+    ("avg_close", True), ("Stock Splits", True), ("$where", False), ("a.b", False), ("", False),
+])
+def test_valid_column(column, valid):
+    assert valid_column(column) is valid
+
+
+def test_find_projects_keys_and_requested_columns_in_order():
+    db = mongomock.MongoClient().db
+    db["yearly_aggregation_ticker"].insert_many([
+        {"ticker": "BBRI.JK", "Year": 2024, "avg_close": 2.0, "avg_open": 1.0},
+        {"ticker": "BBRI.JK", "Year": 2023, "avg_close": 1.0, "avg_open": 1.0},
+        {"ticker": "AALI.JK", "Year": 2024, "avg_close": 3.0, "avg_open": 1.0},
+    ])
+    rows = list(GRANULARITIES["yearly"].find(db, {}, ["avg_close"]))
+    assert rows == [
+        {"ticker": "AALI.JK", "Year": 2024, "avg_close": 3.0},
+        {"ticker": "BBRI.JK", "Year": 2023, "avg_close": 1.0},
+        {"ticker": "BBRI.JK", "Year": 2024, "avg_close": 2.0},
+    ]
+
+
+def test_rollups_are_computed_from_the_daily_collection():
+    quarterly = GRANULARITIES["quarterly"]
+    assert quarterly.is_rollup and quarterly.collection == "daily_aggregation_ticker"
+    assert not GRANULARITIES["daily"].is_rollup
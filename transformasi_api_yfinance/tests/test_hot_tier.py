@@ -0,0 +1,43 @@
+from datetime import datetime
+
+import pandas as pd
+
+from granularity import GRANULARITIES
+from hot_tier import HotTier, encode_frame, load_generation_frames, update_generation, write_generation
+
+
+def _daily(rows):
+    frame = pd.DataFrame(rows, columns=["ticker", "Date", "avg_close"])
+    frame["Date"] = pd.to_datetime(frame["Date"])
+    return encode_frame(frame, ["Date"])
+
+
+def test_series_slices_one_ticker_and_date_range(tmp_path):
+    write_generation({"daily": _daily([
+        ("BBRI.JK", "2024-01-02", 1.0), ("BBCA.JK", "2024-01-02", 9.0),
+        ("BBRI.JK", "2024-01-03", None), ("BBRI.JK", "2024-01-04", 3.0),
+    ])}, str(tmp_path))
+    tier = HotTier(str(tmp_path), check_interval=0)
+    series = tier.series(GRANULARITIES["daily"], "BBRI.JK", ["avg_close"],
+                         date_from=datetime(2024, 1, 3), date_to=datetime(2024, 1, 4))
+    assert series == {"Date": [datetime(2024, 1, 3), datetime(2024, 1, 4)], "avg_close": [None, 3.0]}
+    assert tier.series(GRANULARITIES["daily"], "GOTO.JK", ["avg_close"]) == {}
+    # Kolom yang tidak ada di hot tier dilayani MongoDB
+    assert tier.series(GRANULARITIES["daily"], "BBRI.JK", ["avg_open"]) is None
+
+
+def test_update_generation_replaces_only_changed_rows(tmp_path):
+    write_generation({"daily": _daily([("BBRI.JK", "2024-01-02", 1.0), ("BBRI.JK", "2024-01-03", 2.0),
+                                       ("BBCA.JK", "2024-01-02", 9.0)])}, str(tmp_path))
+    update_generation({"daily": _daily([("BBRI.JK", "2024-01-03", 5.0), ("GOTO.JK", "2024-01-03", 7.0)])},
+                      str(tmp_path))
+
+    frame = load_generation_frames(str(tmp_path))["daily"]
+    rows = {(row.ticker, row.Date): row.avg_close for row in frame.itertuples()}
+    assert len(rows) == 4
+    assert rows[("BBRI.JK", (datetime(2024, 1, 3) - datetime(1970, 1, 1)).days)] == 5.0
+    assert rows[("BBCA.JK", (datetime(2024, 1, 2) - datetime(1970, 1, 1)).days)] == 9.0
+
+
+def test_update_without_active_generation_asks_for_full_export(tmp_path):
+    assert update_generation({"daily": _daily([("BBRI.JK", "2024-01-02", 1.0)])}, str(tmp_path)) is None
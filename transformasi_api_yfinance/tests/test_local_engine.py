@@ -0,0 +1,75 @@
+import os
+import subprocess
+import sys
+
+import duckdb
+import pandas as pd
+
+from local_engine import build_averages, build_daily_partials, compare_outputs, with_document_id
+
+
+def _outputs(close):
+    daily = pd.DataFrame({"Date": pd.to_datetime(["2024-01-02", "2024-01-03"]), "ticker": ["BBRI.JK"] * 2,
+                          "avg_close": close})
+    yearly = pd.DataFrame({"Year": [2024], "ticker": ["BBRI.JK"], "avg_close": [sum(close) / 2]})
+    return {"daily_aggregation_ticker": (daily, ["Date"]), "yearly_aggregation_ticker": (yearly, ["Year"])}
+
+
+def test_identical_outputs_have_no_differences():
+    assert compare_outputs(_outputs([1.0, 2.0]), _outputs([1.0, 2.0])) == []
+
+
+def test_row_order_and_float_noise_are_ignored():
+    actual = _outputs([1.0, 2.0 + 1e-12])
+    daily, keys = actual["daily_aggregation_ticker"]
+    actual["daily_aggregation_ticker"] = (daily.iloc[::-1], keys)
+    assert compare_outputs(_outputs([1.0, 2.0]), actual) == []
+
+
+def test_value_and_row_count_differences_are_reported():
+    assert compare_outputs(_outputs([1.0, 2.0]), _outputs([1.0, 3.0])) == [
+        "daily_aggregation_ticker.avg_close: 1 nilai berbeda",
+        "yearly_aggregation_ticker.avg_close: 1 nilai berbeda",
+    ]
+    actual = _outputs([1.0, 2.0])
+    daily, keys = actual["daily_aggregation_ticker"]
+    actual["daily_aggregation_ticker"] = (daily.iloc[:1], keys)
+    assert compare_outputs(_outputs([1.0, 2.0]), actual) == ["daily_aggregation_ticker: 2 vs 1 baris"]
+
+
+def test_duckdb_averages_match_a_pandas_reference():
+    prices = pd.DataFrame({
+        "Date": pd.to_datetime(["2023-12-29", "2024-01-02", "2024-01-02", "2024-02-01"]),
+        "ticker": ["BBRI.JK", "BBRI.JK", "BBRI.JK", "BBRI.JK"],
+        "Open": [1.0, 2.0, 4.0, 8.0], "High": [1.0] * 4, "Low": [1.0] * 4, "Close": [1.0, 2.0, None, 8.0],
+        "Volume": [10.0] * 4, "Dividends": [0.0] * 4, "Stock Splits": [0.0] * 4,
+    })
+    con = duckdb.connect()
+    con.register("prices", prices)
+    build_daily_partials(con)
+    outputs = build_averages(con)
+    con.close()
+
+    daily = outputs["daily_aggregation_ticker"][0].set_index("Date")
+    assert daily.loc["2024-01-02", "avg_open"] == 3.0
+    # Nilai null tidak ikut dihitung, sama seperti avg di Spark
+    assert daily.loc["2024-01-02", "avg_close"] == 2.0
+    monthly = outputs["monthly_aggregation_ticker"][0].set_index(["Year", "Month"])
+    assert monthly.loc[(2024, 1), "avg_open"] == 3.0
+    two_year = outputs["2year_aggregation_ticker"][0].set_index("YearRange")
+    assert list(two_year.index) == ["2022-2023", "2024-2025"]
+    assert two_year.loc["2024-2025", "avg_open"] == 14.0 / 3
+
+
+def test_document_id_matches_spark():
+    frame = pd.DataFrame({"Date": pd.to_datetime(["2024-01-02"]), "ticker": ["BBRI.JK"]})
+    assert with_document_id(frame, ["Date"])["_id"].tolist() == ["BBRI.JK|2024-01-02"]
+    frame = pd.DataFrame({"Year": [2024], "Month": [1], "ticker": ["BBRI.JK"]})
+    assert with_document_id(frame, ["Year", "Month"])["_id"].tolist() == ["BBRI.JK|2024|1"]
+
+
+def test_local_engine_does_not_import_pyspark():
+    # Engine DuckDB harus dapat berjalan di mesin tanpa pyspark
+    code = "import sys, local_engine; sys.exit('pyspark' in sys.modules)"
+    project = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    assert subprocess.run([sys.executable, "-c", code], cwd=project).returncode == 0
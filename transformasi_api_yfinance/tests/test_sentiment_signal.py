@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sentiment_signal import detect_new_prices
+
+
+def test_dates_after_the_previous_price_watermark_are_recomputed():
+    previous = {"BBRI.JK": datetime(2024, 1, 2), "BBCA.JK": datetime(2024, 1, 3)}
+    current = {"BBRI.JK": datetime(2024, 1, 4), "BBCA.JK": datetime(2024, 1, 3)}
+    assert detect_new_prices(previous, current) == ["2024-01-03", "2024-01-04"]
+
+
+def test_no_new_prices():
+    watermarks = {"BBRI.JK": datetime(2024, 1, 2)}
+    assert detect_new_prices(watermarks, dict(watermarks)) == []
+    # Tanpa snapshot sebelumnya (watermark lama) tidak ada tanggal harga tambahan
+    assert detect_new_prices(None, watermarks) == []
+
+
+def test_new_ticker_recomputes_every_date():
+    previous = {"BBRI.JK": datetime(2024, 1, 2)}
+    current = {"BBRI.JK": datetime(2024, 1, 2), "GOTO.JK": datetime(2024, 1, 2)}
+    assert detect_new_prices(previous, current) is None
@@ -0,0 +1,36 @@
+import gzip
+import json
+from datetime import datetime
+
+from werkzeug.datastructures import MIMEAccept
+
+from serialization import (JSON_MIMETYPE, MIN_COMPRESS_SIZE, compress, encode_columnar,
+                           negotiate_mimetype)
+
+SERIES = {
+    "BBRI.JK": {"Date": [datetime(2024, 1, 2), datetime(2024, 1, 3)], "avg_close": [5000.0, None]},
+    "BBCA.JK": {"Date": [datetime(2024, 1, 2)], "avg_close": [9000.0]},
+}
+
+
+def test_json_is_columnar_with_iso_dates():
+    body = json.loads(encode_columnar(SERIES, ["Date"], ["avg_close"], JSON_MIMETYPE))
+    assert body["BBRI.JK"] == {"Date": ["2024-01-02", "2024-01-03"], "avg_close": [5000.0, None]}
+    assert body["BBCA.JK"]["Date"] == ["2024-01-02"]
+
+
+def test_small_bodies_are_not_compressed():
+    assert compress(b"{}", "gzip") == (b"{}", None)
+    assert compress(b"{}", None) == (b"{}", None)
+
+
+def test_gzip_round_trip():
+    body = b"x" * (MIN_COMPRESS_SIZE * 2)
+    compressed, encoding = compress(body, "gzip")
+    assert encoding == "gzip"
+    assert gzip.decompress(compressed) == body
+
+
+def test_json_is_the_default_format():
+    assert negotiate_mimetype(MIMEAccept([("text/html", 1)])) == JSON_MIMETYPE
+    assert negotiate_mimetype(MIMEAccept([("application/json", 1)])) == JSON_MIMETYPE
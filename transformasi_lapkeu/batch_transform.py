@@ -0,0 +1,140 @@
+"""Transformasi laporan keuangan IDX untuk beberapa tahun fiskal dan periode sekaligus.
+
+    spark-submit batch_transform.py --years 2022 2023 2024
+    spark-submit batch_transform.py --years 2023 2024 --periods FY Q1 Q2 Q3 --parquet-output out/lapkeu
+
+Laporan tahunan dibaca dari koleksi bernama tahunnya (mis. "2024"), laporan kuartalan
+dari koleksi `period_collection` pada spesifikasi (mis. "2024_Q1"). Seluruh periode
+ditransformasi dalam satu job Spark, dilengkapi pertumbuhan year-over-year dan rasio
+keuangan per emiten, lalu ditulis ke satu koleksi (`batch_output_collection`) dengan
+_id `emiten|tahun|periode`.
+"""
+
+import argparse
+import time
+from functools import reduce
+
+from pymongo import MongoClient
+from pyspark.sql import Window
+from pyspark.sql import functions as F
+
+from mongo_writer import write_collection
+from transform_engine import (DB_NAME, DEFAULT_SPEC, MONGO_URI, create_spark_session, load_spec,
+                              read_filings, source_collection, transform)
+
+PERIODS = ["FY", "Q1", "Q2", "Q3"]
+
+# Kolom yang dihitung pertumbuhan year-over-year-nya (dibandingkan periode yang sama tahun sebelumnya)
+GROWTH_COLUMNS = ["revenue", "gross_profit", "operating_profit", "net_profit", "total_assets", "total_equity"]
+
+# Rasio keuangan: nama -> (pembilang, penyebut)
+RATIOS = {
+    "roe": ("net_profit", "total_equity"),
+    "der": ("liabilities", "total_equity"),
+    "gross_margin": ("gross_profit", "revenue"),
+    "operating_margin": ("operating_profit", "revenue"),
+    "net_margin": ("net_profit", "revenue"),
+    "cash_conversion": ("cash_dari_operasi", "net_profit"),
+}
+
+
+def safe_divide(numerator, denominator):
+    """Null jika penyebut null atau nol, bukan Infinity/NaN."""
+    return F.when(denominator.isNotNull() & (denominator != 0), numerator / denominator)
+
+
+def available_periods(spec, years, periods):
+    """Pasangan (tahun, periode) yang koleksinya ada di MongoDB."""
+    client = MongoClient(MONGO_URI)
+    existing = set(client[DB_NAME].list_collection_names())
+    client.close()
+
+    pairs = []
+    for year in years:
+        for period in periods:
+            name = source_collection(spec, year, period)
+            if name in existing:
+                pairs.append((int(year), period))
+            else:
+                print(f"Koleksi {name} tidak ditemukan, dilewati")
+    return pairs
+
+
+def read_periods(spark, spec, pairs, source="mongo"):
+    """Membaca dan mentransformasi seluruh periode menjadi satu DataFrame.
+
+    Setiap periode menjadi cabang union di plan yang sama, sehingga Spark membaca
+    koleksi-koleksinya secara paralel dalam satu job, bukan satu notebook per tahun.
+    """
+    frames = [
+        transform(read_filings(spark, spec, year, source=source if period == "FY" else "mongo",
+                               period=period), spec)
+        .withColumn("fiscal_year", F.lit(year))
+        .withColumn("period", F.lit(period))
+        for year, period in pairs
+    ]
+    df = reduce(lambda left, right: left.unionByName(right), frames)
+
+    # Filing yang diunggah ulang: simpan laporan dengan report_date terakhir per emiten/periode
+    latest = Window.partitionBy("emiten", "fiscal_year", "period").orderBy(F.col("report_date").desc())
+    return df.withColumn("_rank", F.row_number().over(latest)) \
+        .filter(F.col("_rank") == 1) \
+        .drop("_rank")
+
+
+def with_metrics(df):
+    """Menambahkan pertumbuhan year-over-year dan rasio keuangan per emiten."""
+    by_period = Window.partitionBy("emiten", "period").orderBy("fiscal_year")
+    # Pertumbuhan hanya dihitung jika tahun sebelumnya benar-benar tahun berurutan
+    consecutive = (F.col("fiscal_year") - F.lag("fiscal_year").over(by_period)) == 1
+
+    for name in GROWTH_COLUMNS:
+        previous = F.lag(name).over(by_period)
+        df = df.withColumn(f"{name}_yoy", F.when(consecutive, safe_divide(F.col(name) - previous,
+                                                                          F.abs(previous))))
+
+    for name, (numerator, denominator) in RATIOS.items():
+        df = df.withColumn(name, safe_divide(F.col(numerator), F.col(denominator)))
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transformasi laporan keuangan IDX multi-tahun/multi-periode")
+    parser.add_argument("--years", nargs="+", required=True, help="Tahun fiskal yang diproses")
+    parser.add_argument("--periods", nargs="+", choices=PERIODS, default=["FY"])
+    parser.add_argument("--spec", default=DEFAULT_SPEC, help="Path spesifikasi mapping (JSON)")
+    parser.add_argument("--source", choices=["mongo", "parquet"], default="mongo",
+                        help="Sumber laporan tahunan; laporan kuartalan selalu dibaca dari MongoDB")
+    parser.add_argument("--output-collection", help="Default: batch_output_collection pada spesifikasi")
+    parser.add_argument("--parquet-output", help="Tulis juga ke Parquet yang dipartisi per fiscal_year/period")
+    args = parser.parse_args()
+
+    spec = load_spec(args.spec)
+    pairs = available_periods(spec, args.years, args.periods)
+    if not pairs:
+        print("Tidak ada koleksi yang dapat diproses")
+        return
+
+    spark = create_spark_session("Transformasi Lapkeu Batch")
+    started = time.perf_counter()
+
+    result = with_metrics(read_periods(spark, spec, pairs, args.source)) \
+        .withColumn("_id", F.concat_ws("|", "emiten", "fiscal_year", "period"))
+    if args.parquet_output:
+        result = result.cache()
+        result.drop("_id") \
+            .repartition("fiscal_year", "period") \
+            .write.mode("overwrite") \
+            .partitionBy("fiscal_year", "period") \
+            .parquet(args.parquet_output)
+
+    output = args.output_collection or spec["batch_output_collection"]
+    write_collection(result, MONGO_URI, DB_NAME, output, partition_key="emiten",
+                     indexes=[[("emiten", 1), ("fiscal_year", 1), ("period", 1)],
+                              [("fiscal_year", 1), ("period", 1)]])
+    print(f"{len(pairs)} periode ditransformasi dalam {time.perf_counter() - started:.2f} detik")
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Konstanta dan helper spesifikasi mapping yang dipakai bersama engine Spark dan DuckDB.
+
+Modul ini tidak mengimpor pyspark, sehingga local_engine.py dapat berjalan di mesin
+tanpa Spark; transform_engine.py mengompilasi ekspresi yang sama menjadi Column Spark.
+"""
+
+import json
+import os
+
+MONGO_URI = "mongodb://localhost:27017"
+DB_NAME = "bigdatatugas"
+DEFAULT_SPEC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "mapping_spec.json")
+
+STAGING_DIR = os.environ.get("LAPKEU_STAGING_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                "staging", "lapkeu"))
+
+# Combinator yang boleh dipakai ekspresi spesifikasi; setiap engine mengimplementasikan semuanya
+COMBINATOR_NAMES = ("sum_if_exists", "coalesce", "difference")
+
+
+def load_spec(path=DEFAULT_SPEC):
+    with open(path, "r", encoding="utf-8") as f:
+        spec = json.load(f)
+    validate_spec(spec)
+    return spec
+
+
+def validate_spec(spec):
+    """Memastikan setiap subsektor (digabung dengan `common`) mendefinisikan semua kolom output."""
+    for sector in spec["subsectors"] + [spec["default"]]:
+        columns = sector_columns(spec, sector)
+        missing = [name for name in spec["output_columns"] if name not in columns]
+        if missing:
+            raise ValueError(f"Subsektor {sector['name']} tidak mendefinisikan kolom: {missing}")
+        for expr in columns.values():
+            check_expression(expr)
+
+
+def sector_columns(spec, sector):
+    columns = dict(spec["common"])
+    columns.update(sector["columns"])
+    return columns
+
+
+def check_expression(expr):
+    """Memvalidasi struktur satu ekspresi tanpa membangun Column (tidak butuh SparkContext)."""
+    if isinstance(expr, str):
+        return
+    if not isinstance(expr, dict) or len(expr) != 1:
+        raise ValueError(f"Ekspresi tidak valid: {expr!r}")
+    (op, args), = expr.items()
+    if op == "column":
+        return
+    if op not in COMBINATOR_NAMES:
+        raise ValueError(f"Combinator tidak dikenal: {op}")
+    for arg in args:
+        check_expression(arg)
+
+
+def expression_facts(expr):
+    """Nama fact yang dirujuk satu ekspresi (termasuk ekspresi bersarang)."""
+    if isinstance(expr, str):
+        return {expr}
+    (op, args), = expr.items()
+    if op == "column":
+        return set()
+    return set().union(*[expression_facts(arg) for arg in args])
+
+
+def referenced_facts(spec):
+    """Seluruh fact yang dibutuhkan spesifikasi, termasuk fact penentu subsektor."""
+    names = {spec["subsector_fact"]}
+    for sector in spec["subsectors"] + [spec["default"]]:
+        for expr in sector_columns(spec, sector).values():
+            names |= expression_facts(expr)
+    return sorted(names)
+
+
+def projection_pipeline(spec):
+    """Pipeline $project agar MongoDB hanya mengirim field yang dipakai transformasi."""
+    projection = {"_id": 0, "ticker": 1}
+    projection.update({f"facts.{name}.value": 1 for name in referenced_facts(spec)})
+    return [{"$project": projection}]
+
+
+def source_collection(spec, year, period="FY"):
+    """Nama koleksi MongoDB untuk satu periode; laporan tahunan memakai nama tahunnya saja."""
+    if period == "FY":
+        return spec["source_collection"].format(year=year)
+    return spec["period_collection"].format(year=year, period=period)
@@ -0,0 +1,199 @@
+"""Engine lokal tanpa JVM: spesifikasi mapping subsektor dijalankan sebagai SQL DuckDB.
+
+    python transform_engine.py --year 2024 --engine duckdb
+    python local_engine.py --year 2024 --source parquet --debug
+    spark-submit local_engine.py --year 2024 --parity
+
+Ekspresi mapping_spec.json dikompilasi ke SQL dengan semantik yang sama seperti
+compile_expression() di transform_engine.py (null-safe sum_if_exists, coalesce,
+difference), lalu seluruh kolom output dihitung dalam satu SELECT dengan
+CASE per subsektor. Filing dibaca dari MongoDB (pipeline $project minimal yang sama)
+atau dari snapshot Parquet staging.py, dan hasilnya ditulis lewat
+mongo_writer.write_documents ke koleksi output yang sama dengan job Spark.
+"""
+
+import argparse
+import os
+import time
+
+import duckdb
+import numpy as np
+import pandas as pd
+from pymongo import MongoClient
+
+from common import (DB_NAME, DEFAULT_SPEC, MONGO_URI, STAGING_DIR, load_spec, projection_pipeline,
+                    referenced_facts, sector_columns, source_collection)
+from mongo_writer import write_documents
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sum_if_exists(*args):
+    present = " OR ".join(f"{arg} IS NOT NULL" for arg in args)
+    total = " + ".join(["0"] + [f"COALESCE({arg}, 0)" for arg in args])
+    return f"CASE WHEN {present} THEN {total} END"
+
+
+def _difference(*args):
+    present = " AND ".join(f"{arg} IS NOT NULL" for arg in args)
+    return f"CASE WHEN {present} THEN {' - '.join(args)} END"
+
+
+SQL_COMBINATORS = {
+    "sum_if_exists": _sum_if_exists,
+    "coalesce": lambda *args: f"COALESCE({', '.join(args)})",
+    "difference": _difference,
+}
+
+
+def compile_sql(expr):
+    """Mengubah satu ekspresi spesifikasi menjadi ekspresi SQL atas tabel filing yang dipipihkan."""
+    if isinstance(expr, str):
+        return _quote(expr)
+    (op, args), = expr.items()
+    if op == "column":
+        return _quote(args)
+    return "(" + SQL_COMBINATORS[op](*[compile_sql(arg) for arg in args]) + ")"
+
+
+def transform_sql(spec, table="filings"):
+    """SELECT setara transform(): satu CASE per kolom yang mapping-nya berbeda antar subsektor."""
+    subsector = _quote(spec["subsector_fact"])
+    default = sector_columns(spec, spec["default"])
+    sectors = [(sector["match"], sector_columns(spec, sector)) for sector in spec["subsectors"]]
+
+    projection = []
+    for name in spec["output_columns"]:
+        if all(columns[name] == default[name] for _, columns in sectors):
+            projection.append(f"{compile_sql(default[name])} AS {_quote(name)}")
+            continue
+        branches = " ".join(f"WHEN {subsector} = '{match.replace(chr(39), chr(39) * 2)}' THEN {compile_sql(columns[name])}"
+                            for match, columns in sectors)
+        projection.append(f"CASE {branches} ELSE {compile_sql(default[name])} END AS {_quote(name)}")
+    return f"SELECT {', '.join(projection)} FROM {table} WHERE {subsector} IS NOT NULL"
+
+
+def register_filings(con, spec, year, source="mongo", period="FY"):
+    """Registrasi tabel `filings` (ticker + satu kolom per fact yang dirujuk spesifikasi)."""
+    facts = referenced_facts(spec)
+    string_facts = set(spec["string_facts"])
+
+    if source == "parquet":
+        if period != "FY":
+            raise ValueError("Snapshot Parquet hanya tersedia untuk laporan tahunan")
+        pattern = os.path.join(STAGING_DIR, f"year={year}", "**", "*.parquet")
+        con.execute(f"CREATE OR REPLACE VIEW staged AS SELECT * FROM "
+                    f"read_parquet('{pattern}', hive_partitioning = true, union_by_name = true)")
+        # Fact yang tidak pernah muncul di snapshot tidak ada di struct facts; isi dengan null
+        struct = {name for name, _ in con.sql("SELECT facts FROM staged").types[0].children}
+        columns = []
+        for name in facts:
+            kind = "VARCHAR" if name in string_facts else "DOUBLE"
+            value = f"facts.{_quote(name)}.value" if name in struct else "NULL"
+            columns.append(f"CAST({value} AS {kind}) AS {_quote(name)}")
+        con.execute(f"CREATE OR REPLACE VIEW filings AS SELECT ticker, {', '.join(columns)} FROM staged")
+        return
+
+    client = MongoClient(MONGO_URI)
+    documents = client[DB_NAME][source_collection(spec, year, period)].aggregate(projection_pipeline(spec))
+    rows = []
+    for doc in documents:
+        doc_facts = doc.get("facts") or {}
+        row = {"ticker": doc.get("ticker")}
+        row.update({name: (doc_facts.get(name) or {}).get("value") for name in facts})
+        rows.append(row)
+    client.close()
+
+    frame = pd.DataFrame(rows, columns=["ticker"] + facts)
+    for name in facts:
+        # Sama seperti schema DoubleType/StringType pada filings_schema()
+        if name in string_facts:
+            frame[name] = frame[name].astype(object).where(frame[name].notna(), None)
+        else:
+            frame[name] = pd.to_numeric(frame[name], errors="coerce").astype("float64")
+    con.register("filings", frame)
+
+
+def transform_local(spec, year, source="mongo", period="FY"):
+    """Menjalankan transformasi satu periode dengan DuckDB dan mengembalikan DataFrame pandas."""
+    con = duckdb.connect()
+    register_filings(con, spec, year, source, period)
+    result = con.execute(transform_sql(spec)).df()
+    con.close()
+    return result
+
+
+def run_local(spec, year, source="mongo", output=None, debug=False):
+    started = time.perf_counter()
+    result = transform_local(spec, year, source)
+    if debug:
+        print(result.sort_values("emiten", ascending=False).to_string(index=False))
+
+    output = output or spec["output_collection"].format(year=year)
+    write_documents(result, MONGO_URI, DB_NAME, output, indexes=[[("emiten", 1)], [("report_date", 1)]])
+    print(f"Transformasi {year} (duckdb) selesai dalam {time.perf_counter() - started:.2f} detik")
+
+
+def compare_frames(expected, actual, rtol=1e-9):
+    """Membandingkan dua hasil transformasi per emiten/report_date; mengembalikan daftar selisih."""
+    keys = ["emiten", "report_date"]
+    left = expected.sort_values(keys).reset_index(drop=True)
+    right = actual[list(expected.columns)].sort_values(keys).reset_index(drop=True)
+    if len(left) != len(right):
+        return [f"{len(left)} vs {len(right)} baris"]
+
+    problems = []
+    for column in left.columns:
+        if pd.api.types.is_numeric_dtype(left[column]) and pd.api.types.is_numeric_dtype(right[column]):
+            same = np.isclose(left[column].astype(float), right[column].astype(float), rtol=rtol, equal_nan=True)
+        else:
+            same = (left[column].isna() & right[column].isna()) | (left[column] == right[column])
+        if not same.all():
+            problems.append(f"{column}: {int((~same).sum())} nilai berbeda")
+    return problems
+
+
+def check_parity(spec, year, source="mongo"):
+    """Menjalankan transform() Spark dan SQL DuckDB pada sumber yang sama dan membandingkan hasilnya."""
+    from transform_engine import create_spark_session, read_filings, transform
+
+    started = time.perf_counter()
+    local = transform_local(spec, year, source)
+    local_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    spark = create_spark_session("Parity Check Lapkeu")
+    expected = transform(read_filings(spark, spec, year, source), spec).toPandas()
+    spark_seconds = time.perf_counter() - started
+    spark.stop()
+
+    problems = compare_frames(expected, local)
+    print(f"Spark {spark_seconds:.2f} detik (termasuk start JVM), DuckDB {local_seconds:.2f} detik, "
+          f"{len(local)} filing")
+    for problem in problems:
+        print(f"  BEDA {problem}")
+    print("Parity OK" if not problems else f"Parity GAGAL: {len(problems)} selisih")
+    return not problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transformasi laporan keuangan IDX tanpa JVM (DuckDB)")
+    parser.add_argument("--year", required=True, help="Tahun fiskal yang diproses")
+    parser.add_argument("--spec", default=DEFAULT_SPEC, help="Path spesifikasi mapping (JSON)")
+    parser.add_argument("--source", choices=["mongo", "parquet"], default="mongo")
+    parser.add_argument("--output-collection", help="Default: output_collection pada spesifikasi")
+    parser.add_argument("--debug", action="store_true", help="Tampilkan seluruh hasil")
+    parser.add_argument("--parity", action="store_true",
+                        help="Bandingkan hasil DuckDB dengan transform() Spark, tanpa menulis (butuh JVM)")
+    args = parser.parse_args()
+
+    spec = load_spec(args.spec)
+    if args.parity:
+        raise SystemExit(0 if check_parity(spec, args.year, args.source) else 1)
+    run_local(spec, args.year, args.source, args.output_collection, args.debug)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Snapshot koleksi laporan keuangan IDX ke Parquet lokal yang dipartisi per tahun/subsektor.
+
+    spark-submit staging.py --years 2024            # refresh inkremental
+    spark-submit staging.py --years 2023 2024 --full
+
+Setiap tahun fiskal disimpan di koleksi MongoDB bernama tahunnya (mis. "2024").
+Refresh inkremental hanya menyalin dokumen dengan _id (ObjectId) yang lebih besar
+dari snapshot sebelumnya, sehingga filing yang baru diunggah ikut masuk tanpa
+membaca ulang seluruh koleksi.
+"""
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from pyspark.sql import SparkSession
+from pyspark.sql import functions as F
+
+from common import DB_NAME, MONGO_URI, STAGING_DIR
+
+STATE_FILE = "_staging_state.json"
+
+
+def load_state(staging_dir):
+    path = os.path.join(staging_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(staging_dir, state):
+    path = os.path.join(staging_dir, STATE_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(path + ".tmp", path)
+
+
+def snapshot_filings(spark, year, staging_dir=STAGING_DIR, full=False):
+    """Menyalin filing satu tahun fiskal ke Parquet dan mengembalikan jumlah dokumen yang ditulis."""
+    state = load_state(staging_dir)
+    last_id = None if full else state.get(str(year), {}).get("last_id")
+
+    reader = spark.read.format("mongo") \
+        .option("uri", MONGO_URI) \
+        .option("database", DB_NAME) \
+        .option("collection", str(year))
+    if last_id:
+        # Hanya dokumen yang lebih baru dari snapshot terakhir; filter dijalankan di MongoDB
+        reader = reader.option("pipeline", json.dumps([{"$match": {"_id": {"$gt": {"$oid": last_id}}}}]))
+
+    df = reader.load() \
+        .withColumn("year", F.lit(int(year))) \
+        .withColumn("subsector", F.coalesce(F.col("facts.Subsector_CurrentYearInstant.value"),
+                                            F.lit("unknown"))) \
+        .cache()
+
+    summary = df.agg(F.count(F.lit(1)).alias("rows"), F.max(F.col("_id.oid")).alias("last_id")).first()
+    if summary["rows"]:
+        target = os.path.join(staging_dir, f"year={year}")
+        # Snapshot penuh hanya menimpa partisi tahun yang bersangkutan
+        df.drop("year") \
+            .repartition("subsector") \
+            .write.mode("overwrite" if full else "append") \
+            .partitionBy("subsector") \
+            .parquet(target)
+
+        state[str(year)] = {"last_id": summary["last_id"], "refreshed_at": datetime.utcnow().isoformat()}
+        save_state(staging_dir, state)
+
+    df.unpersist()
+    return summary["rows"]
+
+
+def read_staged(spark, years=None, subsectors=None, staging_dir=STAGING_DIR):
+    """Membaca snapshot Parquet; filter years/subsectors menjadi partition pruning."""
+    df = spark.read.option("mergeSchema", "true").parquet(staging_dir)
+    if years:
+        df = df.where(F.col("year").isin([int(y) for y in years]))
+    if subsectors:
+        df = df.where(F.col("subsector").isin(list(subsectors)))
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot laporan keuangan IDX ke Parquet lokal")
+    parser.add_argument("--years", nargs="+", required=True, help="Tahun fiskal (nama koleksi MongoDB)")
+    parser.add_argument("--full", action="store_true", help="Snapshot ulang seluruh dokumen tahun tersebut")
+    parser.add_argument("--staging-dir", default=STAGING_DIR)
+    args = parser.parse_args()
+
+    spark = SparkSession.builder \
+        .appName("Staging Lapkeu") \
+        .config("spark.jars.packages", "org.mongodb.spark:mongo-spark-connector_2.12:3.0.1") \
+        .getOrCreate()
+
+    os.makedirs(args.staging_dir, exist_ok=True)
+    for year in args.years:
+        started = time.perf_counter()
+        rows = snapshot_filings(spark, year, args.staging_dir, full=args.full)
+        print(f"{year}: {rows} dokumen ditulis dalam {time.perf_counter() - started:.2f} detik")
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+import math
+import os
+import subprocess
+import sys
+
+import duckdb
+import pandas as pd
+
+from local_engine import compare_frames, compile_sql, transform_sql
+
+SPEC = {
+    "subsector_fact": "Subsector_CurrentYearInstant",
+    "output_columns": ["emiten", "report_date", "revenue", "cash"],
+    "common": {"emiten": {"column": "ticker"}, "report_date": "ReportDate_CurrentYearInstant",
+               "cash": "Cash_CurrentYearInstant"},
+    "subsectors": [{"name": "banks", "match": "G1. Banks",
+                    "columns": {"revenue": {"sum_if_exists": ["InterestIncome", "ShariaIncome"]}}}],
+    "default": {"name": "other", "columns": {"revenue": "SalesAndRevenue"}},
+}
+
+
+def _evaluate(expr, row):
+    con = duckdb.connect()
+    con.register("filings", pd.DataFrame([row], dtype="float64"))
+    value = con.execute(f"SELECT {compile_sql(expr)} FROM filings").fetchone()[0]
+    con.close()
+    return value
+
+
+def test_sum_if_exists_is_null_only_when_every_operand_is_null():
+    expr = {"sum_if_exists": ["a", "b"]}
+    assert _evaluate(expr, {"a": 1.0, "b": None}) == 1.0
+    assert _evaluate(expr, {"a": 1.0, "b": 2.0}) == 3.0
+    assert _evaluate(expr, {"a": None, "b": None}) is None
+
+
+def test_difference_needs_every_operand_and_coalesce_takes_the_first():
+    assert _evaluate({"difference": ["a", "b", "c"]}, {"a": 10.0, "b": 3.0, "c": 2.0}) == 5.0
+    assert _evaluate({"difference": ["a", "b"]}, {"a": 10.0, "b": None}) is None
+    assert _evaluate({"coalesce": ["a", "b"]}, {"a": None, "b": 7.0}) == 7.0
+    # Ekspresi bertingkat dan nama kolom yang perlu di-quote
+    assert _evaluate({"sum_if_exists": ["a", {"difference": ['x"y', "b"]}]},
+                     {"a": None, 'x"y': 5.0, "b": 1.0}) == 4.0
+
+
+def test_transform_sql_maps_each_subsector_and_skips_filings_without_one():
+    filings = pd.DataFrame({
+        "ticker": ["BBRI", "AALI", "XXXX"],
+        "Subsector_CurrentYearInstant": ["G1. Banks", "A1. Crops", None],
+        "ReportDate_CurrentYearInstant": ["2024-12-31"] * 3,
+        "Cash_CurrentYearInstant": [5.0, 6.0, 7.0],
+        "InterestIncome": [100.0, None, None],
+        "ShariaIncome": [None, 1.0, None],
+        "SalesAndRevenue": [999.0, 50.0, 1.0],
+    })
+    con = duckdb.connect()
+    con.register("filings", filings)
+    result = con.execute(transform_sql(SPEC)).df().sort_values("emiten").reset_index(drop=True)
+    con.close()
+
+    assert list(result.columns) == SPEC["output_columns"]
+    assert result["emiten"].tolist() == ["AALI", "BBRI"]
+    assert result["revenue"].tolist() == [50.0, 100.0]
+    assert result["cash"].tolist() == [6.0, 5.0]
+
+
+def _frame(revenue, entity="PT Satu"):
+    return pd.DataFrame({"emiten": ["AALI", "BBRI"], "report_date": ["2024-12-31"] * 2,
+                         "entity_name": [entity, None], "revenue": revenue})
+
+
+def test_compare_frames_ignores_row_order_and_float_noise():
+    actual = _frame([1.0 + 1e-12, math.nan]).iloc[::-1]
+    assert compare_frames(_frame([1.0, math.nan]), actual) == []
+
+
+def test_compare_frames_reports_value_and_row_count_differences():
+    assert compare_frames(_frame([1.0, 2.0]), _frame([1.0, 3.0], entity="PT Dua")) == [
+        "entity_name: 1 nilai berbeda",
+        "revenue: 1 nilai berbeda",
+    ]
+    assert compare_frames(_frame([1.0, 2.0]), _frame([1.0, 2.0]).iloc[:1]) == ["2 vs 1 baris"]
+
+
+def test_local_engine_does_not_import_pyspark():
+    # Engine DuckDB harus dapat berjalan di mesin tanpa pyspark
+    code = "import sys, local_engine; sys.exit('pyspark' in sys.modules)"
+    project = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    assert subprocess.run([sys.executable, "-c", code], cwd=project).returncode == 0
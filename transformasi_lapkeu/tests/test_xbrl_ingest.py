@@ -0,0 +1,61 @@
+from xbrl_ingest import find_instances, parse_facts, parse_filing
+
+INSTANCE = """<?xml version="1.0" encoding="UTF-8"?>
+<xbrli:xbrl xmlns:xbrli="http://www.xbrl.org/2003/instance"
+            xmlns:idx-cor="http://www.idx.co.id/xbrl/taxonomy/2020-01-01/cor"
+            xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <xbrli:context id="CurrentYearInstant"><xbrli:entity/></xbrli:context>
+  <xbrli:unit id="IDR"><xbrli:measure>iso4217:IDR</xbrli:measure></xbrli:unit>
+  <idx-cor:EntityCode contextRef="CurrentYearInstant">AALI</idx-cor:EntityCode>
+  <idx-cor:Subsector contextRef="CurrentYearInstant">A1. Crops</idx-cor:Subsector>
+  <idx-cor:Assets contextRef="CurrentYearInstant" unitRef="IDR" decimals="-6">1500000</idx-cor:Assets>
+  <idx-cor:Assets contextRef="PriorYearInstant" unitRef="IDR" xsi:nil="true"/>
+  <idx-cor:Liabilities contextRef="CurrentYearInstant" unitRef="IDR">n/a</idx-cor:Liabilities>
+  <idx-cor:Group>
+    <idx-cor:Revenue contextRef="CurrentYearDuration" unitRef="IDR">250.5</idx-cor:Revenue>
+  </idx-cor:Group>
+</xbrli:xbrl>
+"""
+
+
+def _write(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+    return str(path)
+
+
+def test_facts_are_flattened_by_element_and_context(tmp_path):
+    facts = parse_facts(_write(tmp_path / "AALI" / "instance.xbrl", INSTANCE))
+    assert facts["Assets_CurrentYearInstant"] == {"value": 1500000.0}
+    assert facts["Assets_PriorYearInstant"] == {"value": None}
+    assert facts["Subsector_CurrentYearInstant"] == {"value": "A1. Crops"}
+    # Fact numerik yang tidak dapat diparse menjadi null, fact di dalam tuple tetap terbaca
+    assert facts["Liabilities_CurrentYearInstant"] == {"value": None}
+    assert facts["Revenue_CurrentYearDuration"] == {"value": 250.5}
+
+
+def test_filing_document_uses_the_entity_code(tmp_path):
+    path, document, error = parse_filing(_write(tmp_path / "folder" / "instance.xbrl", INSTANCE))
+    assert error is None
+    assert document["ticker"] == "AALI"
+    assert document["file_info"]["file_name"] == "instance.xbrl"
+
+
+def test_xml_without_facts_is_skipped_not_written(tmp_path):
+    path = _write(tmp_path / "AALI" / "FilingSummary.xml", "<report><item>ringkasan</item></report>")
+    assert parse_filing(path) == (path, None, None)
+
+
+def test_broken_and_unreadable_files_are_reported(tmp_path):
+    path, document, error = parse_filing(_write(tmp_path / "AALI" / "broken.xbrl", "<xbrl><unclosed></xbrl>"))
+    assert document is None and error
+    path, document, error = parse_filing(str(tmp_path / "AALI" / "missing.xbrl"))
+    assert document is None and error
+
+
+def test_find_instances_only_yields_instance_suffixes(tmp_path):
+    _write(tmp_path / "AALI" / "instance.xbrl", INSTANCE)
+    _write(tmp_path / "AALI" / "schema.xsd", "")
+    _write(tmp_path / "BBRI" / "instance.XML", INSTANCE)
+    found = sorted(path.replace(str(tmp_path), "") for path in find_instances(str(tmp_path)))
+    assert [path.replace("\\", "/") for path in found] == ["/AALI/instance.xbrl", "/BBRI/instance.XML"]
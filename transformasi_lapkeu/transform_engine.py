@@ -0,0 +1,221 @@
+"""Engine transformasi laporan keuangan IDX berbasis spesifikasi deklaratif.
+
+Mapping kolom output per subsektor disimpan di mapping_spec.json. Setiap kolom
+berupa ekspresi:
+
+    "NamaFact_Konteks"                  -> F.col("facts.NamaFact_Konteks.value")
+    {"column": "ticker"}                -> kolom top-level dokumen
+    {"sum_if_exists": [expr, ...]}      -> jumlah null-safe, null jika semua null
+    {"coalesce": [expr, ...]}           -> nilai non-null pertama
+    {"difference": [a, b, ...]}         -> a - b - ..., hanya jika semua operand ada
+
+Contoh menjalankan sebagai batch job:
+
+    spark-submit transform_engine.py --year 2024
+    spark-submit transform_engine.py --year 2023 --source parquet --debug
+    python transform_engine.py --year 2024 --engine duckdb
+"""
+
+import argparse
+import json
+import time
+from functools import reduce
+
+from pymongo import MongoClient
+from pyspark.sql import SparkSession
+from pyspark.sql import functions as F
+from pyspark.sql.types import DoubleType, StringType, StructField, StructType
+
+from common import (DB_NAME, DEFAULT_SPEC, MONGO_URI, load_spec, projection_pipeline, referenced_facts,
+                    sector_columns, source_collection)
+from mongo_writer import write_collection
+
+
+def fact(name):
+    return F.col(f"facts.{name}.value")
+
+
+def calculate_sum_if_exists(*columns):
+    """Helper function to calculate sum only when at least one value exists."""
+    # First check if any column is not null
+    condition = F.lit(False)
+    for col in columns:
+        condition = condition | col.isNotNull()
+
+    # Calculate the sum with null-safe addition
+    sum_expr = F.lit(0)
+    for col in columns:
+        sum_expr = sum_expr + F.coalesce(col, F.lit(0))
+
+    # Return the sum if any column has data, otherwise null
+    return F.when(condition, sum_expr)
+
+
+def calculate_difference(*columns):
+    """First column minus the rest, only when every operand is present."""
+    condition = reduce(lambda acc, col: acc & col.isNotNull(), columns, F.lit(True))
+    return F.when(condition, reduce(lambda acc, col: acc - col, columns[1:], columns[0]))
+
+
+COMBINATORS = {
+    "sum_if_exists": calculate_sum_if_exists,
+    "coalesce": F.coalesce,
+    "difference": calculate_difference,
+}
+
+
+def compile_expression(expr):
+    """Mengubah satu ekspresi spesifikasi menjadi Column Spark."""
+    if isinstance(expr, str):
+        return fact(expr)
+    if not isinstance(expr, dict) or len(expr) != 1:
+        raise ValueError(f"Ekspresi tidak valid: {expr!r}")
+    (op, args), = expr.items()
+    if op == "column":
+        return F.col(args)
+    if op not in COMBINATORS:
+        raise ValueError(f"Combinator tidak dikenal: {op}")
+    return COMBINATORS[op](*[compile_expression(arg) for arg in args])
+
+
+def filings_schema(spec):
+    """Schema minimal dokumen filing: hanya ticker dan facts yang dirujuk spesifikasi.
+
+    Tanpa schema eksplisit connector mengambil sampel dokumen untuk menebak struct
+    `facts` yang berisi ratusan elemen XBRL per filing, lalu mendekode semuanya.
+    """
+    string_facts = set(spec["string_facts"])
+    facts = StructType([
+        StructField(name, StructType([
+            StructField("value", StringType() if name in string_facts else DoubleType())
+        ]))
+        for name in referenced_facts(spec)
+    ])
+    return StructType([
+        StructField("ticker", StringType()),
+        StructField("facts", facts),
+    ])
+
+
+def compile_sector(spec, sector):
+    """Daftar Column (sudah di-alias) untuk satu subsektor, urut sesuai output_columns."""
+    columns = sector_columns(spec, sector)
+    return [compile_expression(columns[name]).alias(name) for name in spec["output_columns"]]
+
+
+def transform(df, spec):
+    """Menerapkan spesifikasi ke DataFrame filing mentah dalam satu projection.
+
+    Setiap kolom output menjadi rantai F.when(subsector == ...) sehingga data hanya
+    dipindai sekali, bukan sekali per subsektor yang kemudian digabung dengan unionByName.
+    """
+    subsector = fact(spec["subsector_fact"])
+    default = sector_columns(spec, spec["default"])
+    sectors = [(sector["match"], sector_columns(spec, sector)) for sector in spec["subsectors"]]
+
+    projection = []
+    for name in spec["output_columns"]:
+        # Kolom dengan mapping yang sama di semua subsektor tidak perlu percabangan
+        if all(columns[name] == default[name] for _, columns in sectors):
+            projection.append(compile_expression(default[name]).alias(name))
+            continue
+        expr = None
+        for match, columns in sectors:
+            branch = compile_expression(columns[name])
+            expr = F.when(subsector == match, branch) if expr is None else expr.when(subsector == match, branch)
+        projection.append(expr.otherwise(compile_expression(default[name])).alias(name))
+
+    # Filing tanpa subsektor tidak termasuk mapping mana pun (sama seperti filter ~isin sebelumnya)
+    return df.filter(subsector.isNotNull()).select(*projection)
+
+
+def create_spark_session(app_name="Transformasi Lapkeu"):
+    return SparkSession.builder \
+        .appName(app_name) \
+        .config("spark.jars.packages", "org.mongodb.spark:mongo-spark-connector_2.12:3.0.1") \
+        .config("spark.executor.memory", "4g") \
+        .config("spark.driver.memory", "4g") \
+        .getOrCreate()
+
+
+def read_filings(spark, spec, year, source="mongo", pruned=True, period="FY"):
+    if source == "parquet":
+        if period != "FY":
+            raise ValueError("Snapshot Parquet hanya tersedia untuk laporan tahunan")
+        # Parquet sudah melakukan nested column pruning sendiri
+        from staging import read_staged
+        return read_staged(spark, years=[year])
+    reader = spark.read.format("mongo") \
+        .option("uri", MONGO_URI) \
+        .option("database", DB_NAME) \
+        .option("collection", source_collection(spec, year, period))
+    if pruned:
+        reader = reader.schema(filings_schema(spec)) \
+            .option("pipeline", json.dumps(projection_pipeline(spec)))
+    return reader.load()
+
+
+def collection_bytes(spec, year, pipeline=()):
+    """Total ukuran BSON dokumen (setelah pipeline) yang dikirim MongoDB ke Spark."""
+    client = MongoClient(MONGO_URI)
+    collection = client[DB_NAME][spec["source_collection"].format(year=year)]
+    result = list(collection.aggregate(list(pipeline) + [
+        {"$group": {"_id": None, "bytes": {"$sum": {"$bsonSize": "$$ROOT"}}}}
+    ]))
+    client.close()
+    return result[0]["bytes"] if result else 0
+
+
+def compare_reads(spark, spec, year):
+    """Membandingkan read dengan inferensi schema penuh dan read yang dipangkas."""
+    for label, pruned in (("inferensi schema", False), ("schema minimal", True)):
+        started = time.perf_counter()
+        df = transform(read_filings(spark, spec, year, pruned=pruned), spec)
+        # Sink noop: seluruh transformasi dievaluasi tanpa biaya write
+        df.write.format("noop").mode("overwrite").save()
+        seconds = time.perf_counter() - started
+        size = collection_bytes(spec, year, projection_pipeline(spec) if pruned else ())
+        print(f"[{label}] {seconds:.2f} detik, {size / 1024 / 1024:.1f} MB dibaca dari MongoDB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Transformasi laporan keuangan IDX per subsektor")
+    parser.add_argument("--year", required=True, help="Tahun fiskal yang diproses")
+    parser.add_argument("--spec", default=DEFAULT_SPEC, help="Path spesifikasi mapping (JSON)")
+    parser.add_argument("--source", choices=["mongo", "parquet"], default="mongo")
+    parser.add_argument("--output-collection", help="Default: output_collection pada spesifikasi")
+    parser.add_argument("--debug", action="store_true", help="Tampilkan jumlah baris dan seluruh hasil")
+    parser.add_argument("--engine", choices=["spark", "duckdb"], default="spark",
+                        help="duckdb: transformasi in-process tanpa JVM (lihat local_engine.py)")
+    parser.add_argument("--compare-read", action="store_true",
+                        help="Bandingkan runtime dan byte read dengan/tanpa schema minimal, tanpa menulis")
+    args = parser.parse_args()
+
+    spec = load_spec(args.spec)
+    if args.engine == "duckdb":
+        from local_engine import run_local
+        run_local(spec, args.year, args.source, args.output_collection, args.debug)
+        return
+
+    spark = create_spark_session()
+    if args.compare_read:
+        compare_reads(spark, spec, args.year)
+        spark.stop()
+        return
+    started = time.perf_counter()
+
+    final_df = transform(read_filings(spark, spec, args.year, args.source), spec)
+    if args.debug:
+        # Tanpa --debug job hanya melakukan satu scan sumber dan satu write
+        final_df = final_df.cache()
+        final_df.orderBy("emiten", ascending=False).show(truncate=False, n=final_df.count())
+
+    output = args.output_collection or spec["output_collection"].format(year=args.year)
+    write_collection(final_df, MONGO_URI, DB_NAME, output, partition_key="emiten",
+                     indexes=[[("emiten", 1)], [("report_date", 1)]])
+    print(f"Transformasi {args.year} selesai dalam {time.perf_counter() - started:.2f} detik")
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
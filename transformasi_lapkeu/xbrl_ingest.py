@@ -0,0 +1,200 @@
+"""Ingest file XBRL instance laporan keuangan IDX ke MongoDB (atau JSON Lines).
+
+    python xbrl_ingest.py data/2024 --collection 2024
+    python xbrl_ingest.py data/2024 --collection 2024 --drop --workers 8
+    python xbrl_ingest.py data/2024 --output jsonl --jsonl-path json/lapkeu_tahunan_2024.jsonl
+
+Struktur direktori yang diharapkan adalah satu folder per emiten, mis.
+`data/2024/AALI/instance.xbrl`. Setiap fact dipipihkan menjadi
+`facts.<NamaElemen>_<contextRef>.value` (mis. `facts.Assets_CurrentYearInstant.value`),
+layout yang sama dengan yang dibaca notebook dan transform_engine.py.
+
+File diparse secara streaming dengan iterparse dan elemen dibersihkan setelah
+diproses, sehingga memori per worker konstan berapa pun ukuran filing-nya.
+"""
+
+import argparse
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime
+from multiprocessing import Pool
+
+from pymongo import MongoClient
+
+MONGO_URI = "mongodb://localhost:27017"
+DB_NAME = "bigdatatugas"
+
+INSTANCE_SUFFIXES = (".xbrl", ".xml")
+XSI_NIL = "{http://www.w3.org/2001/XMLSchema-instance}nil"
+# Fact yang berisi kode emiten; jika tidak ada, nama direktori filing dipakai sebagai ticker
+TICKER_FACTS = ("EntityCode_CurrentYearInstant", "EntityCode_CurrentYearDuration")
+INSERT_BATCH_SIZE = 50
+
+
+def local_name(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_value(elem):
+    if elem.get(XSI_NIL) == "true":
+        return None
+    text = (elem.text or "").strip()
+    # Fact numerik selalu memiliki unitRef; sisanya (nama entitas, subsektor, tanggal) tetap string
+    if elem.get("unitRef") is not None:
+        try:
+            return float(text)
+        except ValueError:
+            return None
+    return text
+
+
+def parse_facts(path):
+    """Membaca satu file instance secara streaming dan mengembalikan dict facts yang sudah dipipihkan."""
+    facts = {}
+    depth = 0
+    root = None
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        if event == "start":
+            if root is None:
+                root = elem
+            depth += 1
+            continue
+
+        depth -= 1
+        context = elem.get("contextRef")
+        if context is not None:
+            key = f"{local_name(elem.tag)}_{context}"
+            value = parse_value(elem)
+            # Fact duplikat (mis. tersaji di beberapa bagian laporan): nilai non-null pertama dipakai
+            if facts.get(key, {}).get("value") is None:
+                facts[key] = {"value": value}
+        if depth == 1:
+            # Anak langsung root selesai diproses (context, unit, fact, atau tuple); lepaskan dari memori
+            root.clear()
+    return facts
+
+
+def find_instances(input_dir):
+    for dirpath, _, filenames in os.walk(input_dir):
+        for filename in sorted(filenames):
+            if filename.lower().endswith(INSTANCE_SUFFIXES):
+                yield os.path.join(dirpath, filename)
+
+
+def parse_filing(path):
+    """Worker: mengubah satu file instance menjadi dokumen MongoDB. Mengembalikan (path, dokumen, error).
+
+    Dokumen dan error sama-sama None jika file bukan instance XBRL (tidak ada fact ber-contextRef),
+    mis. file .xml lain di folder filing; file seperti itu dilewati, bukan ditulis sebagai filing kosong.
+    """
+    try:
+        facts = parse_facts(path)
+        file_size = os.path.getsize(path)
+    except (ET.ParseError, OSError) as e:
+        # Satu file rusak atau tidak terbaca tidak boleh menghentikan seluruh pool
+        return path, None, str(e)
+    if not facts:
+        return path, None, None
+
+    ticker = next((facts[name]["value"] for name in TICKER_FACTS if facts.get(name, {}).get("value")), None)
+    document = {
+        "ticker": ticker or os.path.basename(os.path.dirname(path)),
+        "facts": facts,
+        "file_info": {
+            "file_name": os.path.basename(path),
+            "file_path": path,
+            "file_size": file_size,
+        },
+        "processed_date": datetime.now(),
+    }
+    return path, document, None
+
+
+class MongoSink:
+    def __init__(self, collection, drop=False):
+        self.client = MongoClient(MONGO_URI)
+        self.collection = self.client[DB_NAME][collection]
+        if drop:
+            self.collection.drop()
+
+    def write(self, documents):
+        self.collection.insert_many(documents, ordered=False)
+
+    def close(self):
+        self.collection.create_index("ticker")
+        self.client.close()
+
+
+class JsonLinesSink:
+    def __init__(self, path):
+        self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, documents):
+        for document in documents:
+            self.file.write(json.dumps(document, ensure_ascii=False, default=str) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+def ingest(input_dir, sink, workers=None, batch_size=INSERT_BATCH_SIZE):
+    """Mem-parse seluruh filing di input_dir secara paralel dan menulisnya per batch ke sink.
+
+    Mengembalikan (jumlah ditulis, [(path, error)] yang gagal, [path] yang bukan instance XBRL).
+    """
+    written, failed, skipped = 0, [], []
+    batch = []
+    with Pool(processes=workers) as pool:
+        # imap_unordered: hasil dialirkan begitu satu file selesai, tanpa menunggu seluruh batch tahunan
+        for path, document, error in pool.imap_unordered(parse_filing, find_instances(input_dir), chunksize=4):
+            if error:
+                failed.append((path, error))
+                continue
+            if document is None:
+                skipped.append(path)
+                continue
+            batch.append(document)
+            if len(batch) >= batch_size:
+                sink.write(batch)
+                written += len(batch)
+                batch = []
+    if batch:
+        sink.write(batch)
+        written += len(batch)
+    sink.close()
+    return written, failed, skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest file XBRL instance laporan keuangan IDX")
+    parser.add_argument("input_dir", help="Direktori filing (satu subdirektori per emiten)")
+    parser.add_argument("--collection", help="Koleksi MongoDB tujuan, mis. 2024")
+    parser.add_argument("--drop", action="store_true", help="Hapus koleksi tujuan sebelum ingest")
+    parser.add_argument("--output", choices=["mongo", "jsonl"], default="mongo")
+    parser.add_argument("--jsonl-path", help="File output untuk --output jsonl")
+    parser.add_argument("--workers", type=int, default=None, help="Jumlah proses parser (default: jumlah CPU)")
+    args = parser.parse_args()
+
+    if args.output == "mongo":
+        if not args.collection:
+            parser.error("--collection wajib untuk --output mongo")
+        sink = MongoSink(args.collection, drop=args.drop)
+    else:
+        if not args.jsonl_path:
+            parser.error("--jsonl-path wajib untuk --output jsonl")
+        sink = JsonLinesSink(args.jsonl_path)
+
+    started = time.perf_counter()
+    written, failed, skipped = ingest(args.input_dir, sink, workers=args.workers)
+    seconds = time.perf_counter() - started
+    print(f"{written} filing ditulis dalam {seconds:.2f} detik ({written / max(seconds, 1e-9):.1f} filing/detik)")
+    for path, error in failed:
+        print(f"Gagal parse {path}: {error}")
+    for path in skipped:
+        print(f"Dilewati (bukan instance XBRL, tidak ada fact): {path}")
+
+
+if __name__ == "__main__":
+    main()